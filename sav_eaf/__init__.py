@@ -0,0 +1 @@
+"""Datos y analítica del registro de SAV y EAF de la CNMV, utilizables sin Streamlit"""
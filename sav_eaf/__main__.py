@@ -0,0 +1,6 @@
+import sys
+
+from sav_eaf.cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""API HTTP local (JSON) con los agregados del dashboard.
+
+    python -m sav_eaf serve [--host 127.0.0.1] [--port 8765] [--threads 16]
+
+Rutas:
+    GET /api/version                 versión de datos, fecha de extracción y nº de entidades
+    GET /api/summaries               agregados disponibles
+    GET /api/summaries/<nombre>      un agregado (ver sav_eaf.summaries.SUMMARIES)
+    GET /api/entities/<entity_key>   ficha de una entidad
+
+Todos los cuerpos se serializan y comprimen una vez por versión de datos; las respuestas
+llevan un ETag derivado de la versión (If-None-Match -> 304) y van en gzip si el cliente lo acepta.
+"""
+import gzip
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pandas as pd
+
+from sav_eaf.core import DATA_FILE, get_data_version, load_extraction
+from sav_eaf.summaries import summarize
+
+def _to_json(frame):
+    return frame.to_json(orient='records', force_ascii=False, date_format='iso').encode('utf-8')
+
+class Payload:
+    """Cuerpo JSON prerrenderizado en claro y en gzip, con su ETag"""
+    __slots__ = ('body', 'gzipped', 'etag')
+
+    def __init__(self, body, etag):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=6)
+        self.etag = etag
+
+class DataLayer:
+    """Agregados en memoria para la versión de datos vigente; se recalculan cuando cambia el fichero"""
+
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+        self.version = None
+        self.payloads = {}
+        self.profiles = None
+        self.entity_payloads = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Comprobar la versión (stat + huella cacheada) y recalcular si el fichero ha cambiado"""
+        version = get_data_version(self.path)
+        if version == self.version:
+            return version
+        with self._lock:
+            if version != self.version:
+                self._build(version)
+        return version
+
+    def _build(self, version):
+        df, quality_report = load_extraction(self.path)
+        summaries = summarize(df, quality_report)
+        extraction = df['fecha_extraccion'].max()
+
+        payloads = {
+            name: Payload(_to_json(frame), f'W/"{version}-{name}"') for name, frame in summaries.items()
+        }
+        info = {
+            'data_version': version,
+            'fecha_extraccion': None if pd.isna(extraction) else extraction.isoformat(),
+            'entidades': len(df),
+        }
+        payloads['_version'] = Payload(json.dumps(info, ensure_ascii=False).encode('utf-8'), f'W/"{version}-version"')
+        payloads['_summaries'] = Payload(json.dumps(sorted(summaries), ensure_ascii=False).encode('utf-8'),
+                                         f'W/"{version}-summaries"')
+
+        profiles = summaries['fichas'].drop_duplicates('entity_key', keep='last').set_index('entity_key', drop=False)
+        # Swap everything at once so readers never mix two versions
+        self.payloads, self.profiles, self.entity_payloads = payloads, profiles, {}
+        self.version = version
+
+    def summary(self, name):
+        self.refresh()
+        return self.payloads.get(name)
+
+    def entity(self, entity_key):
+        """Ficha de una entidad, serializada en la primera petición y reutilizada después"""
+        version = self.refresh()
+        payload = self.entity_payloads.get(entity_key)
+        if payload is None and entity_key in self.profiles.index:
+            body = _to_json(self.profiles.loc[[entity_key]])[1:-1]  # single record, not a list
+            payload = Payload(body, f'W/"{version}-{entity_key}"')
+            self.entity_payloads[entity_key] = payload
+        return payload
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = 'SAV-EAF-API/1.0'
+    protocol_version = 'HTTP/1.1'
+    timeout = 15  # idle keep-alive connections release their pool thread
+
+    def do_GET(self):
+        data = self.server.data
+        parts = [part for part in self.path.split('?', 1)[0].split('/') if part]
+        try:
+            if parts == ['api', 'version']:
+                payload = data.summary('_version')
+            elif parts == ['api', 'summaries']:
+                payload = data.summary('_summaries')
+            elif len(parts) == 3 and parts[:2] == ['api', 'summaries'] and not parts[2].startswith('_'):
+                payload = data.summary(parts[2])
+            elif len(parts) == 3 and parts[:2] == ['api', 'entities']:
+                payload = data.entity(parts[2])
+            else:
+                return self._error(404, 'ruta desconocida')
+        except FileNotFoundError:
+            return self._error(503, 'fichero de datos no disponible')
+        if payload is None:
+            return self._error(404, 'recurso no encontrado')
+        self._send(payload)
+
+    def _send(self, payload):
+        if payload.etag in (tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')):
+            self.send_response(304)
+            self.send_header('ETag', payload.etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        body = payload.gzipped if use_gzip else payload.body
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('ETag', payload.etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        body = json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer que atiende cada conexión en un pool de hilos acotado"""
+    daemon_threads = True
+
+    def __init__(self, address, handler, data, threads=16, verbose=False):
+        super().__init__(address, handler)
+        self.data = data
+        self.verbose = verbose
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='api')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+def make_server(host='127.0.0.1', port=8765, path=DATA_FILE, threads=16, verbose=False):
+    """Servidor listo para serve_forever(); los agregados se precalculan antes de aceptar conexiones"""
+    data = DataLayer(path)
+    data.refresh()
+    return PooledHTTPServer((host, port), ApiHandler, data, threads=threads, verbose=verbose)
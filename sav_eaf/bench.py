@@ -0,0 +1,124 @@
+"""Benchmarks de escalado sobre registros sintéticos (sav_eaf.synthetic).
+
+    python -m sav_eaf bench [--sizes 10000,100000,1000000] [--extractions 3] [--repeat 3]
+                            [--data-dir DIR] [--results FICHERO] [--only carga,explorador,...]
+
+Para cada tamaño se mide la carga (load_extraction), cada agregado de SUMMARIES, las estructuras
+derivadas de cada página y los filtros y la búsqueda del explorador. El tiempo es el mejor de
+--repeat ejecuciones sin instrumentar; la memoria pico se mide aparte, en una ejecución más con
+tracemalloc, para que su sobrecoste no contamine el tiempo. Cada medida se añade como una línea
+JSON a --results, de modo que las curvas de escalado y las regresiones se comparan entre commits.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from sav_eaf.core import (
+    EXPLORER_COLUMNS, SEGMENT_FEATURE_GROUPS, cohort_tables, diff_snapshots, entity_cards, explorer_mask,
+    instrument_masks, load_extraction, paginate_rows, read_rosters, score_features, segment_entities,
+    sort_permutations,
+)
+from sav_eaf.summaries import SUMMARIES
+from sav_eaf.synthetic import write_registers
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+RESULTS_FILE = os.path.join('benchmarks', 'results.jsonl')
+DATA_DIR = os.path.join('benchmarks', 'data')
+
+def measure(function, repeat=3):
+    """(mejor tiempo en segundos, memoria pico en MB, último resultado) de function()"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+        del result
+    tracemalloc.start()
+    try:
+        result = function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 2**20, result
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _explorer_steps(df):
+    """Interacciones típicas del explorador: filtros combinados, búsqueda por nombre y página ordenada"""
+    province = df['atencion_provincia'].mode().iat[0]
+    capital_range = (0, float(df['capital_social_numeric'].quantile(0.9)))
+    search = df['nombre'].iat[len(df) // 2].split()[0].lower()
+    permutation = sort_permutations(df, ['nombre'])['nombre']
+    filtered = explorer_mask(df, 'SAV', province, capital_range, True, 'a', (1, 11))
+    return {
+        'explorador:filtros': lambda: explorer_mask(df, 'SAV', province, capital_range, True, 'a', (1, 11)),
+        'explorador:busqueda': lambda: explorer_mask(df, search=search),
+        'explorador:pagina': lambda: paginate_rows(permutation, filtered, False, 2, 50),
+    }
+
+def benchmark_size(paths, repeat=3, only=None, log=sys.stderr):
+    """Medir todos los pasos sobre la última extracción de paths (las anteriores, para cambios y cohortes)"""
+    path = paths[-1]
+    records = []
+
+    def run(step, function, needed=False):
+        if only and not any(step.startswith(prefix) for prefix in only):
+            return function() if needed else None
+        seconds, peak_mb, result = measure(function, repeat)
+        records.append({'paso': step, 'segundos': round(seconds, 6), 'pico_mb': round(peak_mb, 2)})
+        print(f"  {step:40s} {seconds * 1000:10.1f} ms {peak_mb:10.1f} MB", file=log)
+        return result
+
+    # Read-only entity index: a benchmark must not rewrite the keys of the real register
+    df, _ = run('carga', lambda: load_extraction(path, update_index=False), needed=True)
+    masks = run('derivados:instrument_masks', lambda: instrument_masks(df), needed=True)
+    for name, function in SUMMARIES.items():
+        run(f'resumen:{name}', lambda: function(df, masks))
+    run('derivados:score_features', lambda: score_features(df))
+    run('derivados:segment_entities', lambda: segment_entities(df, 5, tuple(SEGMENT_FEATURE_GROUPS)))
+    run('derivados:sort_permutations', lambda: sort_permutations(df, [c for c in EXPLORER_COLUMNS if c in df.columns]))
+    run('derivados:entity_cards', lambda: entity_cards(df))
+    for step, function in _explorer_steps(df).items():
+        run(step, function)
+
+    if len(paths) > 1:
+        previous, _ = load_extraction(paths[-2], update_index=False)
+        run('cambios:diff_snapshots', lambda: diff_snapshots(previous, df))
+        run('cohortes:cohort_tables', lambda: cohort_tables(read_rosters(paths, update_index=False)))
+    return len(df), records
+
+def run_benchmarks(sizes=DEFAULT_SIZES, extractions=3, repeat=3, data_dir=DATA_DIR, results=RESULTS_FILE,
+                   only=None, seed=42, log=sys.stderr):
+    """Generar (si faltan) los registros sintéticos de cada tamaño, medirlos y añadir los resultados a results"""
+    context = {
+        'creado': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'repeticiones': repeat,
+    }
+    os.makedirs(os.path.dirname(results) or '.', exist_ok=True)
+    written = 0
+    for size in sizes:
+        start = time.perf_counter()
+        paths = write_registers(size, data_dir, extractions, seed, reuse=True)
+        print(f"{size} filas x {extractions} extracciones ({time.perf_counter() - start:.1f} s)", file=log)
+        rows, records = benchmark_size(paths, repeat, only, log)
+        with open(results, 'a', encoding='utf-8') as fh:
+            for record in records:
+                fh.write(json.dumps({**context, 'tamaño': size, 'filas': rows, **record}, ensure_ascii=False) + '\n')
+        written += len(records)
+    return written
@@ -0,0 +1,81 @@
+"""Gráficos de distribución a partir de resúmenes calculados en el servidor.
+
+Los box plots y histogramas de la app no envían los valores individuales al navegador:
+cuartiles, bigotes y bins se calculan una vez por versión de datos (sav_eaf.summaries) y solo
+viajan los valores atípicos, como mucho CHART_OUTLIERS por grupo y dibujados con WebGL
+(Scattergl). El tamaño de la figura y el tiempo de dibujo no crecen con el registro.
+
+Los resúmenes solo necesitan NumPy y pandas; plotly se importa al construir la primera figura,
+así que la capa cacheada (views/data.py) no lo carga al arrancar.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from sav_eaf.summaries import CLIENT_TYPES, box_stats, histogram_bins
+
+CHART_OUTLIERS = int(os.environ.get('SAV_EAF_CHART_OUTLIERS', '500'))
+
+def box_outliers(values, stats, limit=CHART_OUTLIERS):
+    """Valores fuera de los bigotes, ordenados; si hay más de limit, una muestra por rango que conserva los extremos"""
+    values = values.dropna().to_numpy(dtype=float)
+    outliers = np.sort(values[(values < stats['bigote_inferior']) | (values > stats['bigote_superior'])])
+    if len(outliers) > limit:
+        outliers = outliers[np.unique(np.linspace(0, len(outliers) - 1, limit).round().astype(int))]
+    return outliers
+
+def box_summary(groups, limit=CHART_OUTLIERS):
+    """{grupo: serie} -> (estadísticos de box plot por grupo, {grupo: valores atípicos})"""
+    rows, outliers = [], {}
+    for name, values in groups.items():
+        stats = box_stats(values)
+        rows.append({'grupo': name, **stats})
+        outliers[name] = box_outliers(values, stats, limit) if stats['n'] else np.empty(0)
+    return pd.DataFrame(rows), outliers
+
+def chart_data(df, limit=CHART_OUTLIERS):
+    """Resúmenes de los gráficos de distribución de la app para una extracción"""
+    capital = df['capital_social_numeric']
+    return {
+        'capital_por_tipo': box_summary(dict(tuple(capital.groupby(df['tipo_entidad']))), limit),
+        'capital_por_cliente': box_summary(
+            {client_type: capital[df['tipos_clientes'].str.contains(client_type, na=False)]
+             for client_type in CLIENT_TYPES}, limit),
+        'servicios_inversion': histogram_bins(df['num_servicios_inversion']),
+        'servicios_auxiliares': histogram_bins(df['num_servicios_auxiliares']),
+    }
+
+def box_figure(stats, colors, outliers=None, name_column='grupo', labels=None):
+    """Box plot desde estadísticos precalculados; los atípicos, si se pasan, como puntos WebGL"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    labels = labels or {}
+    for row in stats[stats['n'] > 0].itertuples(index=False):
+        name = getattr(row, name_column)
+        label = labels.get(name, name)
+        color = colors.get(name, '#60A5FA')
+        fig.add_trace(go.Box(
+            name=label, legendgroup=label,
+            q1=[row.q1], median=[row.mediana], q3=[row.q3], mean=[row.media],
+            lowerfence=[row.bigote_inferior], upperfence=[row.bigote_superior],
+            marker_color=color, boxpoints=False,
+        ))
+        points = outliers.get(name) if outliers is not None else None
+        if points is not None and len(points):
+            fig.add_trace(go.Scattergl(
+                x=[label] * len(points), y=points, mode='markers', name=label, legendgroup=label, showlegend=False,
+                marker=dict(color=color, size=5, opacity=0.7),
+                hovertemplate=f"{label}: %{{y:,.0f}}<extra></extra>",
+            ))
+    return fig
+
+def histogram_figure(bins, xlabel, color):
+    """Histograma desde bins precalculados (inicio, fin, entidades) como barras"""
+    import plotly.graph_objects as go
+
+    return go.Figure(go.Bar(
+        x=(bins['inicio'] + bins['fin']) / 2, y=bins['entidades'], width=(bins['fin'] - bins['inicio']) * 0.9,
+        marker_color=color, hovertemplate=f"{xlabel}: %{{x}}<br>Entidades: %{{y}}<extra></extra>",
+    ))
@@ -0,0 +1,287 @@
+"""Línea de comandos: agregados del dashboard para una o muchas extracciones, sin Streamlit.
+
+    python -m sav_eaf summarize [CSV ...] [--snapshots DIR] [--out DIR] [--format parquet|json]
+                                [--workers N] [--only kpis,provincias,...]
+    python -m sav_eaf serve [--host 127.0.0.1] [--port 8765] [--threads 16] [--data CSV]
+    python -m sav_eaf site [CSV ...] [--snapshots DIR] [--out DIR] [--workers N] [--force]
+                                 [--shared-plotly]
+    python -m sav_eaf factsheets [--data CSV] [--out DIR] [--format html|pdf] [--tipo SAV|EAF] [--provincia P]
+                                 [--keys E0000001,...] [--query EXPR] [--workers N]
+    python -m sav_eaf arrow [--data CSV] [--out DIR] [--compression uncompressed|lz4|zstd]
+    python -m sav_eaf publish [--data CSV] [--root DIR] [--prune]
+    python -m sav_eaf synthetic --rows N [--extractions 3] [--out DIR] [--seed 42]
+    python -m sav_eaf bench [--sizes 10000,100000,1000000] [--extractions 3] [--repeat 3]
+                            [--data-dir DIR] [--results FICHERO] [--only carga,explorador,...]
+    python -m sav_eaf loadtest [--users 1,10,50,100,200] [--iterations 2] [--think MS]
+                               [--scenarios navegacion,explorador,comparacion] [--results FICHERO]
+
+Cada extracción se procesa en un proceso del pool; los resultados se unen en una tabla
+por agregado (columnas snapshot y data_version) más un manifest.json con el estado de cada fichero.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from sav_eaf.core import DATA_FILE, get_data_version, list_snapshots, load_extraction, register_entities
+from sav_eaf.summaries import SUMMARIES, summarize
+
+def summarize_file(path, names=None):
+    """Trabajo de un proceso: cargar una extracción y calcular sus agregados; devuelve (meta, agregados)"""
+    start = time.perf_counter()
+    # Read-only entity index: run_batch registers every extraction's entities before the fan-out
+    df, quality_report = load_extraction(path, update_index=False)
+    summaries = summarize(df, quality_report, names)
+    extraction = df['fecha_extraccion'].max()
+    meta = {
+        'snapshot': os.path.basename(path),
+        'path': path,
+        'data_version': get_data_version(path),
+        'fecha_extraccion': None if pd.isna(extraction) else extraction.isoformat(),
+        'filas': len(df),
+        'cuarentena': len(quality_report['quarantine']),
+        'segundos': round(time.perf_counter() - start, 3),
+    }
+    return meta, summaries
+
+def write_table(frame, path, fmt):
+    """Guardar un agregado como Parquet o JSON (lista de registros)"""
+    if fmt == 'parquet':
+        frame.to_parquet(f"{path}.parquet", index=False)
+    else:
+        frame.to_json(f"{path}.json", orient='records', force_ascii=False, date_format='iso', indent=1)
+
+def run_batch(paths, out_dir, fmt='parquet', workers=None, names=None, log=sys.stderr):
+    """Calcular los agregados de todas las extracciones en paralelo y escribir una tabla por agregado"""
+    os.makedirs(out_dir, exist_ok=True)
+    tables = {}
+    manifest = []
+
+    def collect(meta, summaries):
+        manifest.append({**meta, 'estado': 'ok'})
+        for name, frame in summaries.items():
+            tables.setdefault(name, []).append(
+                frame.assign(snapshot=meta['snapshot'], data_version=meta['data_version']))
+        print(f"[{len(manifest)}/{len(paths)}] {meta['snapshot']} ({meta['segundos']:.2f} s)", file=log)
+
+    def failed(path, error):
+        manifest.append({'snapshot': os.path.basename(path), 'path': path, 'estado': 'error', 'error': repr(error)})
+        print(f"[{len(manifest)}/{len(paths)}] {os.path.basename(path)}: ERROR {error!r}", file=log)
+
+    start = time.perf_counter()
+    # Stable keys across processes: new entities enter the index here, in date order, before the fan-out
+    register_entities(paths)
+    if workers == 1 or len(paths) == 1:
+        for path in paths:
+            try:
+                collect(*summarize_file(path, names))
+            except Exception as error:
+                failed(path, error)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(summarize_file, path, names): path for path in paths}
+            for future in as_completed(futures):
+                try:
+                    collect(*future.result())
+                except Exception as error:
+                    failed(futures[future], error)
+
+    for name, frames in tables.items():
+        write_table(pd.concat(frames, ignore_index=True), os.path.join(out_dir, name), fmt)
+    summary = {
+        'creado': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'formato': fmt,
+        'agregados': sorted(tables),
+        'segundos': round(time.perf_counter() - start, 3),
+        'extracciones': sorted(manifest, key=lambda entry: entry['snapshot']),
+    }
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as fh:
+        json.dump(summary, fh, ensure_ascii=False, indent=1)
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m sav_eaf', description=__doc__.split('\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch = commands.add_parser('summarize', help='Agregados de una o muchas extracciones')
+    batch.add_argument('paths', nargs='*', help='Ficheros CSV (por defecto: extracción actual + histórico)')
+    batch.add_argument('--snapshots', help='Directorio con extracciones *.csv a incluir')
+    batch.add_argument('--out', default='summaries', help='Directorio de salida (por defecto: summaries)')
+    batch.add_argument('--format', choices=['parquet', 'json'], default='parquet')
+    batch.add_argument('--workers', type=int, default=None, help='Procesos en paralelo (por defecto: nº de CPUs)')
+    batch.add_argument('--only', help=f"Agregados separados por comas ({', '.join(SUMMARIES)}, calidad)")
+    commands.add_parser('list', help='Listar los agregados disponibles')
+
+    serve = commands.add_parser('serve', help='API HTTP local con los agregados (JSON, ETag, gzip)')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--threads', type=int, default=16, help='Hilos del pool de peticiones')
+    serve.add_argument('--data', default=DATA_FILE, help=f"Extracción servida (por defecto: {DATA_FILE})")
+    serve.add_argument('--verbose', action='store_true', help='Registrar cada petición')
+
+    site = commands.add_parser('site', help='Exportar las páginas del dashboard como HTML estático')
+    site.add_argument('paths', nargs='*', help='Ficheros CSV (por defecto: extracción actual + histórico)')
+    site.add_argument('--snapshots', help='Directorio con extracciones *.csv a incluir')
+    site.add_argument('--out', default='site', help='Directorio de salida (por defecto: site)')
+    site.add_argument('--workers', type=int, default=None, help='Procesos en paralelo (por defecto: nº de CPUs)')
+    site.add_argument('--force', action='store_true', help='Regenerar también las extracciones sin cambios')
+    site.add_argument('--shared-plotly', action='store_true',
+                      help='Enlazar una sola copia de plotly.js en la raíz en lugar de incrustarla en cada página')
+
+    sheets = commands.add_parser('factsheets', help='Fichas por entidad (HTML o PDF) del registro o de un filtro')
+    sheets.add_argument('--data', default=DATA_FILE, help=f"Extracción (por defecto: {DATA_FILE})")
+    sheets.add_argument('--out', default='factsheets', help='Directorio de salida (por defecto: factsheets)')
+    sheets.add_argument('--format', choices=['html', 'pdf'], default='html')
+    sheets.add_argument('--tipo', choices=['SAV', 'EAF'], help='Solo entidades de este tipo')
+    sheets.add_argument('--provincia', help='Solo entidades con domicilio en esta provincia')
+    sheets.add_argument('--keys', help='entity_key separados por comas')
+    sheets.add_argument('--query', help="Filtro pandas adicional, p. ej. \"num_instrumentos >= 8\"")
+    sheets.add_argument('--workers', type=int, default=None, help='Procesos en paralelo (por defecto: nº de CPUs)')
+
+    arrow = commands.add_parser('arrow', help='Entidades y tablas hijas como ficheros Arrow IPC (memory-map)')
+    arrow.add_argument('--data', default=DATA_FILE, help=f"Extracción (por defecto: {DATA_FILE})")
+    arrow.add_argument('--out', default='arrow', help='Directorio de salida (por defecto: arrow)')
+    arrow.add_argument('--compression', choices=['uncompressed', 'lz4', 'zstd'], default='uncompressed',
+                       help='Con compresión los ficheros ocupan menos pero ya no se leen sin copia')
+
+    plane = commands.add_parser('publish', help='Plano de datos compartido por los workers (memory-map, por versión)')
+    plane.add_argument('--data', default=DATA_FILE, help=f"Extracción (por defecto: {DATA_FILE})")
+    plane.add_argument('--root', default=os.environ.get('SAV_EAF_DATA_PLANE') or 'dataplane',
+                       help='Directorio raíz (por defecto: SAV_EAF_DATA_PLANE o dataplane)')
+    plane.add_argument('--prune', action='store_true', help='Borrar las versiones anteriores publicadas en --root')
+
+    synthetic = commands.add_parser('synthetic', help='Registro sintético con el esquema completo, a cualquier escala')
+    synthetic.add_argument('--rows', type=int, required=True, help='Entidades de la primera extracción')
+    synthetic.add_argument('--extractions', type=int, default=3, help='Extracciones sucesivas (por defecto: 3)')
+    synthetic.add_argument('--out', default='synthetic', help='Directorio de salida (por defecto: synthetic)')
+    synthetic.add_argument('--seed', type=int, default=42)
+
+    bench = commands.add_parser('bench', help='Tiempos y memoria pico de carga, agregados y explorador por escala')
+    bench.add_argument('--sizes', default='10000,100000,1000000', help='Tamaños separados por comas')
+    bench.add_argument('--extractions', type=int, default=3, help='Extracciones por tamaño (cambios y cohortes)')
+    bench.add_argument('--repeat', type=int, default=3, help='Repeticiones por paso; se guarda la mejor')
+    bench.add_argument('--data-dir', default=os.path.join('benchmarks', 'data'),
+                       help='Registros sintéticos (se generan si faltan)')
+    bench.add_argument('--results', default=os.path.join('benchmarks', 'results.jsonl'),
+                       help='Fichero JSON-lines al que se añaden los resultados')
+    bench.add_argument('--only', help='Prefijos de paso separados por comas (carga, resumen:, derivados:, explorador:, ...)')
+
+    load = commands.add_parser('loadtest', help='Sesiones simuladas concurrentes sobre main.py (latencia y memoria)')
+    load.add_argument('--users', default='1,10,50,100,200', help='Niveles de concurrencia separados por comas')
+    load.add_argument('--iterations', type=int, default=2, help='Repeticiones de los escenarios por usuario')
+    load.add_argument('--think', type=float, default=0, help='Pausa media entre interacciones (ms, exponencial)')
+    load.add_argument('--scenarios', default='navegacion,explorador,comparacion',
+                      help='Escenarios separados por comas (navegacion, explorador, comparacion)')
+    load.add_argument('--script', default='main.py', help='Script de la app (por defecto: main.py)')
+    load.add_argument('--results', default=os.path.join('benchmarks', 'loadtest.jsonl'),
+                      help='Fichero JSON-lines al que se añade una línea por nivel')
+
+    args = parser.parse_args(argv)
+    if args.command == 'list':
+        for name, function in SUMMARIES.items():
+            print(f"{name:28s} {function.__doc__}")
+        print(f"{'calidad':28s} Resumen de las reglas de validación")
+        return 0
+    if args.command == 'serve':
+        from sav_eaf.api import make_server
+        server = make_server(args.host, args.port, args.data, args.threads, args.verbose)
+        print(f"API en http://{args.host}:{args.port}/api/summaries (versión {server.data.version})", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    if args.command == 'arrow':
+        from sav_eaf.export import write_arrow_tables
+        from sav_eaf.tables import child_tables
+        df, quality_report = load_extraction(args.data)
+        extraction = df['fecha_extraccion'].max()
+        meta = {
+            'data_version': get_data_version(args.data),
+            'fecha_extraccion': None if pd.isna(extraction) else extraction.isoformat(),
+            'creado': pd.Timestamp.now().isoformat(timespec='seconds'),
+        }
+        tables = {'entidades': df, 'cuarentena': quality_report['quarantine'], **child_tables(df)}
+        manifest = write_arrow_tables(tables, args.out, meta, args.compression)
+        for name, entry in manifest['tablas'].items():
+            print(f"{entry['fichero']:24s} {entry['filas']:>8d} filas", file=sys.stderr)
+        return 0
+
+    if args.command == 'publish':
+        from sav_eaf.dataplane import prune_planes, publish
+        start = time.perf_counter()
+        data_version = get_data_version(args.data)
+        target = publish(args.data, data_version, args.root)
+        print(f"{target} ({time.perf_counter() - start:.1f} s)", file=sys.stderr)
+        if args.prune:
+            for name in prune_planes(args.root, keep=[data_version]):
+                print(f"borrada {name}", file=sys.stderr)
+        return 0
+
+    if args.command == 'synthetic':
+        from sav_eaf.synthetic import write_registers
+        for path in write_registers(args.rows, args.out, args.extractions, args.seed):
+            print(path, file=sys.stderr)
+        return 0
+
+    if args.command == 'bench':
+        from sav_eaf.bench import run_benchmarks
+        sizes = [int(size) for size in args.sizes.split(',')]
+        only = args.only.split(',') if args.only else None
+        written = run_benchmarks(sizes, args.extractions, args.repeat, args.data_dir, args.results, only)
+        print(f"{written} medidas añadidas a {args.results}", file=sys.stderr)
+        return 0
+
+    if args.command == 'loadtest':
+        from sav_eaf.loadtest import run_loadtest
+        levels = [int(users) for users in args.users.split(',')]
+        try:
+            report = run_loadtest(levels, args.scenarios.split(','), args.iterations, args.think, args.script,
+                                  args.results)
+        except ValueError as error:
+            parser.error(str(error))
+        return 1 if any(level['errores'] for level in report) else 0
+
+    if args.command == 'factsheets':
+        from sav_eaf.factsheets import build_factsheets, filter_entities
+        df, _ = load_extraction(args.data)
+        selected = filter_entities(df, args.tipo, args.provincia, args.keys.split(',') if args.keys else None, args.query)
+        if selected.empty:
+            parser.error('ninguna entidad cumple el filtro')
+        summary = build_factsheets(selected, args.out, args.format, args.workers, get_data_version(args.data), peers_df=df)
+        print(f"{summary['fichas']} fichas en {summary['segundos']:.1f} s -> {args.out}", file=sys.stderr)
+        return 1 if summary['errores'] else 0
+
+    paths = list(args.paths)
+    if args.snapshots:
+        paths += sorted(glob.glob(os.path.join(args.snapshots, '*.csv')))
+    if not paths:
+        paths = list(list_snapshots().values())
+    paths = [path for path in dict.fromkeys(paths) if os.path.exists(path)]
+    if not paths:
+        parser.error('no se encontraron extracciones')
+
+    if args.command == 'site':
+        from sav_eaf.static_site import export_site
+        summary = export_site(paths, args.out, args.workers, args.force, args.shared_plotly)
+        print(f"{summary['paginas']} páginas de {summary['extracciones'] - summary['omitidas']} extracciones "
+              f"({summary['omitidas']} sin cambios) en {summary['segundos']:.1f} s -> {args.out}", file=sys.stderr)
+        return 1 if summary['errores'] else 0
+
+    names = args.only.split(',') if args.only else None
+    unknown = set(names or []) - set(SUMMARIES) - {'calidad'}
+    if unknown:
+        parser.error(f"agregados desconocidos: {', '.join(sorted(unknown))}")
+
+    summary = run_batch(paths, args.out, args.format, args.workers, names)
+    errors = [entry for entry in summary['extracciones'] if entry['estado'] != 'ok']
+    print(f"{len(paths) - len(errors)} extracciones procesadas en {summary['segundos']:.1f} s -> {args.out}", file=sys.stderr)
+    return 1 if errors else 0
@@ -0,0 +1,1083 @@
+"""Capa de datos y analítica del dashboard, sin dependencia de Streamlit.
+
+Carga y validación de extracciones, resolución de entidades, histórico de extracciones,
+deltas, listas de vigilancia, cohortes, ranking, segmentación e instrumentos. La app
+cachea estas funciones por versión de datos (ver views/data.py).
+"""
+import contextlib
+import functools
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock, writes stay atomic
+    fcntl = None
+
+DATA_FILE = 'cnmv_entities_complete.csv'
+
+@functools.lru_cache(maxsize=1024)
+def _file_digest(path, size, mtime_ns):
+    """Hash SHA-1 del contenido del fichero (cacheado por tamaño y fecha de modificación)"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+def get_data_version(path=DATA_FILE):
+    """Versión de los datos: huella del contenido del CSV, clave de todas las cachés derivadas"""
+    stat = os.stat(path)
+    return _file_digest(path, stat.st_size, stat.st_mtime_ns)
+
+def _as_text(series):
+    """Vista de texto de una columna (NaN se conserva), sin copiar si ya es texto"""
+    if pd.api.types.is_string_dtype(series):
+        return series
+    return series.astype(object).where(series.isna(), series.astype(str))
+
+def parse_spanish_number(series):
+    """Convertir números en formato español ('3.148.906,76') a float (NaN si no es convertible)"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    cleaned = _as_text(series).str.strip().str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    return pd.to_numeric(cleaned, errors='coerce')
+
+def normalize_entity_id(series):
+    """Normalizar identificadores: mayúsculas, sin guiones, puntos ni espacios ('A-78076452' -> 'A78076452')"""
+    return _as_text(series).str.upper().str.replace(r'[\s.\-]', '', regex=True)
+
+def _count_listed(series, sep=';'):
+    """Número de elementos de una lista empaquetada en texto ('x; y; z' -> 3)"""
+    text = _as_text(series)
+    lengths = text.str.len().to_numpy(dtype=float, na_value=0)
+    # Occurrences of the separator = length lost when removing it (avoids regex counting)
+    separators = (lengths - text.str.replace(sep, '', regex=False).str.len().to_numpy(dtype=float, na_value=0)) / len(sep)
+    return np.where(lengths == 0, 0, separators + 1)
+
+def _as_number(series):
+    return pd.to_numeric(series, errors='coerce').fillna(0).to_numpy()
+
+# Declarative data-quality checks, evaluated as vectorized column operations.
+# Rows failing an 'error' check are quarantined; 'warning' rows stay in the dashboard.
+QUALITY_CHECKS = [
+    dict(name='id_ausente', columns=['id'], severity='error',
+         description="Identificador vacío",
+         check=lambda df: df['id'].isna()),
+    dict(name='nombre_ausente', columns=['nombre'], severity='error',
+         description="Nombre de entidad vacío",
+         check=lambda df: _as_text(df['nombre']).str.strip().fillna('') == ''),
+    dict(name='tipo_desconocido', columns=['tipo_entidad'], severity='error',
+         description="Tipo de entidad distinto de SAV/EAF",
+         check=lambda df: ~df['tipo_entidad'].isin(['SAV', 'EAF'])),
+    dict(name='capital_no_numerico', columns=['capital_social'], severity='error',
+         description="Capital social no convertible a número",
+         check=lambda df: df['capital_social'].notna() & parse_spanish_number(df['capital_social']).isna()),
+    dict(name='id_duplicado', columns=['id'], severity='error',
+         description="Identificador repetido tras normalizar su formato (se conserva la primera aparición)",
+         check=lambda df: df['id'].notna() & normalize_entity_id(df['id']).duplicated(keep='first')),
+    dict(name='id_formato_invalido', columns=['id'], severity='warning',
+         description="Identificador que no es un NIF (letra + 8 caracteres) ni un número de registro",
+         check=lambda df: df['id'].notna() & ~normalize_entity_id(df['id']).str.fullmatch(r'[A-Z]\d{7}[0-9A-Z]|\d+').fillna(False)),
+    dict(name='id_no_normalizado', columns=['id'], severity='warning',
+         description="Identificador con guiones, puntos, espacios o minúsculas (p. ej. 'A-78076452' frente a 'A79203717')",
+         check=lambda df: df['id'].notna() & (_as_text(df['id']) != normalize_entity_id(df['id'])).fillna(False)),
+    dict(name='fecha_registro_invalida', columns=['fecha_registro'], severity='warning',
+         description="Fecha de registro no válida (formato esperado dd/mm/aaaa)",
+         check=lambda df: df['fecha_registro'].notna() & pd.to_datetime(df['fecha_registro'], format='%d/%m/%Y', errors='coerce').isna()),
+    dict(name='administradores_inconsistentes', columns=['num_administradores', 'administradores'], severity='warning',
+         description="Nº de administradores distinto de los nombres listados",
+         check=lambda df: _as_number(df['num_administradores']) != _count_listed(df['administradores'])),
+    dict(name='socios_inconsistentes', columns=['num_socios', 'socios_principales'], severity='warning',
+         description="Nº de socios distinto de los socios listados",
+         check=lambda df: _as_number(df['num_socios']) != _count_listed(df['socios_principales'])),
+    dict(name='sucursales_inconsistentes', columns=['num_sucursales_espana', 'sucursales_espana'], severity='warning',
+         description="Nº de sucursales en España distinto de las direcciones listadas",
+         check=lambda df: _as_number(df['num_sucursales_espana']) != _count_listed(df['sucursales_espana'])),
+    dict(name='instrumentos_inconsistentes', columns=['num_instrumentos', 'instrumentos_activos'], severity='warning',
+         description="Nº de instrumentos distinto de los códigos en instrumentos_activos",
+         check=lambda df: _as_number(df['num_instrumentos']) != _count_listed(df['instrumentos_activos'], sep=',')),
+    dict(name='servicios_inversion_inconsistentes', columns=['num_servicios_inversion', 'servicios_inversion'], severity='warning',
+         description="Nº de servicios de inversión distinto de los servicios listados",
+         check=lambda df: _as_number(df['num_servicios_inversion']) != _count_listed(df['servicios_inversion'])),
+    dict(name='servicios_auxiliares_inconsistentes', columns=['num_servicios_auxiliares', 'servicios_auxiliares'], severity='warning',
+         description="Nº de servicios auxiliares distinto de los servicios listados",
+         check=lambda df: _as_number(df['num_servicios_auxiliares']) != _count_listed(df['servicios_auxiliares'])),
+]
+
+# Example rows kept per check for the report (counts are always exact)
+MAX_ISSUES_PER_CHECK = 1000
+
+def validate_data(raw):
+    """Ejecutar QUALITY_CHECKS y separar las filas válidas de las puestas en cuarentena"""
+    started = time.perf_counter()
+    summary, issues = [], []
+    quarantined = np.zeros(len(raw), dtype=bool)
+    reasons = pd.Series('', index=raw.index, dtype='string')
+    ids = raw['id'] if 'id' in raw.columns else pd.Series(pd.NA, index=raw.index)
+    names = raw['nombre'] if 'nombre' in raw.columns else pd.Series(pd.NA, index=raw.index)
+
+    for rule in QUALITY_CHECKS:
+        missing = [col for col in rule['columns'] if col not in raw.columns]
+        if missing:
+            summary.append({'Regla': rule['name'], 'Descripción': rule['description'], 'Severidad': rule['severity'],
+                            'Filas Afectadas': np.nan, 'Estado': f"Omitida (faltan columnas: {', '.join(missing)})"})
+            continue
+
+        failed = np.asarray(rule['check'](raw), dtype=bool)
+        if rule['severity'] == 'error':
+            quarantined |= failed
+            reasons = reasons.where(~failed, reasons + rule['name'] + '; ')
+
+        n_failed = int(failed.sum())
+        summary.append({'Regla': rule['name'], 'Descripción': rule['description'], 'Severidad': rule['severity'],
+                        'Filas Afectadas': n_failed, 'Estado': 'OK' if n_failed == 0 else 'Incidencias'})
+        if n_failed:
+            rows = np.flatnonzero(failed)[:MAX_ISSUES_PER_CHECK]
+            values = raw[rule['columns']].iloc[rows].astype('string').fillna('∅')
+            values = values.iloc[:, 0].str.cat([values[col] for col in values.columns[1:]], sep=' | ')
+            issues.append(pd.DataFrame({
+                'Línea CSV': rows + 2,  # header is line 1
+                'id': ids.iloc[rows].to_numpy(),
+                'nombre': names.iloc[rows].to_numpy(),
+                'Regla': rule['name'],
+                'Severidad': rule['severity'],
+                'Valores': values.str.slice(0, 200).to_numpy(),
+            }))
+
+    quarantine = raw[quarantined].copy()
+    quarantine.insert(0, 'motivo_cuarentena', reasons[quarantined].str.rstrip('; '))
+    valid = raw[~quarantined].reset_index(drop=True) if quarantined.any() else raw
+    report = {
+        'summary': pd.DataFrame(summary),
+        'issues': pd.concat(issues, ignore_index=True) if issues else pd.DataFrame(
+            columns=['Línea CSV', 'id', 'nombre', 'Regla', 'Severidad', 'Valores']),
+        'quarantine': quarantine,
+        'rows_read': len(raw),
+        'rows_valid': int((~quarantined).sum()),
+        'seconds': time.perf_counter() - started,
+    }
+    return valid, report
+
+ENTITY_INDEX_FILE = os.environ.get('SAV_EAF_ENTITY_INDEX', 'entity_index.json')
+
+# Legal-form and register-type words that carry no identity ("..., SOCIEDAD DE VALORES, S.A.")
+_LEGAL_FORM_TOKENS = (r'\b(SOCIEDAD(ES)? DE VALORES|AGENCIA(S)? DE VALORES|EMPRESA DE ASESORAMIENTO FINANCIERO|'
+                      r'SOCIEDAD ANONIMA( UNIPERSONAL)?|SOCIEDAD LIMITADA( UNIPERSONAL)?|SOCIEDAD|'
+                      r'SAU|SLU|SA|SL|SV|AV|EAF)\b')
+
+def normalize_nif(series):
+    """NIF/CIF normalizado ('A-78076452' -> 'A78076452'); <NA> si el identificador no es un NIF"""
+    ids = normalize_entity_id(series)
+    return ids.where(ids.str.fullmatch(r'[A-Z]\d{7}[0-9A-Z]').fillna(False))
+
+_ACCENTS = {'A': 'ÁÀÄÂ', 'E': 'ÉÈËÊ', 'I': 'ÍÌÏÎ', 'O': 'ÓÒÖÔ', 'U': 'ÚÙÜÛ', 'N': 'Ñ', 'C': 'Ç'}
+
+def _upper_ascii(series):
+    """Mayúsculas sin acentos ni espacios repetidos (solo operaciones de texto vectorizadas)"""
+    text = _as_text(series).fillna('').str.upper()
+    for plain, accented in _ACCENTS.items():
+        text = text.str.replace(f'[{accented}]', plain, regex=True)
+    return text
+
+def _collapse_spaces(text):
+    return text.str.replace(r'\s+', ' ', regex=True).str.strip()
+
+def normalize_entity_name(series):
+    """Nombre normalizado para comparación: sin acentos, puntuación ni forma jurídica"""
+    name = _upper_ascii(series).str.replace('.', '', regex=False)  # S.A. / S.V. -> SA / SV
+    name = name.str.replace(r'[^A-Z0-9& ]', ' ', regex=True).str.replace(_LEGAL_FORM_TOKENS, ' ', regex=True)
+    return _collapse_spaces(name)
+
+def _normalize_address(series):
+    return _collapse_spaces(_upper_ascii(series).str.replace(r'[^A-Z0-9 ]', ' ', regex=True))
+
+def _token_jaccard(a, b):
+    a, b = set(a.split()), set(b.split())
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+def _load_entity_index(path):
+    try:
+        with open(path, encoding='utf-8') as fh:
+            return json.load(fh)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'version': 1, 'next_id': 1, 'keys': {}, 'entities': {}}
+
+def _write_json(obj, path):
+    """Escritura atómica de un fichero JSON (fichero temporal único + os.replace)"""
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp',
+                                    dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+            json.dump(obj, fh, ensure_ascii=False, separators=(',', ':'))
+        # mkstemp creates 0600 files: keep the mode of the file being replaced (0644 for a new one)
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+@contextlib.contextmanager
+def _file_lock(path):
+    """Bloqueo exclusivo entre procesos (flock sobre <path>.lock) mientras dura el bloque"""
+    try:
+        lock = open(f"{path}.lock", 'a')
+    except OSError:
+        lock = None  # read-only deployment: nothing will be written either
+    try:
+        if lock is not None and fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+    finally:
+        if lock is not None:
+            lock.close()
+
+def _resolve_with_index(df, index, name_threshold=0.6, match_threshold=0.75):
+    """Resolver las filas de df contra index (en memoria) y registrar en él las identidades vistas"""
+    keys = index['keys']
+
+    nif = normalize_nif(df['id'])
+    # Integer text whatever the column dtype ('12', never '12.0'); no register number, no register key
+    register = pd.to_numeric(df['numero_registro'], errors='coerce')
+    register = register.where(register % 1 == 0).astype('Int64')
+    has_register = register.notna().to_numpy()
+    register_key = ('reg:' + _as_text(df['tipo_entidad']).fillna('') + ':' + register.astype(str)).where(has_register)
+    nif_key = 'nif:' + nif
+
+    # Exact identity keys: vectorized dictionary lookups
+    by_nif = nif_key.map(keys)
+    by_register = register_key.map(keys)
+    entity_key = by_nif.fillna(by_register).to_numpy(dtype=object)
+    method = np.where(by_nif.notna(), 'nif', np.where(by_register.notna(), 'registro', 'nueva')).astype(object)
+
+    # Blocking keys: first distinctive name token + province code, and normalized street + postcode
+    names = normalize_entity_name(df['nombre'])
+    postcode = pd.to_numeric(df['atencion_cp'], errors='coerce').astype('Int64').astype(str).str.zfill(5)
+    postcode = postcode.where(postcode.str.fullmatch(r'\d{5}').fillna(False),
+                              _as_text(df['direccion_ciudad']).str.extract(r'(\d{5})', expand=False)).fillna('')
+    street = _normalize_address(df['atencion_direccion'].fillna(df['direccion_calle']))
+    name_block = names.str.extract(r'^(\S+)', expand=False).fillna('') + '|' + postcode.str[:2]
+    address_block = street + '|' + postcode
+
+    unresolved = np.flatnonzero(pd.isna(entity_key))
+    if len(unresolved):
+        # Candidate pairs only within shared blocks: a join, never a full pairwise comparison
+        known = pd.DataFrame(
+            [(key, rec['name'], rec['address'], rec['name_block'], rec['address_block'])
+             for key, rec in index['entities'].items()],
+            columns=['entity_key', 'known_name', 'known_address', 'name_block', 'address_block'])
+        pending = pd.DataFrame({
+            'row': unresolved,
+            'name': names.iloc[unresolved].to_numpy(),
+            'address': street.iloc[unresolved].to_numpy(),
+            'name_block': name_block.iloc[unresolved].to_numpy(),
+            'address_block': address_block.iloc[unresolved].to_numpy(),
+        })
+        candidates = pd.concat([
+            pending.merge(known.drop(columns='address_block'), on='name_block'),
+            pending[pending['address'] != ''].merge(known.drop(columns='name_block'), on='address_block'),
+        ], ignore_index=True).drop_duplicates(['row', 'entity_key'])
+
+        if len(candidates):
+            name_score = np.array([_token_jaccard(a, b) for a, b in zip(candidates['name'], candidates['known_name'])])
+            address_score = np.array([_token_jaccard(a, b) for a, b in zip(candidates['address'], candidates['known_address'])])
+            has_address = (candidates['address'] != '') & (candidates['known_address'] != '')
+            candidates['score'] = np.where(has_address, 0.7 * name_score + 0.3 * address_score, name_score)
+            candidates = candidates[(name_score >= name_threshold) & (candidates['score'] >= match_threshold)]
+            best = candidates.sort_values('score', ascending=False).drop_duplicates('row')
+            entity_key[best['row'].to_numpy()] = best['entity_key'].to_numpy()
+            method[best['row'].to_numpy()] = 'nombre'
+
+    # New entities; rows of the same extraction sharing identity or name block collapse to one key
+    new_rows = np.flatnonzero(pd.isna(entity_key))
+    if len(new_rows):
+        identity = nif_key.iloc[new_rows].fillna(names.iloc[new_rows] + '|' + name_block.iloc[new_rows])
+        codes, uniques = pd.factorize(identity)
+        first_id = index['next_id']
+        new_keys = np.array([f"E{first_id + i:07d}" for i in range(len(uniques))])
+        entity_key[new_rows] = new_keys[codes]
+        index['next_id'] = first_id + len(uniques)
+
+    # Register every identity seen so later extractions resolve by exact lookup
+    has_nif = nif.notna().to_numpy()
+    keys.update(zip(nif_key.to_numpy(dtype=object)[has_nif], entity_key[has_nif]))
+    keys.update(zip(register_key.to_numpy(dtype=object)[has_register], entity_key[has_register]))
+    latest = pd.DataFrame({'key': entity_key, 'name': names.to_numpy(dtype=object), 'address': street.to_numpy(dtype=object),
+                           'name_block': name_block.to_numpy(dtype=object), 'address_block': address_block.to_numpy(dtype=object)})
+    latest = latest.drop_duplicates('key', keep='last')
+    index['entities'].update(zip(latest['key'], latest.drop(columns='key').to_dict('records')))
+
+    return pd.Series(entity_key, index=df.index, dtype=str), pd.Series(method, index=df.index, dtype=str)
+
+def resolve_entities(df, index_path=ENTITY_INDEX_FILE, name_threshold=0.6, match_threshold=0.75, update_index=True):
+    """Asignar una clave estable por entidad real usando un índice persistente e incremental.
+
+    Orden de resolución: NIF normalizado, (tipo, nº de registro) y, para lo que quede sin
+    resolver, similitud de nombre y dirección solo entre candidatos del mismo bloque.
+    Devuelve (entity_key, método de resolución) alineados con df. Con update_index=False el
+    índice solo se lee (procesos en paralelo): las entidades nuevas reciben claves provisionales.
+    """
+    return _with_entity_index(lambda index: _resolve_with_index(df, index, name_threshold, match_threshold),
+                              index_path, update_index)
+
+def _with_entity_index(resolve, index_path=ENTITY_INDEX_FILE, update_index=True):
+    """Aplicar resolve(index) al índice de entidades; con update_index, bajo bloqueo y guardándolo una vez"""
+    if not update_index:
+        return resolve(_load_entity_index(index_path))
+    # Load, resolve and write under one lock: concurrent workers never hand out the same new key
+    with _file_lock(index_path):
+        index = _load_entity_index(index_path)
+        resolved = resolve(index)
+        try:
+            _write_json(index, index_path)
+        except OSError:
+            pass  # read-only deployments still get keys for this extraction
+    return resolved
+
+def load_extraction(path=DATA_FILE, update_index=True):
+    """Cargar, validar y preprocesar una extracción; devuelve (df, informe de calidad)"""
+    raw = pd.read_csv(path)
+    df, quality_report = validate_data(raw)
+    
+    # Parse capital social to numeric
+    df['capital_social_numeric'] = parse_spanish_number(df['capital_social']).astype(float)
+    
+    # Parse dates
+    df['fecha_extraccion'] = pd.to_datetime(df['fecha_extraccion'], errors='coerce')
+    df['fecha_registro'] = pd.to_datetime(df['fecha_registro'], format='%d/%m/%Y', errors='coerce')
+    
+    # Create derived columns
+    df['years_operating'] = (datetime.now() - df['fecha_registro']).dt.days / 365.25
+    df['total_services'] = df['num_servicios_inversion'].fillna(0) + df['num_servicios_auxiliares'].fillna(0)
+    df['has_international_presence'] = ((df['num_libre_prestacion_eee'] > 0) | 
+                                        (df['num_sucursales_eee'] > 0) | 
+                                        (df['num_libre_prestacion_fuera_eee'] > 0) | 
+                                        (df['num_sucursales_fuera_eee'] > 0))
+    
+    # Stable surrogate key per real-world entity across extractions
+    df['nif'] = normalize_nif(df['id'])
+    df['entity_key'], df['entity_match'] = resolve_entities(df, update_index=update_index)
+    
+    return df, quality_report
+
+SNAPSHOT_DIR = os.environ.get('SAV_EAF_SNAPSHOTS', 'snapshots')
+
+def list_snapshots(exclude_version=None):
+    """Extracciones disponibles: {etiqueta: ruta}, la actual primero y el histórico de SNAPSHOT_DIR después"""
+    snapshots = {f"Actual ({os.path.basename(DATA_FILE)})": DATA_FILE}
+    if os.path.isdir(SNAPSHOT_DIR):
+        for name in sorted(os.listdir(SNAPSHOT_DIR), reverse=True):
+            if exclude_version and name.endswith(f"_{exclude_version}.csv"):
+                continue  # archived copy of the current extraction
+            if name.endswith('.csv'):
+                snapshots[name] = os.path.join(SNAPSHOT_DIR, name)
+    return snapshots
+
+# Field groups tracked by the change feed: group -> columns compared
+DIFF_FIELDS = {
+    'capital': ['capital_social_numeric'],
+    'administradores': ['num_administradores', 'administradores'],
+    'socios': ['num_socios', 'socios_principales'],
+    'auditores': ['ultimo_auditor', 'auditores_unicos', 'ultimo_ejercicio_auditado'],
+    'instrumentos': ['instrumentos_activos'],
+    'servicios': ['servicios_inversion', 'servicios_auxiliares'],
+    'sucursales': ['num_sucursales_espana', 'sucursales_espana', 'num_sucursales_eee', 'num_sucursales_fuera_eee'],
+}
+DELTA_COLUMNS = ['entity_key', 'nombre', 'tipo_entidad', 'cambio', 'grupo', 'campo', 'valor_anterior', 'valor_nuevo']
+
+def _delta_text(values):
+    return _as_text(values.astype(object)).fillna('')
+
+def diff_snapshots(old, new):
+    """Delta entre dos extracciones alineadas por entity_key: altas, bajas y cambios campo a campo"""
+    tracked = ['entity_key', 'nombre', 'tipo_entidad'] + [col for cols in DIFF_FIELDS.values() for col in cols]
+    old = old[[col for col in tracked if col in old.columns]].drop_duplicates('entity_key', keep='last').set_index('entity_key')
+    new = new[[col for col in tracked if col in new.columns]].drop_duplicates('entity_key', keep='last').set_index('entity_key')
+
+    added = new.index.difference(old.index)
+    removed = old.index.difference(new.index)
+    common = new.index.intersection(old.index)
+    parts = [
+        pd.DataFrame({'entity_key': added, 'nombre': new.loc[added, 'nombre'].to_numpy(),
+                      'tipo_entidad': new.loc[added, 'tipo_entidad'].to_numpy(), 'cambio': 'alta'}),
+        pd.DataFrame({'entity_key': removed, 'nombre': old.loc[removed, 'nombre'].to_numpy(),
+                      'tipo_entidad': old.loc[removed, 'tipo_entidad'].to_numpy(), 'cambio': 'baja'}),
+    ]
+
+    before, after = old.iloc[old.index.get_indexer(common)], new.iloc[new.index.get_indexer(common)]
+    for group, columns in DIFF_FIELDS.items():
+        for column in columns:
+            if column not in before.columns or column not in after.columns:
+                continue
+            x, y = before[column], after[column]
+            # Column-wise comparison; two missing values count as equal
+            changed = ~((x == y).fillna(False).to_numpy(dtype=bool) | (x.isna().to_numpy() & y.isna().to_numpy()))
+            if not changed.any():
+                continue
+            keys = common[changed]
+            parts.append(pd.DataFrame({
+                'entity_key': keys,
+                'nombre': after['nombre'].to_numpy()[changed],
+                'tipo_entidad': after['tipo_entidad'].to_numpy()[changed],
+                'cambio': 'modificación',
+                'grupo': group,
+                'campo': column,
+                'valor_anterior': _delta_text(x[changed]).to_numpy(),
+                'valor_nuevo': _delta_text(y[changed]).to_numpy(),
+            }))
+
+    return pd.concat(parts, ignore_index=True).reindex(columns=DELTA_COLUMNS)
+
+def serialize_delta(delta, meta):
+    """Delta como JSON Lines comprimido: cabecera con metadatos + un cambio por línea"""
+    header = json.dumps({'meta': meta}, ensure_ascii=False) + '\n'
+    body = delta.to_json(orient='records', lines=True, force_ascii=False) if len(delta) else ''
+    return gzip.compress((header + body).encode('utf-8'))
+
+def write_delta(delta, meta, path):
+    """Guardar el delta en disco (.jsonl.gz)"""
+    with open(path, 'wb') as fh:
+        fh.write(serialize_delta(delta, meta))
+
+def archive_snapshot(df, data_version, path=DATA_FILE):
+    """Copiar la extracción actual a SNAPSHOT_DIR (una vez por versión) y devolver la ruta archivada"""
+    extraction = df['fecha_extraccion'].max()
+    stamp = extraction.strftime('%Y%m%d') if pd.notna(extraction) else 'sin_fecha'
+    target = os.path.join(SNAPSHOT_DIR, f"cnmv_entities_{stamp}_{data_version}.csv")
+    if not os.path.exists(target):
+        try:
+            os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+            shutil.copyfile(path, target)
+        except OSError:
+            return None
+    return target
+
+WATCHLIST_FILE = os.environ.get('SAV_EAF_WATCHLISTS', 'watchlists.json')
+# Field groups a watchlist can follow; 'registro' covers entities added to or removed from the register
+WATCH_GROUPS = list(DIFF_FIELDS) + ['registro']
+MAX_STORED_ALERTS = 5000
+
+def load_watch_store(path=WATCHLIST_FILE):
+    """Listas de vigilancia, alertas y versiones ya evaluadas (almacenadas en local)"""
+    try:
+        with open(path, encoding='utf-8') as fh:
+            return json.load(fh)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'watchlists': [], 'alerts': [], 'evaluated': [], 'baseline': None,
+                'next_alert_id': 1, 'next_watchlist_id': 1}
+
+def save_watch_store(store, path=WATCHLIST_FILE):
+    store['alerts'] = store['alerts'][-MAX_STORED_ALERTS:]
+    _write_json(store, path)
+
+@contextlib.contextmanager
+def updating_watch_store(path=WATCHLIST_FILE):
+    """Leer, modificar y guardar el almacén bajo bloqueo: with updating_watch_store() as store: ...
+
+    Cada worker relee el estado dentro del bloqueo, así que los cambios de otros procesos no se pierden.
+    """
+    with _file_lock(path):
+        store = load_watch_store(path)
+        yield store
+        save_watch_store(store, path)
+
+def evaluate_watchlists(watchlists, delta):
+    """Cruzar todas las reglas de todas las listas con el delta en una sola pasada (join vectorizado)"""
+    columns = ['watchlist', 'lista', 'entity_key', 'nombre', 'grupo', 'campo', 'valor_anterior', 'valor_nuevo', 'cambio']
+    if not watchlists or delta.empty:
+        return pd.DataFrame(columns=columns)
+
+    # One row per (watchlist, entity, field group) rule
+    rules = pd.DataFrame(watchlists)[['id', 'name', 'entities', 'groups']].rename(
+        columns={'id': 'watchlist', 'name': 'lista', 'entities': 'entity_key', 'groups': 'grupo'})
+    rules = rules.explode('entity_key').explode('grupo').dropna(subset=['entity_key', 'grupo'])
+
+    changes = delta.assign(grupo=delta['grupo'].fillna('registro'))
+    changes = changes[changes['entity_key'].isin(rules['entity_key'].unique())]
+    alerts = rules.merge(changes, on=['entity_key', 'grupo'], how='inner')
+    return alerts[columns]
+
+def record_alerts(store, alerts, old_version, new_version):
+    """Añadir alertas nuevas al almacén (una sola vez por par de versiones)"""
+    evaluation = f"{old_version}->{new_version}"
+    if evaluation in store['evaluated']:
+        return 0
+    created = datetime.now().isoformat(timespec='seconds')
+    first_id = store.get('next_alert_id', 1)
+    alerts = alerts.assign(id=np.arange(first_id, first_id + len(alerts)), versiones=evaluation, creada=created, leida=False)
+    records = alerts.astype(object).where(alerts.notna(), None).to_dict('records')
+    store['alerts'].extend(records)
+    store['evaluated'].append(evaluation)
+    store['next_alert_id'] = first_id + len(records)
+    return len(records)
+
+# Columns needed to place an extraction's entities on the lifetime timeline (identity + cohort attributes)
+ROSTER_COLUMNS = ['id', 'nombre', 'tipo_entidad', 'numero_registro', 'fecha_registro', 'fecha_extraccion',
+                  'atencion_provincia', 'atencion_cp', 'direccion_ciudad', 'atencion_direccion', 'direccion_calle']
+
+def _read_identity(path):
+    """Columnas de identidad y cohorte de una extracción y su fecha de extracción"""
+    roster = pd.read_csv(path, usecols=lambda col: col in ROSTER_COLUMNS)
+    roster = roster[roster['id'].notna() & roster['nombre'].notna()].reset_index(drop=True)
+    return roster, pd.to_datetime(roster['fecha_extraccion'], errors='coerce').dt.normalize().max()
+
+def read_rosters(paths, index_path=ENTITY_INDEX_FILE, update_index=True):
+    """Entidades presentes en cada extracción como [(roster, fecha de extracción)], de la más antigua a la más reciente.
+
+    Las claves se resuelven en orden cronológico en una sola pasada, con una única lectura y
+    escritura del índice: una extracción antigua leída después de otra más reciente no reclama
+    claves nuevas antes que ella.
+    """
+    return _resolve_rosters([_read_identity(path) for path in paths], index_path, update_index)
+
+def _resolve_rosters(identities, index_path=ENTITY_INDEX_FILE, update_index=True):
+    identities = sorted(identities, key=lambda item: item[1] if pd.notna(item[1]) else pd.Timestamp.max)
+
+    def resolve(index):
+        rosters = []
+        for roster, extraction in identities:
+            entity_key, _ = _resolve_with_index(roster, index)
+            rosters.append((pd.DataFrame({
+                'entity_key': entity_key,
+                'nombre': roster['nombre'],
+                'tipo_entidad': roster['tipo_entidad'],
+                'provincia': roster['atencion_provincia'].fillna('Sin provincia'),
+                'fecha_registro': pd.to_datetime(roster['fecha_registro'], format='%d/%m/%Y', errors='coerce'),
+            }).drop_duplicates('entity_key', keep='last'), extraction))
+        return rosters
+    return _with_entity_index(resolve, index_path, update_index)
+
+def read_roster(path, update_index=True):
+    """Entidades presentes en una extracción (lectura ligera de las columnas de identidad y cohorte)"""
+    return read_rosters([path], update_index=update_index)[0]
+
+def register_entities(paths, index_path=ENTITY_INDEX_FILE):
+    """Dar de alta en el índice las entidades de varias extracciones, en orden cronológico y con una sola escritura.
+
+    Después, los procesos que lo leen con update_index=False resuelven cada fila por búsqueda
+    exacta y obtienen las mismas claves, sea cual sea el orden de las filas o de las tareas.
+    """
+    identities = []
+    for path in paths:
+        try:
+            identities.append(_read_identity(path))
+        except (OSError, ValueError):
+            continue  # unreadable extraction: its loader reports the error
+    _resolve_rosters(identities, index_path)
+
+def snapshot_history(data_version):
+    """Histórico de extracciones como tupla de (ruta, versión): el archivo de SNAPSHOT_DIR más la actual"""
+    history = [(DATA_FILE, data_version)]
+    for path in list(list_snapshots(exclude_version=data_version).values())[1:]:
+        try:
+            history.append((path, get_data_version(path)))
+        except OSError:
+            continue
+    return tuple(sorted(set(history)))
+
+def build_lifetimes(rosters):
+    """Vidas registrales por entidad a partir del histórico de extracciones.
+
+    Recibe (roster, fecha de extracción) por extracción; la presencia se comprime en
+    tramos continuos [primera, última extracción] indexados con un IntervalIndex, de modo
+    que el stock en cualquier fecha es una búsqueda binaria y no un nuevo recorrido.
+    """
+    frames, extractions = [], []
+    for roster, extraction in rosters:
+        if pd.isna(extraction):
+            continue
+        frames.append(roster.assign(extraccion=extraction))
+        extractions.append(extraction)
+    if not frames:
+        return pd.DataFrame(), pd.DatetimeIndex([])
+
+    dates = pd.DatetimeIndex(sorted(set(extractions)))
+    presence = pd.concat(frames, ignore_index=True)
+    presence['t'] = dates.get_indexer(presence['extraccion'])
+    presence = presence.sort_values(['entity_key', 't']).drop_duplicates(['entity_key', 't'], keep='last')
+
+    # A new spell starts when the entity changes or skips at least one extraction
+    keys, t = presence['entity_key'].to_numpy(), presence['t'].to_numpy()
+    new_spell = np.ones(len(presence), dtype=bool)
+    new_spell[1:] = (keys[1:] != keys[:-1]) | (t[1:] != t[:-1] + 1)
+    presence['spell'] = np.cumsum(new_spell)
+
+    spells = presence.groupby('spell', sort=False).agg(
+        entity_key=('entity_key', 'first'), nombre=('nombre', 'last'), tipo_entidad=('tipo_entidad', 'last'),
+        provincia=('provincia', 'last'), fecha_registro=('fecha_registro', 'last'), inicio=('t', 'first'), fin=('t', 'last'),
+    ).reset_index(drop=True)
+    spells.index = pd.IntervalIndex.from_arrays(spells['inicio'], spells['fin'], closed='both', name='extracciones')
+
+    last = len(dates) - 1
+    spells['activa'] = spells['fin'] == last
+    spells['primera_extraccion'] = dates[spells['inicio'].to_numpy()]
+    spells['ultima_extraccion'] = dates[spells['fin'].to_numpy()]
+    # Deregistration is dated at the first extraction the entity is missing from
+    spells['fecha_baja'] = dates[np.minimum(spells['fin'].to_numpy() + 1, last)].where(~spells['activa'].to_numpy())
+    return spells, dates
+
+def stock_by_extraction(lifetimes, dates):
+    """Entidades registradas en cada extracción: número de tramos que contienen cada fecha"""
+    starts = np.sort(lifetimes.index.left.to_numpy())
+    ends = np.sort(lifetimes.index.right.to_numpy())
+    t = np.arange(len(dates))
+    return pd.Series(np.searchsorted(starts, t, side='right') - np.searchsorted(ends, t, side='left'), index=dates)
+
+def life_table(durations, events, max_age):
+    """Supervivencia actuarial por años completos desde el registro (Kaplan-Meier discreto)"""
+    ages = np.clip(np.floor(durations).astype(int), 0, max_age)
+    deaths = np.bincount(ages[events], minlength=max_age + 1)
+    exits = np.bincount(ages, minlength=max_age + 1)
+    at_risk = exits[::-1].cumsum()[::-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hazard = np.where(at_risk > 0, deaths / at_risk, np.nan)
+    survival = np.concatenate([[1.0], np.cumprod(1 - hazard)])[:-1]
+    return pd.Series(np.where(at_risk > 0, survival, np.nan), index=np.arange(max_age + 1))
+
+COHORT_DIMENSIONS = {'tipo_entidad': 'Tipo de Entidad', 'provincia': 'Provincia', 'cohorte': 'Década de Registro'}
+
+def cohort_tables(rosters):
+    """Flujos de altas/bajas, curvas de supervivencia y matriz de cohortes a partir de los rosters"""
+    lifetimes, dates = build_lifetimes(rosters)
+    if lifetimes.empty:
+        return None
+
+    # Entity-level view: registration from the register, exit from the last spell
+    entities = lifetimes.sort_values('fin').drop_duplicates('entity_key', keep='last').reset_index(drop=True)
+    entities = entities[entities['fecha_registro'].notna()].copy()
+    entities['año_registro'] = entities['fecha_registro'].dt.year
+    entities['año_baja'] = entities['fecha_baja'].dt.year
+    entities['cohorte'] = (entities['año_registro'] // 10 * 10).astype(str) + 's'
+    end = entities['fecha_baja'].fillna(dates[-1])
+    entities['años_vida'] = ((end - entities['fecha_registro']).dt.days / 365.25).clip(lower=0)
+
+    registrations = entities.groupby(['año_registro', 'tipo_entidad']).size().rename('altas')
+    deregistrations = entities.dropna(subset=['año_baja']).groupby(['año_baja', 'tipo_entidad']).size().rename('bajas')
+    flows = pd.concat([registrations.rename_axis(['año', 'tipo_entidad']),
+                       deregistrations.rename_axis(['año', 'tipo_entidad'])], axis=1).fillna(0).astype(int).reset_index()
+    flows['año'] = flows['año'].astype(int)
+
+    # Survival curves per group of every dimension: one life table per group, no per-entity loop
+    max_age = int(np.ceil(entities['años_vida'].max())) if len(entities) else 0
+    durations, events = entities['años_vida'].to_numpy(), entities['fecha_baja'].notna().to_numpy()
+    survival = {}
+    for dimension in COHORT_DIMENSIONS:
+        codes, groups = pd.factorize(entities[dimension])
+        curves = {group: life_table(durations[codes == i], events[codes == i], max_age) for i, group in enumerate(groups)}
+        sizes = np.bincount(codes, minlength=len(groups))
+        survival[dimension] = (pd.DataFrame(curves).T, pd.Series(sizes, index=groups))
+
+    # Cohort triangle: registration year x years since registration, observable cells only
+    codes, cohorts = pd.factorize(entities['año_registro'], sort=True)
+    triangle = pd.DataFrame({cohort: life_table(durations[codes == i], events[codes == i], max_age)
+                             for i, cohort in enumerate(cohorts)}).T
+    observable = (dates[-1].year - triangle.index.to_numpy()[:, None]) >= triangle.columns.to_numpy()[None, :]
+    triangle = triangle.where(observable)
+
+    meta = {
+        'extracciones': len(dates),
+        'primera': dates[0],
+        'ultima': dates[-1],
+        'entidades': int(entities['entity_key'].nunique()),
+        'bajas': int(events.sum()),
+        'tramos': len(lifetimes),
+    }
+    return {'flows': flows, 'survival': survival, 'triangle': triangle, 'stock': stock_by_extraction(lifetimes, dates),
+            'entities': entities, 'meta': meta}
+
+# Composite scoring features: (column label, description)
+SCORE_FEATURES = [
+    ('Capital Social', 'Capital social (escala logarítmica)'),
+    ('Amplitud de Servicios', 'Servicios de inversión + auxiliares'),
+    ('Instrumentos', 'Número de instrumentos financieros autorizados'),
+    ('Recencia de Auditoría', 'Último ejercicio auditado'),
+    ('Sin Limitaciones', 'Penaliza limitaciones registradas'),
+    ('FOGAIN', 'Adhesión al Fondo de Garantía de Inversiones'),
+    ('Alcance Internacional', 'Libre prestación y sucursales fuera de España'),
+]
+
+def _min_max(values):
+    """Normalizar un array al rango [0, 1] (NaN -> 0)"""
+    values = np.asarray(values, dtype=np.float64)
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    if not np.isfinite(lo) or hi <= lo:
+        return np.zeros(len(values), dtype=np.float32)
+    return np.nan_to_num((values - lo) / (hi - lo), nan=0.0).astype(np.float32)
+
+def score_features(df):
+    """Matriz float32 pre-normalizada (entidades x SCORE_FEATURES) para el ranking compuesto"""
+    limitations = df['num_limitaciones'].fillna(0).where(df['tiene_limitaciones'] == 'Sí', 0)
+    international = (df['num_libre_prestacion_eee'].fillna(0) + df['num_libre_prestacion_fuera_eee'].fillna(0) +
+                     df['num_sucursales_eee'].fillna(0) + df['num_sucursales_fuera_eee'].fillna(0))
+
+    columns = [
+        _min_max(np.log1p(df['capital_social_numeric'])),
+        _min_max(df['total_services']),
+        _min_max(df['num_instrumentos']),
+        _min_max(df['ultimo_ejercicio_auditado']),
+        1.0 - _min_max(limitations),
+        (df['fogain'] == 'Sí').to_numpy(dtype=np.float32),
+        _min_max(np.log1p(international)),
+    ]
+    return np.ascontiguousarray(np.column_stack(columns), dtype=np.float32)
+
+def rank_entities(features, weights, k):
+    """Puntuar todas las entidades (producto matriz-vector) y devolver (puntuaciones, top-k ordenado)"""
+    weights = np.asarray(weights, dtype=np.float32)
+    total = weights.sum()
+    if total <= 0:
+        scores = np.zeros(features.shape[0], dtype=np.float32)
+    else:
+        scores = features @ (weights * (100.0 / total))
+
+    k = min(k, len(scores))
+    if k == 0:
+        return scores, np.array([], dtype=np.intp)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return scores, top[np.argsort(-scores[top], kind='stable')]
+
+# Segmentation feature groups available to the clustering mode
+SEGMENT_FEATURE_GROUPS = ['Servicios', 'Instrumentos', 'Tipos de Cliente', 'Capital', 'Geografía']
+
+def build_segment_features(df, feature_groups):
+    """Matriz de características (float32) para clustering y nombres de columna"""
+    blocks = []
+    for group in feature_groups:
+        if group == 'Servicios':
+            services = df['servicios_inversion'].fillna('') + '; ' + df['servicios_auxiliares'].fillna('')
+            block = services.str.strip('; ').str.get_dummies(sep='; ')
+        elif group == 'Instrumentos':
+            block = df['instrumentos_activos'].fillna('').str.replace(' ', '').str.get_dummies(sep=',')
+            block = block.reindex(columns=list('abcdefghijk'), fill_value=0)
+            block.columns = [f'Instrumento {code}' for code in block.columns]
+        elif group == 'Tipos de Cliente':
+            block = df['tipos_clientes'].fillna('').str.get_dummies(sep='; ')
+        elif group == 'Capital':
+            block = pd.DataFrame({'Capital (log)': _min_max(np.log1p(df['capital_social_numeric']))}, index=df.index)
+        elif group == 'Geografía':
+            provinces = df['direccion_provincia'].fillna(df['atencion_provincia']).str.upper().fillna('N/D')
+            top_provinces = provinces.value_counts().index[:10]
+            provinces = provinces.where(provinces.isin(top_provinces), 'OTRAS')
+            block = pd.get_dummies(provinces, prefix='Provincia', prefix_sep=' ')
+            block['Presencia Internacional'] = df['has_international_presence']
+        else:
+            raise ValueError(f"Grupo de características desconocido: {group}")
+
+        block = block.astype(np.float32)
+        # Each group weighs the same regardless of how many columns it expands to
+        blocks.append(block / np.sqrt(max(block.shape[1], 1)))
+
+    features = pd.concat(blocks, axis=1)
+    return np.ascontiguousarray(features.to_numpy(dtype=np.float32)), features.columns.tolist()
+
+def _assign_clusters(X, centers, chunk_size=65536):
+    """Asignar cada fila al centroide más cercano, por bloques para acotar memoria"""
+    labels = np.empty(X.shape[0], dtype=np.int32)
+    distances = np.empty(X.shape[0], dtype=np.float32)
+    center_norms = (centers ** 2).sum(axis=1)
+    for start in range(0, X.shape[0], chunk_size):
+        chunk = X[start:start + chunk_size]
+        d2 = (chunk ** 2).sum(axis=1)[:, None] - 2 * chunk @ centers.T + center_norms[None, :]
+        labels[start:start + chunk_size] = d2.argmin(axis=1)
+        distances[start:start + chunk_size] = np.maximum(d2.min(axis=1), 0)
+    return labels, distances
+
+def minibatch_kmeans(X, k, batch_size=1024, max_iter=200, tol=1e-5, seed=42):
+    """K-means por mini-lotes (Sculley, 2010): actualización incremental de centroides"""
+    rng = np.random.default_rng(seed)
+    n = X.shape[0]
+    k = min(k, n)
+
+    # k-means++ seeding on a bounded sample
+    sample = X[rng.choice(n, min(n, 10 * batch_size), replace=False)]
+    centers = np.empty((k, X.shape[1]), dtype=np.float32)
+    centers[0] = sample[rng.integers(len(sample))]
+    closest = ((sample - centers[0]) ** 2).sum(axis=1)
+    for i in range(1, k):
+        total = closest.sum()
+        pick = rng.choice(len(sample), p=closest / total) if total > 0 else rng.integers(len(sample))
+        centers[i] = sample[pick]
+        closest = np.minimum(closest, ((sample - centers[i]) ** 2).sum(axis=1))
+
+    counts = np.zeros(k, dtype=np.float64)
+    for _ in range(max_iter):
+        batch = X[rng.choice(n, min(batch_size, n), replace=False)]
+        labels, _ = _assign_clusters(batch, centers)
+        batch_counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, batch)
+
+        # Per-centre learning rate 1/count keeps each centroid a running mean
+        counts += batch_counts
+        hit = batch_counts > 0
+        eta = (batch_counts[hit] / counts[hit]).astype(np.float32)[:, None]
+        updated = centers.copy()
+        updated[hit] = (1 - eta) * centers[hit] + eta * (sums[hit] / batch_counts[hit][:, None])
+
+        shift = float(((updated - centers) ** 2).sum())
+        centers = updated
+        if shift < tol:
+            break
+
+    labels, distances = _assign_clusters(X, centers)
+    return centers, labels, float(distances.sum())
+
+INSTRUMENTS = {
+    'a': 'Valores negociables',
+    'b': 'Mercado monetario',
+    'c': 'Fondos inversión',
+    'd': 'Derivados valores/divisas',
+    'e': 'Derivados materias primas (efectivo)',
+    'f': 'Derivados materias primas (físico)',
+    'g': 'Otros derivados materias primas',
+    'h': 'Derivados de crédito',
+    'i': 'CFDs',
+    'j': 'Derivados clima/inflación',
+    'k': 'Derechos emisión'
+}
+INSTRUMENT_CODES = list(INSTRUMENTS)
+INSTRUMENT_BITS = {code: 1 << i for i, code in enumerate(INSTRUMENT_CODES)}
+# Popcount lookup for every possible 11-bit instrument mask
+POPCOUNT = np.array([bin(m).count('1') for m in range(1 << len(INSTRUMENT_CODES))], dtype=np.uint8)
+
+def decode_instruments(mask):
+    """Convertir un bitmask de instrumentos en 'a, b, c'"""
+    return ', '.join(code for code, bit in INSTRUMENT_BITS.items() if int(mask) & bit)
+
+def instrument_masks(df):
+    """Bitmask uint16 de instrumentos activos por entidad (bit i = INSTRUMENT_CODES[i])"""
+    codes = df['instrumentos_activos'].reset_index(drop=True).fillna('').str.replace(' ', '').str.split(',').explode()
+    bits = codes.map(INSTRUMENT_BITS).dropna()
+    masks = np.zeros(len(df), dtype=np.uint16)
+    np.bitwise_or.at(masks, bits.index.to_numpy(), bits.to_numpy(dtype=np.uint16))
+    return masks
+
+def _itemset_support(values, counts, itemsets):
+    """Entidades que contienen cada itemset (AND sobre los bundles distintos)"""
+    itemsets = np.asarray(itemsets, dtype=np.uint16)
+    contains = (values[:, None] & itemsets[None, :]) == itemsets[None, :]
+    return counts @ contains
+
+def instrument_cooccurrence(masks):
+    """Matriz de co-ocurrencia 11x11 a partir de los bitmasks"""
+    # At most 2^11 distinct bundles: work on those, weighted by how often each appears
+    values, counts = np.unique(masks, return_counts=True)
+    bits = np.array(list(INSTRUMENT_BITS.values()), dtype=np.uint16)
+    pairs = bits[:, None] | bits[None, :]
+    matrix = _itemset_support(values, counts, pairs.ravel()).reshape(pairs.shape)
+    return pd.DataFrame(matrix, index=INSTRUMENT_CODES, columns=INSTRUMENT_CODES)
+
+def instrument_rules(masks, min_support=0.05, min_confidence=0.5):
+    """Reglas de asociación {antecedente} -> consecuente con soporte, confianza y lift"""
+    values, counts = np.unique(masks, return_counts=True)
+    n = counts.sum()
+    if n == 0:
+        return pd.DataFrame(columns=['Antecedente', 'Consecuente', 'Soporte', 'Confianza', 'Lift', 'Entidades'])
+
+    bits = np.array(list(INSTRUMENT_BITS.values()), dtype=np.uint16)
+    all_masks = np.arange(1 << len(bits), dtype=np.uint16)
+    # Antecedents of one or two instruments
+    antecedents = all_masks[(POPCOUNT >= 1) & (POPCOUNT <= 2)]
+    antecedent, consequent = np.meshgrid(antecedents, bits, indexing='ij')
+    antecedent, consequent = antecedent.ravel(), consequent.ravel()
+    keep = (antecedent & consequent) == 0
+    antecedent, consequent = antecedent[keep], consequent[keep]
+
+    support_rule = _itemset_support(values, counts, antecedent | consequent)
+    support_antecedent = _itemset_support(values, counts, antecedent)
+    support_consequent = _itemset_support(values, counts, consequent)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        confidence = np.where(support_antecedent > 0, support_rule / support_antecedent, 0.0)
+        lift = np.where(support_consequent > 0, confidence / (support_consequent / n), 0.0)
+    support = support_rule / n
+
+    selected = np.flatnonzero((support >= min_support) & (confidence >= min_confidence))
+    selected = selected[np.lexsort((-confidence[selected], -lift[selected]))]
+    return pd.DataFrame({
+        'Antecedente': [decode_instruments(m) for m in antecedent[selected]],
+        'Consecuente': [decode_instruments(m) for m in consequent[selected]],
+        'Soporte': support[selected].round(3),
+        'Confianza': confidence[selected].round(3),
+        'Lift': lift[selected].round(3),
+        'Entidades': support_rule[selected],
+    })
+
+def instrument_bundles(masks, top=10):
+    """Combinaciones completas de instrumentos más frecuentes"""
+    values, counts = np.unique(masks[masks > 0], return_counts=True)
+    order = np.argsort(-counts, kind='stable')[:top]
+    return pd.DataFrame({
+        'Combinación': [decode_instruments(m) for m in values[order]],
+        'Nº Instrumentos': POPCOUNT[values[order]],
+        'Entidades': counts[order],
+    })
+
+def segment_entities(df, k, feature_groups):
+    """Clustering k-means y perfil de cada segmento"""
+    X, feature_names = build_segment_features(df, feature_groups)
+    centers, labels, inertia = minibatch_kmeans(X, k)
+
+    clusters = pd.Series(labels, index=df.index, name='Segmento')
+    grouped = df.groupby(clusters)
+    profiles = pd.DataFrame({
+        'Entidades': grouped.size(),
+        '% SAV': grouped['tipo_entidad'].apply(lambda s: (s == 'SAV').mean() * 100),
+        'Capital Medio (€M)': grouped['capital_social_numeric'].mean() / 1e6,
+        'Media Servicios': grouped['total_services'].mean(),
+        'Media Instrumentos': grouped['num_instrumentos'].mean(),
+        '% Internacional': grouped['has_international_presence'].mean() * 100,
+        'Provincia Principal': grouped['direccion_provincia'].agg(
+            lambda s: s.str.upper().mode().iat[0] if s.notna().any() else 'N/D'),
+    }).round(2)
+
+    # Cluster means of the feature matrix, and what sets each cluster apart
+    X_df = pd.DataFrame(X, columns=feature_names, index=df.index)
+    centroids = X_df.groupby(clusters).mean()
+    lift = centroids - X_df.mean()
+    profiles['Rasgos Distintivos'] = [
+        ', '.join(lift.loc[c].nlargest(3).index) for c in profiles.index
+    ]
+    segment_ids = profiles.index.tolist()
+    profiles.index = [f'Segmento {c + 1}' for c in segment_ids]
+    centroids.index = profiles.index
+
+    return {
+        'labels': labels,
+        'segment_ids': segment_ids,
+        'centers': centers,
+        'centroids': centroids,
+        'profiles': profiles,
+        'inertia': inertia,
+    }
+
+# Explorer table: every column available, a compact default selection
+EXPLORER_COLUMNS = ['nombre', 'tipo_entidad', 'numero_registro', 'fecha_registro',
+                    'direccion_provincia', 'direccion_ciudad', 'direccion_calle',
+                    'capital_social', 'fogain',
+                    'num_servicios_inversion', 'num_servicios_auxiliares',
+                    'num_instrumentos', 'instrumentos_activos',
+                    'tipos_clientes',
+                    'titular_nombre', 'titular_telefono', 'titular_email', 'titular_web',
+                    'atencion_direccion', 'atencion_localidad', 'atencion_provincia',
+                    'num_auditorias', 'ultimo_ejercicio_auditado', 'ultimo_auditor',
+                    'num_socios', 'num_administradores', 'num_agentes',
+                    'num_sucursales_espana', 'num_sucursales_eee', 'num_libre_prestacion_eee',
+                    'tiene_limitaciones', 'tiene_reglamento']
+EXPLORER_DEFAULT_COLUMNS = ['nombre', 'tipo_entidad', 'numero_registro', 'fecha_registro', 'direccion_provincia',
+                            'capital_social', 'num_servicios_inversion', 'num_instrumentos', 'instrumentos_activos']
+# Sort keys: numeric counterpart where the display column is text
+EXPLORER_SORT_KEYS = {'capital_social': 'capital_social_numeric'}
+
+def explorer_mask(df, entity_type=None, province=None, capital_range=None, international=None,
+                  instrument=None, instruments_range=None, search=None):
+    """Máscara booleana de los filtros del explorador (None = sin filtro).
+
+    Las entidades sin capital (EAF) no se descartan por el rango de capital.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if entity_type:
+        mask &= (df['tipo_entidad'] == entity_type).to_numpy()
+    if province:
+        mask &= (df['atencion_provincia'] == province).fillna(False).to_numpy(dtype=bool)
+    if capital_range is not None:
+        capital = df['capital_social_numeric']
+        mask &= (capital.between(*capital_range) | capital.isna()).to_numpy()
+    if international is not None:
+        mask &= (df['has_international_presence'] == international).to_numpy(dtype=bool)
+    if instrument:
+        mask &= df['instrumentos_activos'].str.contains(instrument, regex=False, na=False).to_numpy(dtype=bool)
+    if instruments_range is not None:
+        mask &= df['num_instrumentos'].between(*instruments_range).to_numpy()
+    if search:
+        mask &= df['nombre'].str.contains(search, case=False, regex=False, na=False).to_numpy(dtype=bool)
+    return mask
+
+def name_search_index(df):
+    """Nombres en mayúsculas sin acentos por posición de fila, para buscar entidades por texto"""
+    return _collapse_spaces(_upper_ascii(df['nombre'])).to_numpy(dtype=object)
+
+def search_names(names, text, limit=20):
+    """Posiciones (como mucho limit) cuyo nombre contiene text, sin distinguir mayúsculas ni acentos"""
+    query = _collapse_spaces(_upper_ascii(pd.Series([text]))).iat[0]
+    if not query:
+        return np.array([], dtype=np.intp)
+    return np.flatnonzero([query in name for name in names])[:limit]
+
+def sort_permutations(df, columns):
+    """Permutación ascendente de filas por columna (nulos al final).
+
+    Devuelve {columna: (permutación, nº de valores no nulos)} en posiciones de fila de df.
+    """
+    permutations = {}
+    for column in columns:
+        values = df[EXPLORER_SORT_KEYS.get(column, column)].reset_index(drop=True)
+        if values.dtype == object or pd.api.types.is_string_dtype(values):
+            values = values.str.casefold()
+        order = values.sort_values(kind='stable', na_position='last').index.to_numpy()
+        permutations[column] = (order, int(values.notna().sum()))
+    return permutations
+
+def paginate_rows(permutation, selected, ascending, page, page_size):
+    """Posiciones de la página pedida dentro de las filas seleccionadas, en el orden de la permutación.
+
+    `selected` es una máscara booleana sobre las filas de df: filtrar una permutación ya ordenada
+    es O(n) y evita ordenar el subconjunto filtrado en cada interacción.
+    """
+    order, non_null = permutation
+    if not ascending:
+        order = np.concatenate([order[:non_null][::-1], order[non_null:]])
+    ordered = order[selected[order]]
+    start = (page - 1) * page_size
+    return ordered[start:start + page_size], len(ordered)
+
+def _card_line(label, values, optional=False):
+    """Una línea Markdown de tarjeta por entidad; vacía si el valor falta y es opcional"""
+    line = f"**{label}:** " + _as_text(values.astype(object)).fillna('N/D') + '\n\n'
+    return line.where(values.notna(), '') if optional else line
+
+def entity_cards(df):
+    """Fichas de entidad prerrenderizadas (título + tres columnas Markdown), una fila por entidad"""
+    registered = df['fecha_registro'].dt.strftime('%d/%m/%Y')
+    capital = ('€' + _as_text(df['capital_social'])).where(df['capital_social'].notna(), '€N/D')
+    instruments = ("<code style='background: #0F172A; color: #60A5FA; padding: 2px 4px; border-radius: 4px;'>"
+                   + _as_text(df['instrumentos_activos']) + "</code>").fillna('*No especificado*')
+    audits = df['num_auditorias'].astype('Int64')
+    last_audit = df['ultimo_ejercicio_auditado'].astype('Int64')
+
+    return pd.DataFrame({
+        'titulo': '🏢 ' + _as_text(df['nombre']),
+        'col1': (_card_line('Tipo', df['tipo_entidad']) + _card_line('Nº Registro', df['numero_registro'])
+                 + _card_line('Fecha Registro', registered) + _card_line('FOGAIN', df['fogain'])
+                 + _card_line('Contacto', df['titular_nombre'], optional=True)
+                 + _card_line('Teléfono', df['titular_telefono'], optional=True)),
+        'col2': ('**Capital Social:** ' + capital + '\n\n' + _card_line('Provincia', df['direccion_provincia'])
+                 + _card_line('Servicios Inversión', df['num_servicios_inversion'])
+                 + _card_line('Servicios Auxiliares', df['num_servicios_auxiliares'])
+                 + _card_line('Email', df['titular_email'], optional=True)
+                 + _card_line('Web', df['titular_web'], optional=True)),
+        'col3': (_card_line('Total Instrumentos', df['num_instrumentos']) + '**Instrumentos Activos:**\n\n'
+                 + instruments + '\n\n' + _card_line('Auditorías', audits, optional=True)
+                 + _card_line('Última Auditoría', last_audit, optional=True)
+                 + _card_line('Tipos Clientes', df['tipos_clientes'], optional=True)),
+    }).reset_index(drop=True)
+
+def quick_stats(df, masks):
+    """Totales por tipo y entidades que ofrecen los instrumentos a, b y c"""
+    entity_types = df['tipo_entidad'].value_counts()
+    return {
+        'total': len(df),
+        'SAV': int(entity_types.get('SAV', 0)),
+        'EAF': int(entity_types.get('EAF', 0)),
+        'instruments': {code: int(np.count_nonzero(masks & INSTRUMENT_BITS[code])) for code in ['a', 'b', 'c']},
+    }
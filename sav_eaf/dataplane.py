@@ -0,0 +1,179 @@
+"""Plano de datos compartido entre procesos: la extracción preprocesada y sus estructuras derivadas
+en ficheros mapeados en memoria, un directorio por versión de datos.
+
+    python -m sav_eaf publish [--data CSV] [--root DIR]
+
+El primer proceso que lo necesita (o `publish` antes de arrancar los workers) carga y preprocesa
+la extracción una sola vez y publica en <root>/<data_version>/:
+
+    texto.arrow               columnas de texto (Arrow IPC sin compresión)
+    columnas/<n>.npy          columnas numéricas, booleanas y de fecha, y el índice
+    instrument_masks.npy      bitmask uint16 de instrumentos por entidad
+    score_features.npy        matriz float32 del ranking compuesto
+    orden/<n>.npy             permutaciones de ordenación del explorador
+    resumenes/, calidad/      agregados de SUMMARIES e informe de calidad (sav_eaf.export)
+    manifest.json
+
+Los demás procesos lo abren con memory-map de solo lectura y sin copia: las páginas son las de la
+caché del sistema, compartidas por todos los workers, así que la memoria de cada uno no crece con
+el número de workers. Con copy-on-write de pandas, escribir sobre el DataFrame resultante copia
+solo la columna afectada y nunca toca los ficheros. La publicación es atómica (directorio
+temporal + rename) y se serializa con un flock: varios workers que arrancan a la vez publican una vez.
+"""
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock, the atomic rename still keeps a single winner
+    fcntl = None
+
+from sav_eaf.core import (
+    DATA_FILE, EXPLORER_COLUMNS, get_data_version, instrument_masks, load_extraction, score_features,
+    sort_permutations,
+)
+from sav_eaf.export import open_arrow_tables, write_arrow_tables
+from sav_eaf.summaries import summarize
+
+DATA_PLANE_DIR = os.environ.get('SAV_EAF_DATA_PLANE')
+QUALITY_TABLES = ['summary', 'issues', 'quarantine']
+
+def _is_mappable(series):
+    """Columnas que se guardan como .npy: dtype NumPy de tamaño fijo (números, booleanos, fechas)"""
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufmM'
+
+def _write_plane(out_dir, df, quality_report, meta):
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    os.makedirs(os.path.join(out_dir, 'columnas'))
+    os.makedirs(os.path.join(out_dir, 'orden'))
+    mapped = [column for column in df.columns if _is_mappable(df[column])]
+    other = [column for column in df.columns if column not in mapped]
+    for i, column in enumerate(mapped):
+        np.save(os.path.join(out_dir, 'columnas', f"{i}.npy"), np.ascontiguousarray(df[column].to_numpy()))
+    np.save(os.path.join(out_dir, 'columnas', 'index.npy'), df.index.to_numpy())
+    feather.write_feather(pa.Table.from_pandas(df[other], preserve_index=False), os.path.join(out_dir, 'texto.arrow'),
+                          compression='uncompressed')
+
+    np.save(os.path.join(out_dir, 'instrument_masks.npy'), instrument_masks(df))
+    np.save(os.path.join(out_dir, 'score_features.npy'), score_features(df))
+    sortable = [column for column in EXPLORER_COLUMNS if column in df.columns]
+    non_null = {}
+    for i, (column, (order, count)) in enumerate(sort_permutations(df, sortable).items()):
+        np.save(os.path.join(out_dir, 'orden', f"{i}.npy"), order)
+        non_null[column] = count
+
+    write_arrow_tables(summarize(df, quality_report), os.path.join(out_dir, 'resumenes'), meta)
+    write_arrow_tables({name: quality_report[name] for name in QUALITY_TABLES}, os.path.join(out_dir, 'calidad'), meta)
+
+    manifest = {
+        **meta,
+        'filas': len(df),
+        'columnas': list(df.columns),
+        'mapeadas': mapped,
+        'texto': other,
+        'orden': {column: [i, count] for i, (column, count) in enumerate(non_null.items())},
+        'calidad': {key: value for key, value in quality_report.items() if key not in QUALITY_TABLES},
+    }
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, ensure_ascii=False, indent=1)
+
+def publish(path=DATA_FILE, data_version=None, root=DATA_PLANE_DIR, update_index=True):
+    """Publicar la extracción en <root>/<data_version> si aún no existe; devuelve el directorio"""
+    data_version = data_version or get_data_version(path)
+    target = os.path.join(root, data_version)
+    if os.path.exists(os.path.join(target, 'manifest.json')):
+        return target
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, '.lock'), 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        # Another process may have published while this one waited for the lock
+        if os.path.exists(os.path.join(target, 'manifest.json')):
+            return target
+        staging = tempfile.mkdtemp(prefix=f".{data_version}-", dir=root)
+        try:
+            df, quality_report = load_extraction(path, update_index=update_index)
+            extraction = df['fecha_extraccion'].max()
+            meta = {
+                'data_version': data_version,
+                'fuente': os.path.abspath(path),
+                'fecha_extraccion': None if pd.isna(extraction) else extraction.isoformat(),
+                'creado': pd.Timestamp.now().isoformat(timespec='seconds'),
+            }
+            _write_plane(staging, df, quality_report, meta)
+            os.rename(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            if os.path.exists(os.path.join(target, 'manifest.json')):
+                return target
+            raise
+    return target
+
+class DataPlane:
+    """Vista de solo lectura, sin copia, de una versión publicada"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as fh:
+            self.manifest = json.load(fh)
+        self.data_version = self.manifest['data_version']
+        self.frame = self._frame()
+        self.quality_report = self._quality_report()
+        self.instrument_masks = self.array('instrument_masks')
+        self.score_features = self.array('score_features')
+
+    def array(self, name):
+        """Array .npy del plano, mapeado en memoria y de solo lectura"""
+        # Plain ndarray view on the memmap, so pandas and NumPy never see the memmap subclass
+        return np.asarray(np.load(os.path.join(self.directory, f"{name}.npy"), mmap_mode='r'))
+
+    def _frame(self):
+        import pyarrow as pa
+
+        # Text columns stay Arrow-backed on the mapped buffers (pandas str dtype wraps them without copying)
+        text = pa.ipc.open_file(pa.memory_map(os.path.join(self.directory, 'texto.arrow'), 'r')).read_all().to_pandas()
+        columns = {column: text[column] for column in self.manifest['texto']}
+        for i, column in enumerate(self.manifest['mapeadas']):
+            columns[column] = self.array(f"columnas/{i}")
+        index = pd.Index(self.array('columnas/index'))
+        frame = pd.DataFrame({column: columns[column] for column in self.manifest['columnas']}, copy=False)
+        frame.index = index
+        return frame
+
+    def _quality_report(self):
+        tables = open_arrow_tables(os.path.join(self.directory, 'calidad'))
+        return {**{name: tables[name].to_pandas() for name in QUALITY_TABLES}, **self.manifest['calidad']}
+
+    def sort_permutations(self, columns):
+        """{columna: (permutación, nº de no nulos)} como sav_eaf.core.sort_permutations"""
+        entries = self.manifest['orden']
+        return {column: (self.array(f"orden/{entries[column][0]}"), entries[column][1]) for column in columns}
+
+    def has_sort_permutations(self, columns):
+        return all(column in self.manifest['orden'] for column in columns)
+
+    def summaries(self, names=None):
+        """Agregados publicados: {nombre: DataFrame}"""
+        return {name: table.to_pandas() for name, table in open_arrow_tables(os.path.join(self.directory, 'resumenes'),
+                                                                            names).items()}
+
+def open_plane(path=DATA_FILE, data_version=None, root=DATA_PLANE_DIR, update_index=True):
+    """Publicar (si hace falta) y abrir la versión de path"""
+    return DataPlane(publish(path, data_version, root, update_index))
+
+def prune_planes(root=DATA_PLANE_DIR, keep=()):
+    """Borrar las versiones publicadas que no estén en keep (los procesos que aún las mapean no se ven afectados)"""
+    removed = []
+    for name in os.listdir(root):
+        directory = os.path.join(root, name)
+        if os.path.isdir(directory) and not name.startswith('.') and name not in keep:
+            shutil.rmtree(directory, ignore_errors=True)
+            removed.append(name)
+    return removed
@@ -0,0 +1,163 @@
+"""Exportación por bloques de filas a CSV, Parquet y XLSX, y de tablas completas a Arrow IPC.
+
+Las filas se seleccionan por posición sobre el DataFrame original y se serializan de
+CHUNK_ROWS en CHUNK_ROWS directamente al destino, sin construir la tabla completa en memoria.
+El fichero terminado sí se lee entero si se sirve con st.download_button (ver export_file).
+
+Las tablas Arrow (entidades + tablas hijas de sav_eaf.tables) se escriben sin compresión para
+que los notebooks las abran con memory-map, sin parseo ni copia:
+
+    from sav_eaf.export import open_arrow_tables
+    tables = open_arrow_tables('arrow')          # {nombre: pyarrow.Table}
+    entidades = tables['entidades'].to_pandas()
+"""
+import importlib.util
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 10_000
+
+# Format -> (label, MIME type, extension, optional module it needs)
+EXPORT_FORMATS = {
+    'csv': ('CSV', 'text/csv', 'csv', None),
+    'parquet': ('Parquet', 'application/vnd.apache.parquet', 'parquet', 'pyarrow'),
+    'xlsx': ('Excel (XLSX)', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx', 'xlsxwriter'),
+}
+
+def available_formats():
+    """Formatos cuyo módulo opcional está instalado"""
+    return [fmt for fmt, (*_, module) in EXPORT_FORMATS.items() if module is None or importlib.util.find_spec(module)]
+
+def iter_chunks(df, positions=None, columns=None, chunk_rows=CHUNK_ROWS):
+    """Bloques df.iloc[posiciones, columnas] de como mucho chunk_rows filas"""
+    positions = np.arange(len(df)) if positions is None else np.asarray(positions)
+    column_positions = df.columns.get_indexer(list(columns) if columns else df.columns)
+    for start in range(0, len(positions), chunk_rows):
+        yield df.iloc[positions[start:start + chunk_rows], column_positions]
+
+def _write_csv(chunks, sink):
+    for i, chunk in enumerate(chunks):
+        sink.write(chunk.to_csv(index=False, header=i == 0).encode('utf-8'))
+
+def _parquet_schema(df, columns):
+    """Esquema Arrow de las columnas sin copiarlas: el de un bloque vacío, y para las columnas sin tipo
+    (object, que vacías se infieren como null) el de su primer valor no nulo"""
+    import pyarrow as pa
+
+    schema = pa.Schema.from_pandas(df.iloc[:0, df.columns.get_indexer(columns)], preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            present = df[field.name].notna().to_numpy()
+            if present.any():
+                schema = schema.set(i, pa.field(field.name, pa.array(df[field.name].iloc[[present.argmax()]]).type))
+    return schema
+
+def _write_parquet(chunks, sink, schema):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+def _excel_value(value):
+    if value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value.item() if isinstance(value, np.generic) else value
+
+def _write_xlsx(chunks, path, columns):
+    import xlsxwriter
+
+    # constant_memory flushes each row to disk as soon as the next one starts
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    sheet = workbook.add_worksheet('Entidades')
+    date_format = workbook.add_format({'num_format': 'dd/mm/yyyy'})
+    sheet.write_row(0, 0, columns)
+    row = 1
+    for chunk in chunks:
+        for values in chunk.itertuples(index=False, name=None):
+            for col, value in enumerate(values):
+                value = _excel_value(value)
+                if value is None:
+                    continue
+                if hasattr(value, 'year'):
+                    sheet.write_datetime(row, col, value, date_format)
+                else:
+                    sheet.write(row, col, value)
+            row += 1
+    workbook.close()
+
+def write_export(df, fmt, sink, positions=None, columns=None, chunk_rows=CHUNK_ROWS):
+    """Escribir las filas (posiciones) y columnas pedidas en sink (fichero binario abierto o ruta para XLSX)"""
+    columns = list(columns) if columns else list(df.columns)
+    chunks = iter_chunks(df, positions, columns, chunk_rows)
+    if fmt == 'csv':
+        _write_csv(chunks, sink)
+    elif fmt == 'parquet':
+        # One schema for every row group: a first chunk with an all-null column would infer it as null
+        _write_parquet(chunks, sink, _parquet_schema(df, columns))
+    elif fmt == 'xlsx':
+        _write_xlsx(chunks, sink, columns)
+    else:
+        raise ValueError(f"Formato de exportación desconocido: {fmt}")
+
+def export_file(df, fmt, positions=None, columns=None, chunk_rows=CHUNK_ROWS):
+    """Exportar a un fichero temporal (se borra al cerrarlo) y devolverlo abierto al principio
+
+    La escritura va por bloques, pero st.download_button lee el fichero devuelto entero en memoria
+    para servirlo: el pico de la descarga es el tamaño del fichero exportado, no el de la tabla.
+    """
+    if fmt == 'xlsx':
+        with tempfile.NamedTemporaryFile(suffix='.xlsx') as target:
+            write_export(df, fmt, target.name, positions, columns, chunk_rows)
+            result = tempfile.TemporaryFile()
+            with open(target.name, 'rb') as fh:
+                while block := fh.read(1 << 20):
+                    result.write(block)
+    else:
+        result = tempfile.TemporaryFile()
+        write_export(df, fmt, result, positions, columns, chunk_rows)
+    result.seek(0)
+    return result
+
+def write_arrow_tables(tables, out_dir, meta=None, compression=None):
+    """Escribir {nombre: DataFrame} como ficheros Arrow IPC (<nombre>.arrow) más manifest.json
+
+    Cada fichero se reemplaza de forma atómica: los lectores que ya lo tienen mapeado siguen
+    viendo la versión anterior hasta que lo vuelven a abrir.
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    os.makedirs(out_dir, exist_ok=True)
+    written = {}
+    for name, frame in tables.items():
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        target = os.path.join(out_dir, f"{name}.arrow")
+        feather.write_feather(table, f"{target}.tmp", compression=compression or 'uncompressed')
+        os.replace(f"{target}.tmp", target)
+        written[name] = {'fichero': os.path.basename(target), 'filas': table.num_rows,
+                         'columnas': {field.name: str(field.type) for field in table.schema}}
+    manifest = {**(meta or {}), 'compresion': compression or 'uncompressed', 'tablas': written}
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, ensure_ascii=False, indent=1)
+    return manifest
+
+def open_arrow_tables(out_dir, names=None):
+    """Abrir las tablas Arrow exportadas con memory-map (sin copia si se escribieron sin compresión)"""
+    import pyarrow as pa
+
+    with open(os.path.join(out_dir, 'manifest.json'), encoding='utf-8') as fh:
+        manifest = json.load(fh)
+    tables = {}
+    for name, entry in manifest['tablas'].items():
+        if names is None or name in names:
+            source = pa.memory_map(os.path.join(out_dir, entry['fichero']), 'r')
+            tables[name] = pa.ipc.open_file(source).read_all()
+    return tables
@@ -0,0 +1,317 @@
+"""Fichas por entidad (HTML o PDF) generadas por lotes en un pool de procesos.
+
+    python -m sav_eaf factsheets [--data CSV] [--out DIR] [--format html|pdf] [--tipo SAV|EAF]
+                                 [--provincia P] [--keys E0000001,...] [--query EXPR] [--workers N]
+
+Lo compartido por todas las fichas (tema, tabla de instrumentos, tablas hijas agrupadas por
+entidad y distribuciones de pares por tipo) se calcula una vez en el proceso principal y llega a
+cada proceso del pool al arrancar; las tareas solo llevan la lista de entity_key a generar.
+"""
+import html
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from sav_eaf.core import INSTRUMENT_CODES, INSTRUMENTS
+from sav_eaf.tables import child_tables
+
+# Metric -> label; percentiles are computed against entities of the same tipo_entidad
+PEER_METRICS = {
+    'capital_social_numeric': 'Capital Social',
+    'total_services': 'Servicios Totales',
+    'num_instrumentos': 'Instrumentos',
+    'years_operating': 'Años Operando',
+    'num_auditorias': 'Auditorías',
+    'num_administradores': 'Administradores',
+}
+FACTSHEET_COLUMNS = [
+    'entity_key', 'id', 'nombre', 'tipo_entidad', 'numero_registro', 'fecha_registro', 'direccion_completa',
+    'direccion_provincia', 'capital_social', 'fogain', 'num_socios', 'num_agentes',
+    'tipos_clientes', 'titular_nombre', 'titular_telefono', 'titular_email', 'titular_web', 'ultimo_auditor',
+    'num_libre_prestacion_eee', 'num_libre_prestacion_fuera_eee', 'num_sucursales_eee', 'num_sucursales_fuera_eee',
+    *PEER_METRICS,
+]
+CHUNK_SIZE = 50
+
+FACTSHEET_STYLE = """
+body { background: #0F172A; color: #F1F5F9; font-family: -apple-system, 'Segoe UI', Roboto, sans-serif; margin: 0; }
+main { max-width: 1000px; margin: 0 auto; padding: 1.5rem; }
+h1 { margin-bottom: 0.25rem; } h2 { color: #60A5FA; font-size: 18px; margin-top: 1.75rem; border-bottom: 1px solid #334155; }
+.caption { color: #94A3B8; font-size: 13px; }
+.grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(280px, 1fr)); gap: 0.25rem 2rem; }
+.field { font-size: 14px; padding: 2px 0; } .field b { color: #CBD5E1; }
+table { border-collapse: collapse; width: 100%; font-size: 13px; background: #1E293B; }
+th { color: #60A5FA; text-align: left; border-bottom: 2px solid #334155; padding: 5px 8px; }
+td { border-bottom: 1px solid #334155; padding: 5px 8px; }
+td.on { color: #34D399; text-align: center; } td.off { color: #334155; text-align: center; }
+.bar { background: #334155; border-radius: 4px; height: 10px; width: 160px; display: inline-block; }
+.bar span { background: #60A5FA; border-radius: 4px; height: 10px; display: block; }
+@media print { body { background: white; color: black; } table { background: white; } }
+"""
+
+def peer_statistics(df):
+    """Valores ordenados de cada métrica por tipo de entidad, para percentiles con searchsorted"""
+    return {
+        entity_type: {metric: np.sort(group[metric].dropna().to_numpy(dtype=float)) for metric in PEER_METRICS}
+        for entity_type, group in df.groupby('tipo_entidad')
+    }
+
+def peer_percentiles(entity, peers):
+    """(métrica, valor, percentil entre pares del mismo tipo) para una entidad"""
+    rows = []
+    for metric, label in PEER_METRICS.items():
+        value = entity.get(metric)
+        values = peers.get(entity['tipo_entidad'], {}).get(metric, np.array([]))
+        if pd.isna(value) or not len(values):
+            rows.append((label, value, np.nan))
+        else:
+            rows.append((label, value, np.searchsorted(values, float(value), side='right') / len(values) * 100))
+    return rows
+
+def factsheet_context(df, data_version=None, peers_df=None):
+    """Artefactos compartidos por todas las fichas, calculados una sola vez por lote.
+
+    Las fichas son las de df; los percentiles se calculan contra peers_df (por defecto, df).
+    """
+    # One row per entity (the last one, as in the API): .loc[key] is always a single row
+    df = df.drop_duplicates('entity_key', keep='last')
+    children = child_tables(df)
+    return {
+        'entities': df[FACTSHEET_COLUMNS].set_index('entity_key', drop=False),
+        'children': {name: {key: group for key, group in frame.groupby('entity_key', sort=False)}
+                     for name, frame in children.items()},
+        'peers': peer_statistics(df if peers_df is None else peers_df),
+        'instruments': INSTRUMENTS,
+        'style': FACTSHEET_STYLE,
+        'data_version': data_version,
+        'generated': pd.Timestamp.now().strftime('%d/%m/%Y %H:%M'),
+    }
+
+def _plain(value, default='N/D'):
+    return default if value is None or (not isinstance(value, str) and pd.isna(value)) else str(value)
+
+def _text(value, default='N/D'):
+    return html.escape(_plain(value, default))
+
+def _field(label, value):
+    return f"<div class='field'><b>{html.escape(label)}:</b> {_text(value)}</div>"
+
+def _rows_table(frame, columns, empty='Sin datos en el registro'):
+    if frame is None or frame.empty:
+        return f"<p class='caption'>{empty}</p>"
+    head = ''.join(f"<th>{html.escape(label)}</th>" for label in columns.values())
+    body = ''.join('<tr>' + ''.join(f"<td>{_text(value, '—')}</td>" for value in row) + '</tr>'
+                   for row in frame[list(columns)].itertuples(index=False))
+    return f"<table><tr>{head}</tr>{body}</table>"
+
+def _entity_children(ctx, key):
+    return {name: groups.get(key) for name, groups in ctx['children'].items()}
+
+def render_html(entity, children, ctx):
+    """Ficha HTML autónoma de una entidad"""
+    registered = entity['fecha_registro']
+    profile = ''.join([
+        _field('Tipo', entity['tipo_entidad']), _field('NIF', entity['id']), _field('Nº Registro', entity['numero_registro']),
+        _field('Fecha Registro', None if pd.isna(registered) else f"{registered:%d/%m/%Y}"),
+        _field('Domicilio', entity['direccion_completa']), _field('FOGAIN', entity['fogain']),
+        _field('Tipos de Cliente', entity['tipos_clientes']), _field('Agentes', entity['num_agentes']),
+        _field('Servicio de Atención', entity['titular_nombre']), _field('Teléfono', entity['titular_telefono']),
+        _field('Email', entity['titular_email']), _field('Web', entity['titular_web']),
+    ])
+    capital = entity['capital_social_numeric']
+    capital_block = ''.join([
+        _field('Capital Social', None if pd.isna(capital) else f"€{capital:,.2f}"),
+        _field('Socios', entity['num_socios']), _field('Último Auditor', entity['ultimo_auditor']),
+        _field('Libre Prestación EEE / fuera EEE', f"{entity['num_libre_prestacion_eee']:.0f} / {entity['num_libre_prestacion_fuera_eee']:.0f}"),
+        _field('Sucursales EEE / fuera EEE', f"{entity['num_sucursales_eee']:.0f} / {entity['num_sucursales_fuera_eee']:.0f}"),
+    ])
+
+    services = children['servicios']
+    if services is None or services.empty:
+        matrix = "<p class='caption'>Sin servicios detallados en el registro</p>"
+    else:
+        head = ''.join(f"<th title='{html.escape(ctx['instruments'][code])}'>{code}</th>" for code in INSTRUMENT_CODES)
+        body = ''.join(
+            f"<tr><td>{_text(row.servicio)} <span class='caption'>({'inversión' if row.tipo_servicio == 'inversion' else 'auxiliar'})</span></td>"
+            + ''.join("<td class='on'>●</td>" if getattr(row, code) else "<td class='off'>·</td>" for code in INSTRUMENT_CODES)
+            + "</tr>"
+            for row in services.itertuples(index=False)
+        )
+        legend = ' · '.join(f"<b>{code}</b> {html.escape(name)}" for code, name in ctx['instruments'].items())
+        matrix = f"<table><tr><th>Servicio</th>{head}</tr>{body}</table><p class='caption'>{legend}</p>"
+
+    percentiles = ''.join(
+        f"<tr><td>{html.escape(label)}</td><td>{'—' if pd.isna(value) else f'{value:,.1f}'}</td>"
+        f"<td>{'—' if pd.isna(pct) else f'{pct:.0f}'}</td>"
+        f"<td><span class='bar'><span style='width: {0 if pd.isna(pct) else pct:.0f}%'></span></span></td></tr>"
+        for label, value, pct in peer_percentiles(entity, ctx['peers'])
+    )
+
+    return f"""<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>{_text(entity['nombre'])} · Ficha</title>
+<style>{ctx['style']}</style></head><body><main>
+<h1>🏢 {_text(entity['nombre'])}</h1>
+<p class='caption'>{_text(entity['entity_key'])} · datos {_text(ctx['data_version'], '—')} · generada el {ctx['generated']}</p>
+<h2>Perfil</h2><div class='grid'>{profile}</div>
+<h2>Capital y Presencia</h2><div class='grid'>{capital_block}</div>
+<h2>Percentiles frente a {_text(entity['tipo_entidad'])}</h2>
+<table><tr><th>Métrica</th><th>Valor</th><th>Percentil</th><th></th></tr>{percentiles}</table>
+<h2>Servicios × Instrumentos</h2>{matrix}
+<h2>Consejo de Administración</h2>{_rows_table(children['consejo'], {'nombre': 'Nombre', 'cargo': 'Cargo'})}
+<h2>Socios Principales</h2>{_rows_table(children['socios'], {'socio': 'Socio', 'participacion_pct': 'Participación (%)'})}
+<h2>Historial de Auditorías</h2>{_rows_table(children['auditorias'], {'ejercicio': 'Ejercicio', 'auditor': 'Auditor'})}
+<h2>Sucursales en España</h2>{_rows_table(children['sucursales'], {'direccion': 'Dirección', 'cp': 'CP', 'localidad': 'Localidad', 'provincia': 'Provincia'})}
+</main></body></html>
+"""
+
+def _pdf_lines(frame, template, limit=12):
+    if frame is None or frame.empty:
+        return ['Sin datos en el registro']
+    lines = [template.format(**row._asdict()) for row in frame.head(limit).itertuples(index=False)]
+    return lines + ([f"… y {len(frame) - limit} más"] if len(frame) > limit else [])
+
+def render_pdf(entity, children, ctx, path):
+    """Ficha PDF (una página A4) con matplotlib"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(8.27, 11.69))
+    fig.text(0.06, 0.96, str(entity['nombre']), fontsize=15, fontweight='bold', color='#1E3A8A')
+    fig.text(0.06, 0.945, f"{entity['entity_key']} · {entity['tipo_entidad']} · Nº Registro {entity['numero_registro']}"
+                          f" · datos {ctx['data_version'] or '—'} · {ctx['generated']}", fontsize=8, color='#475569')
+    capital = entity['capital_social_numeric']
+    profile = [
+        f"Domicilio: {_plain(entity['direccion_completa'])}",
+        f"Capital Social: {'N/D' if pd.isna(capital) else f'€{capital:,.2f}'}   FOGAIN: {_plain(entity['fogain'])}",
+        f"Tipos de Cliente: {_plain(entity['tipos_clientes'])}",
+        f"Último Auditor: {_plain(entity['ultimo_auditor'])}",
+    ]
+    fig.text(0.06, 0.93, '\n'.join(profile), fontsize=8.5, va='top', linespacing=1.6)
+
+    # Peer percentiles
+    rows = peer_percentiles(entity, ctx['peers'])
+    ax = fig.add_axes([0.25, 0.72, 0.68, 0.12])
+    ax.barh([label for label, _, _ in rows][::-1], [0 if pd.isna(pct) else pct for _, _, pct in rows][::-1], color='#60A5FA')
+    ax.set_xlim(0, 100)
+    ax.set_title(f"Percentil frente a {entity['tipo_entidad']}", fontsize=9, loc='left')
+    ax.tick_params(labelsize=7.5)
+
+    # Services x instruments
+    services = children['servicios']
+    ax = fig.add_axes([0.42, 0.45, 0.51, 0.22])
+    if services is None or services.empty:
+        ax.axis('off')
+        ax.text(0, 0.5, 'Sin servicios detallados en el registro', fontsize=8)
+    else:
+        ax.imshow(services[INSTRUMENT_CODES].to_numpy(dtype=float), cmap='Blues', vmin=0, vmax=1.4, aspect='auto')
+        ax.set_xticks(range(len(INSTRUMENT_CODES)), INSTRUMENT_CODES, fontsize=7.5)
+        ax.set_yticks(range(len(services)), [name[:48] for name in services['servicio']], fontsize=6.5)
+        ax.set_title('Servicios × Instrumentos', fontsize=9, loc='left')
+
+    sections = [
+        (0.06, 0.40, 'Consejo de Administración', _pdf_lines(children['consejo'], '{nombre} ({cargo})')),
+        (0.52, 0.40, 'Socios Principales', _pdf_lines(children['socios'], '{socio}: {participacion_pct:.2f} %')),
+        (0.06, 0.20, 'Historial de Auditorías', _pdf_lines(children['auditorias'], '{ejercicio}: {auditor}')),
+        (0.52, 0.20, 'Sucursales en España', _pdf_lines(children['sucursales'], '{localidad} ({provincia})')),
+    ]
+    for x, y, title, lines in sections:
+        fig.text(x, y, title, fontsize=9, fontweight='bold', color='#1E3A8A')
+        fig.text(x, y - 0.012, '\n'.join(line[:60] for line in lines), fontsize=7, va='top', linespacing=1.5)
+    fig.savefig(path, format='pdf')
+    plt.close(fig)
+
+_worker_context = None
+
+def _init_worker(ctx):
+    """Inicializador del pool: cada proceso recibe los artefactos compartidos una sola vez"""
+    global _worker_context
+    _worker_context = ctx
+
+def render_chunk(keys, out_dir, fmt='html', ctx=None):
+    """Trabajo de un proceso: escribir las fichas de un bloque de entidades; devuelve [(entity_key, fichero)]"""
+    ctx = ctx or _worker_context
+    written = []
+    for key in keys:
+        entity = ctx['entities'].loc[key]
+        target = os.path.join(out_dir, f"{key}.{fmt}")
+        if fmt == 'pdf':
+            render_pdf(entity, _entity_children(ctx, key), ctx, f"{target}.tmp")
+        else:
+            with open(f"{target}.tmp", 'w', encoding='utf-8') as fh:
+                fh.write(render_html(entity, _entity_children(ctx, key), ctx))
+        os.replace(f"{target}.tmp", target)
+        written.append((key, os.path.basename(target)))
+    return written
+
+def _write_index(out_dir, entities, files, fmt):
+    listed = entities.loc[[key for key, _ in files]].sort_values('nombre')
+    rows = ''.join(
+        f"<tr><td><a href='{key}.{fmt}'>{_text(row['nombre'])}</a></td><td>{_text(row['tipo_entidad'])}</td>"
+        f"<td>{_text(row['direccion_provincia'])}</td></tr>"
+        for key, row in listed.iterrows()
+    )
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as fh:
+        fh.write(f"<!DOCTYPE html><html lang='es'><head><meta charset='utf-8'><title>Fichas de entidad</title>"
+                 f"<style>{FACTSHEET_STYLE}</style></head><body><main><h1>Fichas de entidad ({len(listed)})</h1>"
+                 f"<table><tr><th>Entidad</th><th>Tipo</th><th>Provincia</th></tr>{rows}</table></main></body></html>")
+
+def build_factsheets(df, out_dir, fmt='html', workers=None, data_version=None, chunk_size=CHUNK_SIZE, log=sys.stderr,
+                     peers_df=None):
+    """Generar las fichas de todas las entidades de df (el registro completo o un filtro) en paralelo.
+
+    Con un filtro, pase el registro completo como peers_df: los pares de cada ficha son todas las
+    entidades de su tipo, no solo las seleccionadas.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    start = time.perf_counter()
+    ctx = factsheet_context(df, data_version, peers_df)
+    keys = df['entity_key'].drop_duplicates().tolist()
+    chunks = [keys[i:i + chunk_size] for i in range(0, len(keys), chunk_size)]
+    files, errors = [], []
+
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            try:
+                files += render_chunk(chunk, out_dir, fmt, ctx)
+            except Exception as error:
+                errors.append({'entidades': chunk, 'error': repr(error)})
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(ctx,)) as pool:
+            futures = {pool.submit(render_chunk, chunk, out_dir, fmt): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                try:
+                    files += future.result()
+                except Exception as error:
+                    errors.append({'entidades': futures[future], 'error': repr(error)})
+                print(f"[{len(files)}/{len(keys)}] fichas", file=log)
+
+    _write_index(out_dir, ctx['entities'], files, fmt)
+    summary = {
+        'creado': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'data_version': data_version,
+        'formato': fmt,
+        'fichas': len(files),
+        'errores': errors,
+        'segundos': round(time.perf_counter() - start, 3),
+    }
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as fh:
+        json.dump(summary, fh, ensure_ascii=False, indent=1)
+    return summary
+
+def filter_entities(df, entity_type=None, province=None, keys=None, query=None):
+    """Subconjunto del registro para un lote de fichas (los filtros se combinan con Y)"""
+    mask = pd.Series(True, index=df.index)
+    if entity_type:
+        mask &= df['tipo_entidad'] == entity_type
+    if province:
+        mask &= df['direccion_provincia'].str.upper() == province.upper()
+    if keys:
+        mask &= df['entity_key'].isin(keys)
+    selected = df[mask]
+    return selected.query(query) if query else selected
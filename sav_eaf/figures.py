@@ -0,0 +1,328 @@
+"""Figuras y métricas de las páginas del dashboard a partir de los agregados de sav_eaf.summaries.
+
+Las páginas de la app (st.plotly_chart, st.metric) y el sitio estático (sav_eaf.static_site) las
+construyen con estas mismas funciones, así que ambos pintan lo mismo. Las métricas son tuplas
+(etiqueta, valor, delta, ayuda); delta y ayuda pueden ser None.
+"""
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+from sav_eaf.charts import box_figure, histogram_figure
+from sav_eaf.core import INSTRUMENTS, INSTRUMENT_CODES
+from sav_eaf.summaries import CORRELATION_COLUMNS
+
+SCALE = [[0, '#0F172A'], [0.5, '#60A5FA'], [1, '#93C5FD']]
+TYPE_COLORS = {'SAV': '#60A5FA', 'EAF': '#34D399'}
+CLIENT_COLORS = {'Minoristas': '#60A5FA', 'Profesionales': '#34D399', 'Contrapartes elegibles': '#FBBF24'}
+CLIENT_LABELS = {'Contrapartes elegibles': 'Contrapartes Elegibles'}
+PALETTE = ['#60A5FA', '#34D399', '#FBBF24', '#F87171', '#93C5FD', '#6EE7B7', '#FDE68A', '#FCA5A5', '#BFDBFE', '#A7F3D0']
+VARIABLE_LABELS = {
+    'num_servicios_inversion': 'Servicios Inversión',
+    'num_servicios_auxiliares': 'Servicios Auxiliares',
+    'num_instrumentos': 'Instrumentos',
+    'capital_social_numeric': 'Capital Social',
+    'years_operating': 'Años Operando',
+}
+PROVINCE_LABELS = {
+    'provincia': 'Provincia',
+    'entidades': 'Número de Entidades',
+    'capital_total': 'Capital Total',
+    'media_servicios_inversion': 'Media Servicios Inversión',
+    'presencia_internacional': 'Presencia Internacional',
+}
+
+def theme(fig, height=400, **layout):
+    """Tema oscuro del dashboard; layout se aplica encima"""
+    fig.update_layout(
+        height=height,
+        paper_bgcolor='#1E293B',
+        plot_bgcolor='#0F172A',
+        font=dict(color='#F1F5F9', size=12),
+        title_font=dict(size=16, color='#F1F5F9'),
+        xaxis=dict(gridcolor='#334155', zerolinecolor='#334155'),
+        yaxis=dict(gridcolor='#334155', zerolinecolor='#334155'),
+        legend=dict(font=dict(color='#CBD5E1'), bgcolor='#1E293B', bordercolor='#334155', borderwidth=1),
+        coloraxis_colorbar=dict(title_font_color='#CBD5E1', tickfont_color='#CBD5E1'),
+    )
+    fig.update_layout(**layout)
+    return fig
+
+def _pie(fig, size=12):
+    fig.update_traces(textposition='inside', textinfo='percent+label', textfont=dict(size=size, color='white'))
+    return theme(fig, plot_bgcolor='#1E293B')
+
+# Vista General
+
+def overview_metrics(kpis):
+    total = kpis['entidades']
+    return [
+        ("Total Entidades", f"{total:,}", f"SAV: {kpis['entidades_sav']}, EAF: {kpis['entidades_eaf']}",
+         "Número total de entidades reguladas"),
+        ("Capital Total", f"€{kpis['capital_total']/1e9:.2f}MM", f"Media: €{kpis['capital_medio']/1e6:.2f}M",
+         "Suma del capital social de todas las entidades"),
+        ("Presencia Internacional", f"{kpis['presencia_internacional']}",
+         f"{kpis['presencia_internacional']/total*100:.1f}% de entidades", "Entidades con operaciones fuera de España"),
+        ("Media Servicios", f"{kpis['media_servicios']:.1f}", f"Máx: {kpis['max_servicios']}",
+         "Promedio de servicios totales por entidad"),
+        ("Entidades Auditadas", f"{kpis['entidades_auditadas']}", f"{kpis['entidades_auditadas']/total*100:.1f}%",
+         "Entidades con auditorías registradas"),
+    ]
+
+def entity_type_pie(entity_types):
+    fig = px.pie(entity_types, values='entidades', names='tipo_entidad', color='tipo_entidad',
+                 title="Distribución por Tipo de Entidad", color_discrete_map=TYPE_COLORS, hole=0.4)
+    return _pie(fig, size=14)
+
+def top_provinces_bar(provinces, color='entidades'):
+    """Top 10 provincias por número de entidades, coloreadas por color (entidades o capital_total)"""
+    fig = px.bar(provinces.head(10), x='entidades', y='provincia', orientation='h', color=color,
+                 title="Top 10 Provincias por Número de Entidades", color_continuous_scale=SCALE,
+                 hover_data=['capital_total', 'presencia_internacional'], labels=PROVINCE_LABELS)
+    return theme(fig, showlegend=False, yaxis={'categoryorder': 'total ascending'})
+
+def capital_by_type_box(chart):
+    """chart: (estadísticos, atípicos) de sav_eaf.charts.chart_data()['capital_por_tipo']"""
+    stats, outliers = chart
+    return theme(box_figure(stats, TYPE_COLORS, outliers), title="Distribución de Capital Social por Tipo de Entidad",
+                 xaxis_title='Tipo de Entidad', yaxis_title='Capital Social (€)', yaxis_type='log', showlegend=False)
+
+def services_by_type_heatmap(services):
+    means = services.set_index('tipo_entidad')[['num_servicios_inversion_mean', 'num_servicios_auxiliares_mean']]
+    fig = go.Figure(go.Heatmap(
+        z=means.values, x=['Servicios de Inversión', 'Servicios Auxiliares'], y=means.index, colorscale=SCALE,
+        text=means.values.round(2), texttemplate='%{text}', textfont={"size": 14, "color": "white"}, hoverongaps=False,
+    ))
+    return theme(fig, title="Promedio de Servicios por Tipo de Entidad", xaxis_title="Tipo de Servicio",
+                 yaxis_title="Tipo de Entidad")
+
+def registrations_area(registrations):
+    fig = px.area(registrations[registrations['año'] >= 1985], x='año', y='registros', color='tipo_entidad',
+                  title="Registros de Entidades a lo Largo del Tiempo",
+                  labels={'registros': 'Número de Registros', 'año': 'Año'}, color_discrete_map=TYPE_COLORS)
+    return theme(fig, height=300)
+
+# Análisis Comparativo (por tipo de entidad)
+
+TYPE_MEASURES = {
+    'Servicios de Inversión': 'num_servicios_inversion_mean',
+    'Servicios Auxiliares': 'num_servicios_auxiliares_mean',
+    'Instrumentos': 'num_instrumentos_mean',
+}
+
+def type_profile_radar(services):
+    """Medias de cada tipo de entidad relativas al máximo entre tipos (0-100)"""
+    services = services.set_index('tipo_entidad')
+    fig = go.Figure()
+    for entity_type in services.index:
+        values = [services.loc[entity_type, column] / max(services[column].max(), 1e-9) * 100
+                  for column in TYPE_MEASURES.values()]
+        fig.add_trace(go.Scatterpolar(r=values, theta=list(TYPE_MEASURES), fill='toself', name=entity_type,
+                                      line_color=TYPE_COLORS.get(entity_type, '#FBBF24')))
+    return theme(fig, title="Perfil Relativo por Tipo de Entidad",
+                 polar=dict(bgcolor='#0F172A', radialaxis=dict(visible=True, range=[0, 100], gridcolor='#334155'),
+                            angularaxis=dict(gridcolor='#334155')))
+
+def type_means_bar(services):
+    means = services.set_index('tipo_entidad')[list(TYPE_MEASURES.values())].rename(
+        columns={column: label for label, column in TYPE_MEASURES.items()})
+    fig = px.bar(means.reset_index().melt(id_vars='tipo_entidad', var_name='Servicio', value_name='Promedio'),
+                 x='Servicio', y='Promedio', color='tipo_entidad', barmode='group', color_discrete_map=TYPE_COLORS,
+                 title="Comparación Promedio SAV vs EAF", labels={'tipo_entidad': 'Tipo'})
+    return theme(fig)
+
+# Inteligencia Geográfica
+
+def provinces_treemap(provinces):
+    fig = px.treemap(provinces, path=['provincia'], values='entidades', color='capital_total',
+                     hover_data=['media_servicios_inversion', 'presencia_internacional'], labels=PROVINCE_LABELS,
+                     title="Distribución de Entidades por Provincia", color_continuous_scale=SCALE)
+    return theme(fig, height=500)
+
+def province_capital_pie(provinces):
+    fig = px.pie(provinces.nlargest(10, 'capital_total'), values='capital_total', names='provincia', hole=0.4,
+                 title="Distribución de Capital por Provincia (Top 10)", color_discrete_sequence=PALETTE)
+    return _pie(fig)
+
+def international_metrics(presence):
+    total = max(presence['entidades'].sum(), 1)
+    return [(label, int(presence[column].sum()), f"{presence[column].sum()/total*100:.1f}%", None)
+            for label, column in [("Presencia EEE", 'presencia_eee'), ("Presencia Fuera EEE", 'presencia_fuera_eee'),
+                                  ("Con Sucursales en España", 'con_sucursales_espana')]]
+
+def international_bar(presence):
+    fig = px.bar(presence, x='tipo_entidad', y='pct_internacional', title="Presencia Internacional por Tipo de Entidad",
+                 labels={'tipo_entidad': 'Tipo de Entidad', 'pct_internacional': 'Porcentaje con Presencia Internacional'},
+                 color='pct_internacional', color_continuous_scale=SCALE, text=presence['pct_internacional'].round(1))
+    fig.update_traces(texttemplate='%{text}%', textposition='outside')
+    return theme(fig, showlegend=False)
+
+# Análisis de Servicios
+
+def services_metrics(kpis):
+    return [
+        ("Media Servicios Inversión", f"{kpis['media_servicios_inversion']:.2f}", None, None),
+        ("Media Servicios Auxiliares", f"{kpis['media_servicios_auxiliares']:.2f}", None, None),
+        ("Máx Servicios Totales", int(kpis['max_servicios']), None, None),
+        ("Entidades Full Service", int(kpis['entidades_full_service']), None, None),
+    ]
+
+def service_histogram(bins, title, xlabel, color):
+    return theme(histogram_figure(bins, xlabel, color), title=title, xaxis_title=xlabel, yaxis_title='Número de Entidades')
+
+def services_by_type_table(services):
+    """Media, mediana y desviación por tipo de entidad, redondeadas"""
+    return services.set_index('tipo_entidad').filter(regex='_(mean|median|std)$').round(2)
+
+def correlation_heatmap(correlations):
+    """correlations: formato largo de summaries.service_correlations"""
+    matrix = correlations.pivot(index='variable_a', columns='variable_b', values='correlacion')
+    matrix = matrix.loc[CORRELATION_COLUMNS, CORRELATION_COLUMNS]
+    labels = [VARIABLE_LABELS[column] for column in CORRELATION_COLUMNS]
+    fig = px.imshow(matrix.values, x=labels, y=labels, color_continuous_scale='RdBu_r', zmin=-1, zmax=1, aspect='auto',
+                    text_auto='.2f', title="Matriz de Correlación de Servicios",
+                    labels=dict(x="Variable", y="Variable", color="Correlación"))
+    return theme(fig, height=500)
+
+def instrument_coverage_bar(coverage):
+    fig = px.bar(coverage.sort_values('entidades'), x='entidades', y='instrumento', orientation='h', text='entidades',
+                 title="Número de Entidades por Tipo de Instrumento", color='entidades', color_continuous_scale=SCALE,
+                 labels={'entidades': 'Entidades', 'instrumento': 'Instrumento'})
+    fig.update_traces(texttemplate='%{text}', textposition='outside')
+    return theme(fig, height=500, showlegend=False)
+
+def instrument_ranges_pie(ranges):
+    fig = px.pie(ranges, values='entidades', names='rango', title="Categorías de Cobertura de Instrumentos", hole=0.4,
+                 color_discrete_sequence=PALETTE)
+    return _pie(fig)
+
+def instruments_by_type_bar(services):
+    fig = go.Figure([
+        go.Bar(name='Media', x=services['tipo_entidad'], y=services['num_instrumentos_mean'], marker_color='#60A5FA'),
+        go.Bar(name='Máximo', x=services['tipo_entidad'], y=services['num_instrumentos_max'], marker_color='#34D399'),
+    ])
+    return theme(fig, title="Instrumentos por Tipo de Entidad", xaxis_title="Tipo de Entidad",
+                 yaxis_title="Número de Instrumentos", barmode='group')
+
+def cooccurrence_heatmap(cooccurrence):
+    """cooccurrence: matriz 11x11 de sav_eaf.core.instrument_cooccurrence"""
+    labels = [f"{code} - {INSTRUMENTS[code]}" for code in INSTRUMENT_CODES]
+    fig = px.imshow(cooccurrence.loc[INSTRUMENT_CODES, INSTRUMENT_CODES].values, x=labels, y=labels,
+                    labels=dict(x="Instrumento", y="Instrumento", color="Entidades"), color_continuous_scale=SCALE,
+                    text_auto=True, aspect="auto", title="Matriz de Co-ocurrencia (entidades que ofrecen ambos)")
+    return theme(fig, height=550, xaxis=dict(tickangle=-45))
+
+def bundles_bar(bundles):
+    fig = px.bar(bundles.iloc[::-1], x='Entidades', y='Combinación', orientation='h', text='Entidades',
+                 title="Combinaciones de Instrumentos Más Frecuentes", color='Nº Instrumentos', color_continuous_scale=SCALE)
+    fig.update_traces(texttemplate='%{text}', textposition='outside')
+    return theme(fig, height=550, yaxis=dict(type='category'))
+
+def top_services_bar(top):
+    fig = px.bar(top.head(10), x='nombre', y=['num_servicios_inversion', 'num_servicios_auxiliares'],
+                 title="Top 10 Entidades por Servicios Totales", labels={'value': 'Número de Servicios', 'nombre': 'Entidad'},
+                 color_discrete_map={'num_servicios_inversion': '#60A5FA', 'num_servicios_auxiliares': '#34D399'})
+    return theme(fig, xaxis_tickangle=-45, legend_title_text='Tipo de Servicio',
+                 legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+
+def service_matrix_heatmap(top):
+    columns = ['num_servicios_inversion', 'num_servicios_auxiliares', 'num_instrumentos']
+    fig = px.imshow(top[columns].values, labels=dict(x="Tipo de Servicio", y="Entidad", color="Cantidad"),
+                    x=['Servicios Inversión', 'Servicios Auxiliares', 'Instrumentos'], y=top['nombre'].str[:40] + '...',
+                    color_continuous_scale=SCALE, text_auto=True, aspect="auto")
+    return theme(fig, height=600)
+
+def service_categories_bar(categories):
+    fig = px.bar(categories, x='categoria', y='entidades', text='entidades', color='entidades', color_continuous_scale=SCALE,
+                 title="Categorización de Entidades por Servicios Ofrecidos",
+                 labels={'categoria': 'Categoría de Servicios', 'entidades': 'Número de Entidades'})
+    fig.update_traces(texttemplate='%{text}', textposition='outside')
+    return theme(fig, showlegend=False)
+
+# Salud Financiera
+
+def capital_metrics(kpis):
+    return [
+        ("Capital Total", f"€{kpis['capital_total']/1e9:.2f}MM", None, None),
+        ("Capital Promedio", f"€{kpis['capital_medio']/1e6:.2f}M", None, None),
+        ("Capital Mediano", f"€{kpis['capital_mediano']/1e6:.2f}M", None, None),
+        ("Capital Máximo", f"€{kpis['capital_maximo']/1e6:.2f}M", None, None),
+    ]
+
+def concentration_metrics(concentration):
+    return [
+        ("Concentración Top 10", f"{concentration['pct_top10']:.1f}%", None,
+         "Porcentaje del capital total que poseen las 10 mayores entidades"),
+        ("Concentración Top 20", f"{concentration['pct_top20']:.1f}%", None,
+         "Porcentaje del capital total que poseen las 20 mayores entidades"),
+        ("Capital del 50% menor", f"{concentration['pct_mitad_menor']:.1f}%", None,
+         "Porcentaje del capital total que posee la mitad más pequeña de entidades"),
+    ]
+
+def audit_metrics(kpis):
+    return [
+        ("Entidades Auditadas", int(kpis['entidades_auditadas']), f"{kpis['entidades_auditadas']/kpis['entidades']*100:.1f}%", None),
+        ("Media Auditorías por Entidad", f"{kpis['media_auditorias']:.1f}", None, None),
+        ("Auditorías Recientes (2023+)", int(kpis['auditorias_recientes']), None, None),
+    ]
+
+def top_capital_bar(top):
+    fig = px.bar(top, x='capital_social_numeric', y='nombre', orientation='h', title="Top 20 Entidades por Capital Social",
+                 labels={'capital_social_numeric': 'Capital Social (€)', 'nombre': 'Entidad'}, color='tipo_entidad',
+                 color_discrete_map=TYPE_COLORS, hover_data=['capital_social_numeric', 'direccion_provincia'])
+    fig.update_traces(texttemplate='€%{x:,.0f}', textposition='inside', textfont=dict(color='white'))
+    return theme(fig, height=600, xaxis_tickformat='€,.0f', yaxis={'categoryorder': 'total ascending'})
+
+def audits_by_type_bar(audits):
+    fig = px.bar(audits, x='tipo_entidad', y='mean', title="Promedio de Auditorías por Tipo de Entidad",
+                 labels={'tipo_entidad': 'Tipo de Entidad', 'mean': 'Promedio de Auditorías'},
+                 color='mean', color_continuous_scale=SCALE, text=audits['mean'].round(1))
+    fig.update_traces(texttemplate='%{text}', textposition='outside')
+    return theme(fig, showlegend=False)
+
+def top_auditors_bar(auditors):
+    fig = px.bar(auditors, x='entidades', y='auditor', orientation='h', title="Top 10 Firmas Auditoras",
+                 labels={'entidades': 'Número de Entidades Auditadas', 'auditor': 'Auditor'},
+                 color='entidades', color_continuous_scale=SCALE)
+    return theme(fig, showlegend=False, yaxis={'categoryorder': 'total ascending'})
+
+# Segmentación de Clientes
+
+def client_metrics(segments):
+    return [(f"Atienden {CLIENT_LABELS.get(row.tipo_cliente, row.tipo_cliente)}", int(row.entidades), f"{row.pct:.1f}%", None)
+            for row in segments.itertuples(index=False)]
+
+def client_types_pie(segments):
+    fig = px.pie(segments.replace({'tipo_cliente': CLIENT_LABELS}), values='entidades', names='tipo_cliente', hole=0.4,
+                 title="Distribución por Tipo de Cliente (Entidades que Atienden Cada Tipo)",
+                 color_discrete_sequence=PALETTE)
+    return _pie(fig)
+
+def client_combinations_bar(combinations):
+    fig = px.bar(combinations, x='entidades', y='tipos_clientes', orientation='h', title="Combinaciones de Tipos de Cliente",
+                 labels={'entidades': 'Número de Entidades', 'tipos_clientes': 'Tipos de Cliente'},
+                 color='entidades', color_continuous_scale=SCALE)
+    return theme(fig, showlegend=False, yaxis={'categoryorder': 'total ascending'})
+
+def client_services_heatmap(segments):
+    means = segments.replace({'tipo_cliente': CLIENT_LABELS}).set_index('tipo_cliente')[
+        ['media_servicios_inversion', 'media_servicios_auxiliares', 'media_instrumentos']]
+    fig = go.Figure(go.Heatmap(
+        z=means.values, x=['Servicios Inversión', 'Servicios Auxiliares', 'Instrumentos'], y=means.index, colorscale=SCALE,
+        text=np.round(means.values, 2), texttemplate='%{text}', textfont={"size": 14, "color": "white"}, hoverongaps=False,
+    ))
+    return theme(fig, title="Promedio de Servicios por Segmento de Cliente")
+
+def specialization_bar(specialization):
+    fig = px.bar(specialization, x='especializacion', y='entidades', text='entidades', color='entidades',
+                 color_continuous_scale=SCALE, title="Distribución de Especialización de Entidades",
+                 labels={'especializacion': 'Especialización', 'entidades': 'Cantidad'})
+    fig.update_traces(texttemplate='%{text}', textposition='outside')
+    return theme(fig, showlegend=False)
+
+def capital_by_client_box(chart):
+    """chart: (estadísticos, atípicos) de sav_eaf.charts.chart_data()['capital_por_cliente']"""
+    stats, outliers = chart
+    return theme(box_figure(stats, CLIENT_COLORS, outliers, labels=CLIENT_LABELS),
+                 title="Distribución de Capital Social por Tipo de Cliente Atendido",
+                 yaxis_title="Capital Social (€)", yaxis_type='log')
@@ -0,0 +1,187 @@
+"""Prueba de carga sin navegador: sesiones simuladas con streamlit.testing sobre main.py.
+
+    python -m sav_eaf loadtest [--users 1,10,50,100,200] [--iterations 2] [--think 0]
+                               [--scenarios navegacion,explorador,comparacion] [--results FICHERO]
+
+Cada usuario es un AppTest (una sesión con su propio session_state) que repite sus escenarios
+en un hilo; todos comparten el proceso, la caché de datos y el GIL, como las sesiones de un
+worker real. Por nivel de concurrencia se informa la latencia de rerun (p50/p95/p99),
+el rendimiento (reruns/s), los errores y la memoria residente por sesión.
+
+AppTest ejecuta el script completo en cada at.run(): los widgets dentro de un st.fragment
+(explorador, comparación, ...) se miden como reruns completos, no como reruns del fragmento,
+así que sus latencias son una cota superior de las que ve un navegador.
+
+AppTest no admite reruns simultáneos: cada at.run() instala y al terminar borra el Runtime global
+del proceso (Runtime._instance) y compila main.py de nuevo, y compilar desde varios hilos a la vez
+falla de forma intermitente en CPython 3.11 («AST constructor recursion depth mismatch»). Un
+rerun así fallaba sin pintar nada y los pasos siguientes de la sesión no encontraban sus widgets
+(«widget no encontrado»). Por eso los reruns de las sesiones se ejecutan de uno en uno: la latencia
+incluye la espera a que termine el rerun de otra sesión, como en un worker saturado por el GIL.
+"""
+import gc
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+APP_SCRIPT = 'main.py'
+DEFAULT_USERS = [1, 10, 50, 100, 200]
+RESULTS_FILE = os.path.join('benchmarks', 'loadtest.jsonl')
+NAVIGATION = ['🏠 Vista General', '🔍 Explorador de Entidades', '💼 Análisis de Servicios',
+              '👥 Segmentación de Clientes', '🏆 Ranking Compuesto', '📊 Análisis Comparativo']
+
+# One AppTest rerun at a time in the process (see the module docstring)
+_run_lock = threading.Lock()
+
+def _widget(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"widget no encontrado: {label!r}")
+
+def _navigate(at, page):
+    _widget(at.sidebar.selectbox, 'Navegación').set_value(page)
+
+def navigation_script(at, rng):
+    """Recorrer varias páginas en orden aleatorio"""
+    for page in rng.permutation(NAVIGATION):
+        yield f"navegar:{page}", lambda page=page: _navigate(at, page)
+
+def explorer_script(at, rng):
+    """Explorador: tipo, provincia, búsqueda, ordenación y paginación"""
+    yield 'navegar:explorador', lambda: _navigate(at, '🔍 Explorador de Entidades')
+    search = '🔎 Buscar por nombre de entidad'
+    yield 'filtro:tipo', lambda: _widget(at.selectbox, 'Tipo de Entidad').set_value(str(rng.choice(['SAV', 'EAF'])))
+    yield 'filtro:provincia', lambda: _widget(at.selectbox, 'Provincia').set_value(
+        str(rng.choice(_widget(at.selectbox, 'Provincia').options[1:])))
+    yield 'busqueda', lambda: _widget(at.text_input, search).set_value(
+        str(rng.choice(['capital', 'valores', 'eaf', 'asesores', 'inversiones'])))
+    yield 'ordenar', lambda: _widget(at.radio, 'Orden').set_value('Descendente')
+
+    def clear_filters():
+        _widget(at.selectbox, 'Tipo de Entidad').set_value('Todas')
+        _widget(at.selectbox, 'Provincia').set_value('Todas')
+        _widget(at.text_input, search).set_value('')
+    yield 'limpiar', clear_filters
+    yield 'pagina', lambda: at.number_input(key='explorer_table_page').set_value(2)
+
+def comparison_script(at, rng):
+    """Comparación: elegir 2, 3 y 4 entidades"""
+    yield 'navegar:comparacion', lambda: _navigate(at, '📊 Análisis Comparativo')
+    label = 'Seleccione entidades para comparar (máximo 4)'
+    chosen = [str(name) for name in rng.choice(_widget(at.multiselect, label).options, 4, replace=False)]
+    for n in (2, 3, 4):
+        yield f"comparar:{n}", lambda n=n: _widget(at.multiselect, label).set_value(chosen[:n])
+
+SCENARIOS = {
+    'navegacion': navigation_script,
+    'explorador': explorer_script,
+    'comparacion': comparison_script,
+}
+
+def rss_mb():
+    """Memoria residente actual del proceso (MB)"""
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # peak, not current, outside Linux
+
+def run_user(user, scenarios, iterations, think_ms, script=APP_SCRIPT, timeout=120, seed=42):
+    """Una sesión: carga inicial y escenarios en bucle; devuelve (sesión, [(paso, segundos, error)])"""
+    from streamlit.testing.v1 import AppTest
+
+    rng = np.random.default_rng(seed + user)
+    at = AppTest.from_file(os.path.abspath(script), default_timeout=timeout)
+    timings = []
+
+    def rerun(step, action=None):
+        if think_ms:
+            time.sleep(rng.exponential(think_ms) / 1000)
+        start = time.perf_counter()
+        try:
+            if action is not None:
+                action()
+            with _run_lock:
+                at.run()
+            error = str(at.exception[0].value) if len(at.exception) else None
+        except Exception as exc:
+            error = repr(exc)
+        timings.append((step, time.perf_counter() - start, error))
+
+    rerun('inicio')
+    for _ in range(iterations):
+        for name in scenarios:
+            try:
+                for step, action in SCENARIOS[name](at, rng):
+                    rerun(step, action)
+            except Exception as exc:  # a widget the script expected is missing: count it and move on
+                timings.append((f"escenario:{name}", 0.0, repr(exc)))
+    return at, timings
+
+def run_level(users, scenarios, iterations=2, think_ms=0, script=APP_SCRIPT, log=sys.stderr):
+    """Un nivel de concurrencia: users sesiones en paralelo; devuelve las métricas agregadas"""
+    # Warm-up session, discarded: imports, data caches and first-use allocations stay out of the per-session figure
+    run_user(-1, scenarios, 1, 0, script)
+    gc.collect()
+    baseline = rss_mb()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users, thread_name_prefix='sesion') as pool:
+        results = list(pool.map(lambda user: run_user(user, scenarios, iterations, think_ms, script), range(users)))
+    wall = time.perf_counter() - start
+    # Sessions are still alive here: their state and per-session copies count towards memory
+    per_session = max(0.0, rss_mb() - baseline) / users
+
+    timings = pd.DataFrame([entry for _, user_timings in results for entry in user_timings],
+                           columns=['paso', 'segundos', 'error'])
+    latency = timings['segundos'].to_numpy() * 1000
+    metrics = {
+        'usuarios': users,
+        'reruns': len(timings),
+        'errores': int(timings['error'].notna().sum()),
+        'p50_ms': round(float(np.percentile(latency, 50)), 1),
+        'p95_ms': round(float(np.percentile(latency, 95)), 1),
+        'p99_ms': round(float(np.percentile(latency, 99)), 1),
+        'max_ms': round(float(latency.max()), 1),
+        'reruns_s': round(len(timings) / wall, 2),
+        'segundos': round(wall, 2),
+        'rss_mb': round(rss_mb(), 1),
+        'mb_por_sesion': round(per_session, 2),
+        'pasos_p95_ms': (timings.groupby('paso')['segundos'].quantile(0.95) * 1000).round(1).to_dict(),
+    }
+    if metrics['errores']:
+        metrics['primer_error'] = timings['error'].dropna().iat[0]
+    del results
+    print(f"{users:>5d} usuarios  {metrics['reruns']:>6d} reruns  p50 {metrics['p50_ms']:>8.1f} ms  "
+          f"p95 {metrics['p95_ms']:>8.1f} ms  p99 {metrics['p99_ms']:>8.1f} ms  {metrics['reruns_s']:>7.2f} reruns/s  "
+          f"{metrics['mb_por_sesion']:>6.2f} MB/sesión  {metrics['errores']} errores", file=log)
+    return metrics
+
+def run_loadtest(levels=DEFAULT_USERS, scenarios=tuple(SCENARIOS), iterations=2, think_ms=0, script=APP_SCRIPT,
+                 results=RESULTS_FILE, log=sys.stderr):
+    """Recorrer los niveles de concurrencia y añadir una línea JSON por nivel a results"""
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Escenarios desconocidos: {', '.join(sorted(unknown))}")
+    context = {
+        'creado': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'escenarios': list(scenarios),
+        'iteraciones': iterations,
+        'pausa_ms': think_ms,
+        'cpus': os.cpu_count(),
+    }
+    os.makedirs(os.path.dirname(results) or '.', exist_ok=True)
+    report = []
+    for users in levels:
+        metrics = run_level(users, scenarios, iterations, think_ms, script, log)
+        with open(results, 'a', encoding='utf-8') as fh:
+            fh.write(json.dumps({**context, **metrics}, ensure_ascii=False) + '\n')
+        report.append(metrics)
+    return report
@@ -0,0 +1,95 @@
+"""Muestreador estadístico de pilas para perfilar reruns concretos en producción.
+
+Un hilo toma cada PROFILE_INTERVAL ms la pila del hilo perfilado (sys._current_frames) y
+cuenta las pilas colapsadas; el resultado se guarda en formato «folded» (una línea
+«raíz;...;hoja N» por pila), directamente utilizable con flamegraph.pl o speedscope:
+
+    flamegraph.pl profiles/20260101-120000_explorador-de-entidades_filtros.folded > perfil.svg
+
+Solo se conservan los PROFILE_KEEP perfiles más recientes de PROFILE_DIR.
+"""
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE_ENABLED = os.environ.get('SAV_EAF_PROFILE', '') not in ('', '0')
+PROFILE_DIR = os.environ.get('SAV_EAF_PROFILE_DIR', 'profiles')
+PROFILE_KEEP = int(os.environ.get('SAV_EAF_PROFILE_KEEP', '50'))
+PROFILE_INTERVAL = float(os.environ.get('SAV_EAF_PROFILE_INTERVAL', '5'))
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ',')
+
+def collapse_stack(frame, root=None):
+    """Pila de frame como 'raíz;...;hoja', empezando en el primer frame de root si aparece"""
+    labels, files = [], []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        files.append(frame.f_code.co_filename)
+        frame = frame.f_back
+    labels.reverse()
+    files.reverse()
+    if root is not None and root in files:
+        labels = labels[files.index(root):]
+    return ';'.join(labels)
+
+class StackSampler:
+    """Muestrear la pila de un hilo (por defecto, el que lo crea) hasta stop()"""
+
+    def __init__(self, thread_id=None, interval_ms=PROFILE_INTERVAL, root=None):
+        self.thread_id = threading.get_ident() if thread_id is None else thread_id
+        self.interval = interval_ms / 1000
+        self.root = root
+        self.counts = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sav-eaf-profiler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.counts[collapse_stack(frame, self.root)] += 1
+                self.samples += 1
+            del frame
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Detener el muestreo; devuelve {pila colapsada: muestras}"""
+        self._stop.set()
+        self._thread.join()
+        self.seconds = time.perf_counter() - self.started
+        return self.counts
+
+def _slug(text):
+    text = re.sub(r'[^\w]+', '-', text.lower(), flags=re.UNICODE).strip('-')
+    return text[:60] or 'rerun'
+
+def folded(counts):
+    """Texto «folded»: una línea por pila, las más frecuentes primero"""
+    return ''.join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+def save_profile(counts, page, interaction, out_dir=PROFILE_DIR, keep=PROFILE_KEEP):
+    """Guardar un perfil <fecha>_<página>_<interacción>.folded y borrar los más antiguos; devuelve la ruta"""
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S') + f"-{time.time_ns() % 1_000_000_000:09d}"
+    path = os.path.join(out_dir, f"{stamp}_{_slug(page)}_{_slug(interaction)}.folded")
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as fh:
+        fh.write(folded(counts))
+    os.replace(f"{path}.tmp", path)
+
+    # Rotation: the timestamp prefix makes name order chronological
+    profiles = sorted(name for name in os.listdir(out_dir) if name.endswith('.folded'))
+    for name in profiles[:max(0, len(profiles) - keep)]:
+        try:
+            os.remove(os.path.join(out_dir, name))
+        except OSError:
+            pass  # another worker rotated it first
+    return path
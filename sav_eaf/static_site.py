@@ -0,0 +1,433 @@
+"""Exportación estática del dashboard: las siete páginas originales como HTML autónomo.
+
+    python -m sav_eaf site [CSV ...] [--snapshots DIR] [--out DIR] [--workers N] [--force] [--shared-plotly]
+
+Las páginas usan las mismas figuras y métricas que la app (sav_eaf.figures), construidas a partir
+de los agregados de sav_eaf.summaries, nunca del DataFrame completo. Cada página lleva plotly.js
+incrustado y se abre sin servidor ni red; con --shared-plotly se escribe una sola copia en la raíz
+de la salida y las páginas la enlazan (unos 4 MB menos por página).
+
+El pool de procesos trabaja en dos fases: una tarea por extracción la carga y calcula una sola vez
+los agregados de cada página, y una tarea por (extracción, página) construye las figuras y escribe
+el HTML. El directorio de entidades se pagina (explorador.html, explorador-2.html, ...):
+
+    <out>/index.html                     extracciones exportadas
+    <out>/plotly.min.js                  solo con --shared-plotly
+    <out>/<extracción>/index.html        páginas de la extracción
+    <out>/<extracción>/<página>.html
+    <out>/<extracción>/manifest.json     versión de datos; si no cambia, la extracción se omite
+"""
+import functools
+import html
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+from sav_eaf.charts import chart_data
+from sav_eaf.core import get_data_version, load_extraction, register_entities
+from sav_eaf.figures import (
+    audit_metrics, audits_by_type_bar, bundles_bar, capital_by_client_box, capital_by_type_box, capital_metrics,
+    client_combinations_bar, client_metrics, client_services_heatmap, client_types_pie, concentration_metrics,
+    cooccurrence_heatmap, correlation_heatmap, entity_type_pie, instrument_coverage_bar, instrument_ranges_pie,
+    instruments_by_type_bar, international_bar, international_metrics, overview_metrics, province_capital_pie,
+    provinces_treemap, registrations_area, service_categories_bar, service_histogram, service_matrix_heatmap,
+    services_by_type_heatmap, services_by_type_table, services_metrics, specialization_bar, top_auditors_bar,
+    top_capital_bar, top_provinces_bar, top_services_bar, type_means_bar, type_profile_radar, TYPE_MEASURES,
+)
+from sav_eaf.summaries import summarize
+
+PAGE_STYLE = """
+body { background: #0F172A; color: #F1F5F9; font-family: -apple-system, 'Segoe UI', Roboto, sans-serif; margin: 0; }
+nav { background: #1E293B; border-bottom: 1px solid #334155; padding: 0.75rem 1.5rem; }
+nav a { color: #CBD5E1; text-decoration: none; margin-right: 1.25rem; font-size: 14px; }
+nav a.active { color: #60A5FA; font-weight: 600; }
+main { max-width: 1400px; margin: 0 auto; padding: 1rem 1.5rem 3rem; }
+h1 { color: #F1F5F9; } h3 { color: #F1F5F9; margin-top: 2rem; }
+.caption { color: #94A3B8; font-size: 13px; }
+.metrics { display: grid; grid-template-columns: repeat(auto-fit, minmax(180px, 1fr)); gap: 1rem; margin: 1rem 0; }
+.metric { background: #1E293B; border: 1px solid #334155; border-radius: 8px; padding: 1rem; }
+.metric .label { color: #CBD5E1; font-size: 13px; } .metric .value { font-size: 26px; font-weight: 600; }
+.metric .delta { color: #34D399; font-size: 13px; }
+.row { display: grid; grid-template-columns: repeat(auto-fit, minmax(480px, 1fr)); gap: 1rem; }
+table { border-collapse: collapse; width: 100%; font-size: 13px; background: #1E293B; }
+th { color: #60A5FA; text-align: left; border-bottom: 2px solid #334155; padding: 6px 8px; position: sticky; top: 0; background: #1E293B; }
+td { border-bottom: 1px solid #334155; padding: 6px 8px; }
+.scroll { max-height: 480px; overflow: auto; border: 1px solid #334155; border-radius: 8px; }
+footer { color: #94A3B8; font-size: 12px; margin-top: 3rem; }
+"""
+
+def _figure(fig):
+    return fig.to_html(full_html=False, include_plotlyjs=False, config={'displaylogo': False, 'responsive': True})
+
+def _heading(text, caption=None):
+    block = f"<h3>{html.escape(text)}</h3>"
+    return block + (f"<p class='caption'>{html.escape(caption)}</p>" if caption else '')
+
+def _metrics(items):
+    """Fila de tarjetas a partir de las métricas de sav_eaf.figures (etiqueta, valor, delta, ayuda)"""
+    cards = []
+    for label, value, delta, help_text in items:
+        title = f" title='{html.escape(help_text)}'" if help_text else ''
+        cards.append(f"<div class='metric'{title}><div class='label'>{html.escape(label)}</div>"
+                     f"<div class='value'>{html.escape(str(value))}</div>"
+                     + (f"<div class='delta'>{html.escape(str(delta))}</div>" if delta else '') + "</div>")
+    return f"<div class='metrics'>{''.join(cards)}</div>"
+
+def _row(*blocks):
+    return "<div class='row'>" + ''.join(f"<div>{block}</div>" for block in blocks) + "</div>"
+
+def _table(frame, float_format='{:,.2f}'.format):
+    return "<div class='scroll'>" + frame.to_html(index=False, border=0, na_rep='—', float_format=float_format, escape=True) + "</div>"
+
+def page_overview(inputs):
+    return [
+        _metrics(overview_metrics(inputs['kpis'].iloc[0])),
+        _row(_figure(entity_type_pie(inputs['tipos_entidad'])), _figure(top_provinces_bar(inputs['provincias']))),
+        _row(_figure(capital_by_type_box(inputs['graficos']['capital_por_tipo'])),
+             _figure(services_by_type_heatmap(inputs['servicios_por_tipo']))),
+        _heading("📅 Línea Temporal de Registros"),
+        _figure(registrations_area(inputs['registros_anuales'])),
+    ]
+
+EXPLORER_PAGE_SIZE = 500
+
+def _explorer_page_name(page):
+    return 'explorador.html' if page == 1 else f"explorador-{page}.html"
+
+def explorer_page_count(inputs):
+    return max(1, -(-len(inputs['fichas']) // EXPLORER_PAGE_SIZE))
+
+def page_explorer(inputs, page=1):
+    """Directorio paginado: EXPLORER_PAGE_SIZE entidades por fichero, nunca el registro completo en un documento"""
+    profiles = inputs['fichas'][['nombre', 'tipo_entidad', 'numero_registro', 'direccion_provincia', 'capital_social_numeric',
+                                 'num_servicios_inversion', 'num_servicios_auxiliares', 'num_instrumentos', 'tipos_clientes',
+                                 'ultimo_auditor']]
+    profiles = profiles.sort_values('nombre').rename(columns={
+        'nombre': 'Nombre', 'tipo_entidad': 'Tipo', 'numero_registro': 'Nº Registro', 'direccion_provincia': 'Provincia',
+        'capital_social_numeric': 'Capital Social (€)', 'num_servicios_inversion': 'Serv. Inversión',
+        'num_servicios_auxiliares': 'Serv. Auxiliares', 'num_instrumentos': 'Instrumentos', 'tipos_clientes': 'Clientes',
+        'ultimo_auditor': 'Último Auditor',
+    })
+    pages = explorer_page_count(inputs)
+    links = ' · '.join(filter(None, [
+        f"<a href='{_explorer_page_name(page - 1)}'>« Anterior</a>" if page > 1 else '',
+        f"Página {page} de {pages}",
+        f"<a href='{_explorer_page_name(page + 1)}'>Siguiente »</a>" if page < pages else '',
+    ]))
+    pager = f"<p class='caption'>{links}</p>"
+    return [
+        _heading(f"{len(profiles)} entidades registradas", "Directorio de la extracción; la búsqueda y los filtros requieren la app interactiva."),
+        pager,
+        _table(profiles.iloc[(page - 1) * EXPLORER_PAGE_SIZE:page * EXPLORER_PAGE_SIZE], float_format='{:,.0f}'.format),
+        pager,
+    ]
+
+def page_comparison(inputs):
+    services = inputs['servicios_por_tipo']
+    capital = inputs['distribucion_capital'].set_index('tipo_entidad')
+    types = services['tipo_entidad']
+    table = pd.DataFrame({
+        'Tipo': types,
+        'Entidades': capital['n'].reindex(types).fillna(0).astype(int).to_numpy(),
+        'Capital Medio (€)': capital['media'].reindex(types).to_numpy(),
+        'Capital Mediano (€)': capital['mediana'].reindex(types).to_numpy(),
+        **{f"{label} (media)": services[column].to_numpy() for label, column in TYPE_MEASURES.items()},
+    })
+    return [
+        _heading("Comparación SAV frente a EAF", "Comparación por tipo de entidad; la comparación entre entidades concretas requiere la app interactiva."),
+        _row(_figure(type_profile_radar(services)), _figure(type_means_bar(services))),
+        _heading("Comparación Detallada"),
+        _table(table),
+    ]
+
+def page_geography(inputs):
+    provinces = inputs['provincias']
+    presence = inputs['presencia_internacional']
+    return [
+        _figure(provinces_treemap(provinces)),
+        _row(_figure(top_provinces_bar(provinces, color='capital_total')), _figure(province_capital_pie(provinces))),
+        _heading("🌍 Análisis de Presencia Internacional"),
+        _metrics(international_metrics(presence)),
+        _figure(international_bar(presence)),
+    ]
+
+def page_services(inputs):
+    services = inputs['servicios_por_tipo']
+    charts = inputs['graficos']
+    cooccurrence = inputs['coocurrencia_instrumentos'].pivot(index='instrumento_a', columns='instrumento_b', values='entidades')
+    return [
+        _metrics(services_metrics(inputs['kpis'].iloc[0])),
+        _heading("Análisis de Distribución de Servicios"),
+        _row(_figure(service_histogram(charts['servicios_inversion'], "Distribución de Servicios de Inversión",
+                                       'Número de Servicios de Inversión', '#60A5FA')),
+             _figure(service_histogram(charts['servicios_auxiliares'], "Distribución de Servicios Auxiliares",
+                                       'Número de Servicios Auxiliares', '#34D399'))),
+        _heading("🔄 Comparabilidad de Servicios entre Entidades"),
+        _row(_table(services_by_type_table(services).reset_index()), _figure(type_means_bar(services))),
+        _heading("📊 Análisis de Correlación de Servicios"),
+        _figure(correlation_heatmap(inputs['correlacion_servicios'])),
+        _heading("📊 Análisis de Instrumentos Ofrecidos"),
+        _figure(instrument_coverage_bar(inputs['cobertura_instrumentos'])),
+        _row(_figure(instrument_ranges_pie(inputs['rangos_instrumentos'])), _figure(instruments_by_type_bar(services))),
+        _heading("🔗 Co-ocurrencia de Instrumentos", "Todas las entidades; los filtros requieren la app interactiva."),
+        _row(_figure(cooccurrence_heatmap(cooccurrence)), _figure(bundles_bar(inputs['combinaciones_instrumentos']))),
+        _heading("Reglas de Asociación", "Soporte ≥ 10 %, confianza ≥ 70 %"),
+        _table(inputs['reglas_instrumentos']),
+        _heading("🏆 Principales Proveedores de Servicios"),
+        _figure(top_services_bar(inputs['top_servicios'])),
+        _row(_figure(service_matrix_heatmap(inputs['top_servicios'])),
+             _figure(service_categories_bar(inputs['categorias_servicios']))),
+    ]
+
+def page_financial_health(inputs):
+    kpis = inputs['kpis'].iloc[0]
+    return [
+        _heading("💵 Análisis de Capital Social"),
+        _metrics(capital_metrics(kpis)),
+        _heading("📊 Ranking de Entidades por Capital Social"),
+        _figure(top_capital_bar(inputs['top_capital'])),
+        _metrics(concentration_metrics(inputs['concentracion_capital'].iloc[0])),
+        _heading("🔍 Cumplimiento de Auditorías"),
+        _metrics(audit_metrics(kpis)),
+        _row(_figure(audits_by_type_bar(inputs['auditorias_por_tipo'])), _figure(top_auditors_bar(inputs['top_auditores']))),
+    ]
+
+def page_segmentation(inputs):
+    segments = inputs['segmentos_cliente']
+    leaders = inputs['lideres_segmento_cliente']
+    return [
+        _metrics(client_metrics(segments)),
+        _heading("Cobertura por Tipo de Cliente"),
+        _row(_figure(client_types_pie(segments)), _figure(client_combinations_bar(inputs['combinaciones_cliente']))),
+        _heading("Oferta de Servicios por Tipo de Cliente"),
+        _figure(client_services_heatmap(segments)),
+        _heading("Análisis de Especialización de Entidades"),
+        _figure(specialization_bar(inputs['especializacion_cliente'])),
+        _heading("Distribución de Capital por Segmento de Cliente"),
+        _figure(capital_by_client_box(inputs['graficos']['capital_por_cliente'])),
+        _heading("Top Entidades por Segmento de Cliente"),
+        _row(*(_heading(label) + _table(leaders.loc[leaders['segmento'] == segment,
+                                                    ['nombre', 'capital_social', 'num_servicios_inversion', 'num_instrumentos']])
+               for label, segment in [("Especialistas Minoristas", 'Minoristas'), ("Enfoque Profesional", 'Profesionales'),
+                                      ("Servicio Completo", 'Servicio Completo')])),
+    ]
+
+# File stem -> (title, builder(inputs), inputs it reads), in the order of the original dashboard.
+# Inputs are SUMMARIES names plus 'graficos' (sav_eaf.charts.chart_data).
+PAGES = {
+    'vista-general': ("🏠 Vista General", page_overview,
+                      ['kpis', 'tipos_entidad', 'provincias', 'servicios_por_tipo', 'registros_anuales', 'graficos']),
+    'explorador': ("🔍 Explorador de Entidades", page_explorer, ['fichas']),
+    'comparativo': ("📊 Análisis Comparativo", page_comparison, ['servicios_por_tipo', 'distribucion_capital']),
+    'geografia': ("🗺️ Inteligencia Geográfica", page_geography, ['provincias', 'presencia_internacional']),
+    'servicios': ("💼 Análisis de Servicios", page_services,
+                  ['kpis', 'servicios_por_tipo', 'correlacion_servicios', 'cobertura_instrumentos', 'rangos_instrumentos',
+                   'coocurrencia_instrumentos', 'combinaciones_instrumentos', 'reglas_instrumentos', 'top_servicios',
+                   'categorias_servicios', 'graficos']),
+    'salud-financiera': ("💰 Salud Financiera", page_financial_health,
+                         ['kpis', 'top_capital', 'concentracion_capital', 'auditorias_por_tipo', 'top_auditores']),
+    'segmentacion': ("👥 Segmentación de Clientes", page_segmentation,
+                     ['segmentos_cliente', 'combinaciones_cliente', 'especializacion_cliente', 'lideres_segmento_cliente',
+                      'graficos']),
+}
+
+@functools.lru_cache(maxsize=1)
+def _plotly_js():
+    return get_plotlyjs()
+
+def _document(title, body, nav, meta, shared_plotly):
+    links = ''.join(
+        f"<a href='{slug}.html'{' class=active' if label == title else ''}>{html.escape(label)}</a>" for slug, label in nav
+    )
+    # Only pages with figures carry plotly.js
+    if 'Plotly.newPlot' not in body:
+        script = ''
+    elif shared_plotly:
+        script = "<script src='../plotly.min.js'></script>"
+    else:
+        script = f"<script>{_plotly_js()}</script>"
+    return f"""<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">
+<meta name="data-version" content="{meta['data_version']}">
+<title>{html.escape(title)} · SAV/EAF</title>{script}<style>{PAGE_STYLE}</style></head>
+<body><nav><a href='../index.html'>⬅ Extracciones</a>{links}</nav><main><h1>{html.escape(title)}</h1>
+<p class='caption'>Extracción {html.escape(meta['snapshot'])} · {html.escape(meta['fecha_extraccion'] or 'sin fecha')} · {meta['filas']} entidades · datos {meta['data_version']}</p>
+{body}
+<footer>Datos: Registro oficial de SAV y EAF. Exportación estática generada el {pd.Timestamp.now():%d/%m/%Y %H:%M}.</footer>
+</main></body></html>
+"""
+
+def _write_page(target, document):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(f"{target}.tmp", 'w', encoding='utf-8') as fh:
+        fh.write(document)
+    os.replace(f"{target}.tmp", target)
+
+def summarize_extraction(path, staging):
+    """Fase 1: cargar una extracción una sola vez y guardar en staging los agregados de cada página; devuelve sus metadatos"""
+    df, _ = load_extraction(path, update_index=False)
+    extraction = df['fecha_extraccion'].max()
+    meta = {
+        'snapshot': os.path.splitext(os.path.basename(path))[0],
+        'data_version': get_data_version(path),
+        'fecha_extraccion': None if pd.isna(extraction) else f"{extraction:%d/%m/%Y}",
+        'filas': len(df),
+    }
+    names = {name for _, _, needs in PAGES.values() for name in needs}
+    inputs = summarize(df, names=sorted(names - {'graficos'}))
+    inputs['graficos'] = chart_data(df)
+    directory = os.path.join(staging, meta['snapshot'])
+    os.makedirs(directory, exist_ok=True)
+    for slug, (_, _, needs) in PAGES.items():
+        with open(os.path.join(directory, f"{slug}.pkl"), 'wb') as fh:
+            pickle.dump({name: inputs[name] for name in needs}, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    return meta
+
+def render_page(staging, out_dir, meta, slug, shared_plotly=False):
+    """Fase 2: construir una página (el explorador, todos sus ficheros) desde sus agregados; devuelve bytes y segundos"""
+    start = time.perf_counter()
+    title, builder, _ = PAGES[slug]
+    with open(os.path.join(staging, meta['snapshot'], f"{slug}.pkl"), 'rb') as fh:
+        inputs = pickle.load(fh)
+    nav = [(key, label) for key, (label, _, _) in PAGES.items()]
+    size = 0
+    for page in range(1, explorer_page_count(inputs) + 1) if slug == 'explorador' else [None]:
+        blocks = builder(inputs) if page is None else builder(inputs, page)
+        document = _document(title, '\n'.join(blocks), nav, meta, shared_plotly)
+        name = f"{slug}.html" if page is None else _explorer_page_name(page)
+        _write_page(os.path.join(out_dir, meta['snapshot'], name), document)
+        size += len(document.encode('utf-8'))
+    return {'bytes': size, 'segundos': round(time.perf_counter() - start, 3)}
+
+def _up_to_date(path, out_dir, plotly_mode):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    try:
+        with open(os.path.join(out_dir, stem, 'manifest.json'), encoding='utf-8') as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return False
+    return (manifest.get('data_version') == get_data_version(path) and manifest.get('plotly') == plotly_mode
+            and all(os.path.exists(os.path.join(out_dir, stem, f"{slug}.html")) for slug in PAGES))
+
+def _write_indexes(out_dir, snapshots, complete):
+    """Índice de cada extracción y de la raíz; solo las extracciones completas reciben manifest"""
+    for stem in complete:
+        meta = snapshots[stem]
+        items = ''.join(f"<li><a href='{slug}.html'>{html.escape(label)}</a></li>" for slug, (label, _, _) in PAGES.items())
+        with open(os.path.join(out_dir, meta['snapshot'], 'index.html'), 'w', encoding='utf-8') as fh:
+            fh.write(f"<!DOCTYPE html><html lang='es'><head><meta charset='utf-8'><title>{html.escape(meta['snapshot'])}</title>"
+                     f"<style>{PAGE_STYLE}</style></head><body><main><h1>Extracción {html.escape(meta['snapshot'])}</h1>"
+                     f"<ul>{items}</ul></main></body></html>")
+        with open(os.path.join(out_dir, meta['snapshot'], 'manifest.json'), 'w', encoding='utf-8') as fh:
+            json.dump(meta, fh, ensure_ascii=False, indent=1)
+    rows = ''.join(
+        f"<tr><td><a href='{stem}/vista-general.html'>{html.escape(stem)}</a></td><td>{html.escape(meta.get('fecha_extraccion') or '—')}</td>"
+        f"<td>{meta.get('filas', '—')}</td><td>{meta.get('data_version', '—')}</td></tr>"
+        for stem, meta in sorted(snapshots.items(), reverse=True)
+    )
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as fh:
+        fh.write(f"<!DOCTYPE html><html lang='es'><head><meta charset='utf-8'><title>Dashboard SAV/EAF</title>"
+                 f"<style>{PAGE_STYLE}</style></head><body><main><h1>Dashboard SAV/EAF · Extracciones</h1>"
+                 f"<table><tr><th>Extracción</th><th>Fecha</th><th>Entidades</th><th>Versión de datos</th></tr>{rows}</table>"
+                 f"</main></body></html>")
+
+class _InlineExecutor:
+    """Ejecutor que corre cada tarea al enviarla, en este proceso (--workers 1)"""
+
+    def submit(self, function, *args):
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+def export_site(paths, out_dir, workers=None, force=False, shared_plotly=False, log=sys.stderr):
+    """Exportar las páginas de todas las extracciones en paralelo; devuelve el resumen de la exportación"""
+    os.makedirs(out_dir, exist_ok=True)
+    plotly_mode = 'compartido' if shared_plotly else 'incrustado'
+    plotly_js = os.path.join(out_dir, 'plotly.min.js')
+    if shared_plotly and not os.path.exists(plotly_js):
+        with open(plotly_js, 'w', encoding='utf-8') as fh:
+            fh.write(get_plotlyjs())
+
+    pending = [path for path in paths if force or not _up_to_date(path, out_dir, plotly_mode)]
+    # Workers read the entity index only: register new entities once, in date order, before the fan-out
+    register_entities(pending)
+    snapshots = {}
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if path not in pending:
+            with open(os.path.join(out_dir, stem, 'manifest.json'), encoding='utf-8') as fh:
+                snapshots[stem] = json.load(fh)
+    errors = []
+    pages = 0
+    done = 0
+    progress = {}
+
+    def finished_extraction(path):
+        nonlocal done
+        done += 1
+        state = progress[path]
+        failures = sum(error['snapshot'] == state['stem'] for error in errors)
+        print(f"[{done}/{len(pending)}] {os.path.basename(path)}: {state['written']} páginas ({state['seconds']:.2f} s)"
+              + (f", {failures} errores" if failures else ''), file=log)
+
+    start = time.perf_counter()
+    staging = tempfile.mkdtemp(prefix='.resumenes-', dir=out_dir)
+    try:
+        with (_InlineExecutor() if workers == 1 else ProcessPoolExecutor(max_workers=workers)) as pool:
+            # One task per extraction computes its summaries; one task per (extraction, page) renders it
+            running = {pool.submit(summarize_extraction, path, staging): (path, None) for path in pending}
+            while running:
+                completed, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    path, slug = running.pop(future)
+                    stem = os.path.splitext(os.path.basename(path))[0]
+                    try:
+                        result = future.result()
+                    except Exception as error:
+                        errors.append({'snapshot': stem, 'pagina': slug, 'error': repr(error)})
+                        if slug is None:
+                            progress[path] = {'stem': stem, 'left': 0, 'written': 0, 'seconds': 0.0}
+                            finished_extraction(path)
+                            continue
+                    else:
+                        if slug is None:
+                            meta = result
+                            snapshots[stem] = {**meta, 'plotly': plotly_mode}
+                            progress[path] = {'stem': stem, 'left': len(PAGES), 'written': 0, 'seconds': 0.0}
+                            for page in PAGES:
+                                running[pool.submit(render_page, staging, out_dir, meta, page, shared_plotly)] = (path, page)
+                            continue
+                        progress[path]['written'] += 1
+                        progress[path]['seconds'] += result['segundos']
+                        pages += 1
+                    progress[path]['left'] -= 1
+                    if not progress[path]['left']:
+                        finished_extraction(path)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    _write_indexes(out_dir, snapshots, set(snapshots) - {error['snapshot'] for error in errors})
+    return {
+        'extracciones': len(paths),
+        'omitidas': len(paths) - len(pending),
+        'paginas': pages,
+        'errores': errors,
+        'segundos': round(time.perf_counter() - start, 3),
+    }
@@ -0,0 +1,302 @@
+"""Agregados de cada página del dashboard como DataFrames, sin Streamlit.
+
+Cada función recibe el DataFrame de una extracción (load_extraction) y los bitmasks de
+instrumentos (instrument_masks) y devuelve una tabla plana, apta para Parquet o JSON. Son la
+única fuente de los agregados: las páginas de la app los leen con views.data.page_summaries y la
+CLI, la API y el sitio estático con summarize.
+"""
+import numpy as np
+import pandas as pd
+
+from sav_eaf.core import (
+    INSTRUMENTS, INSTRUMENT_BITS, INSTRUMENT_CODES, SCORE_FEATURES, instrument_bundles, instrument_cooccurrence,
+    instrument_masks, instrument_rules, rank_entities, score_features,
+)
+
+CLIENT_TYPES = ['Minoristas', 'Profesionales', 'Contrapartes elegibles']
+CORRELATION_COLUMNS = ['num_servicios_inversion', 'num_servicios_auxiliares', 'num_instrumentos',
+                       'capital_social_numeric', 'years_operating']
+
+def box_stats(values):
+    """Cuartiles, media y bigotes (1,5 IQR) de una serie, tal como los dibuja un box plot de plotly"""
+    values = values.dropna()
+    if values.empty:
+        return {'n': 0, 'media': np.nan, 'q1': np.nan, 'mediana': np.nan, 'q3': np.nan,
+                'bigote_inferior': np.nan, 'bigote_superior': np.nan}
+    q1, median, q3 = values.quantile([0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    return {
+        'n': len(values),
+        'media': values.mean(),
+        'q1': q1,
+        'mediana': median,
+        'q3': q3,
+        'bigote_inferior': values[values >= q1 - 1.5 * iqr].min(),
+        'bigote_superior': values[values <= q3 + 1.5 * iqr].max(),
+    }
+
+def histogram_bins(values, bins=15):
+    """Histograma precalculado: intervalos [inicio, fin) y nº de entidades; enteros con rango corto, un bin por valor"""
+    values = values.dropna().to_numpy(dtype=float)
+    if not len(values):
+        return pd.DataFrame({'inicio': [], 'fin': [], 'entidades': []})
+    low, high = values.min(), values.max()
+    if np.all(values == np.round(values)) and high - low < bins:
+        edges = np.arange(low, high + 2) - 0.5
+    else:
+        edges = np.histogram_bin_edges(values, bins=bins)
+    counts, edges = np.histogram(values, bins=edges)
+    return pd.DataFrame({'inicio': edges[:-1], 'fin': edges[1:], 'entidades': counts})
+
+def overview_kpis(df, masks):
+    """Indicadores de cabecera de la Vista General y de Salud Financiera (una fila)"""
+    capital = df['capital_social_numeric']
+    return pd.DataFrame([{
+        'entidades': len(df),
+        'entidades_sav': int((df['tipo_entidad'] == 'SAV').sum()),
+        'entidades_eaf': int((df['tipo_entidad'] == 'EAF').sum()),
+        'capital_total': capital.sum(),
+        'capital_medio': capital.mean(),
+        'capital_mediano': capital.median(),
+        'capital_maximo': capital.max(),
+        'presencia_internacional': int(df['has_international_presence'].sum()),
+        'media_servicios': df['total_services'].mean(),
+        'max_servicios': df['total_services'].max(),
+        'media_servicios_inversion': df['num_servicios_inversion'].mean(),
+        'media_servicios_auxiliares': df['num_servicios_auxiliares'].mean(),
+        'entidades_full_service': int((df['total_services'] >= 10).sum()),
+        'entidades_auditadas': int(df['num_auditorias'].notna().sum()),
+        'media_auditorias': df['num_auditorias'].mean(),
+        'auditorias_recientes': int((df['ultimo_ejercicio_auditado'] >= 2023).sum()),
+    }])
+
+def entities_by_type(df, masks):
+    """Entidades por tipo de entidad"""
+    return df['tipo_entidad'].value_counts().rename_axis('tipo_entidad').reset_index(name='entidades')
+
+def entities_by_province(df, masks):
+    """Entidades, capital, servicios y presencia internacional por provincia"""
+    province_stats = df.groupby('direccion_provincia').agg(
+        entidades=('id', 'count'),
+        capital_total=('capital_social_numeric', 'sum'),
+        media_servicios_inversion=('num_servicios_inversion', 'mean'),
+        presencia_internacional=('has_international_presence', 'sum'),
+    ).reset_index().rename(columns={'direccion_provincia': 'provincia'})
+    province_stats['capital_pct'] = province_stats['capital_total'] / province_stats['capital_total'].sum() * 100
+    return province_stats.sort_values('entidades', ascending=False, kind='stable')
+
+def capital_distribution(df, masks):
+    """Estadísticos de box plot del capital social por tipo de entidad"""
+    return pd.DataFrame([{'tipo_entidad': entity_type, **box_stats(group)}
+                         for entity_type, group in df.groupby('tipo_entidad')['capital_social_numeric']])
+
+def services_by_type(df, masks):
+    """Media, mediana y desviación de servicios e instrumentos por tipo de entidad"""
+    stats = df.groupby('tipo_entidad')[['num_servicios_inversion', 'num_servicios_auxiliares', 'num_instrumentos']].agg(
+        ['mean', 'median', 'std', 'max'])
+    stats.columns = [f"{column}_{stat}" for column, stat in stats.columns]
+    return stats.reset_index()
+
+def registrations_by_year(df, masks):
+    """Registros por año y tipo de entidad (Línea Temporal de Registros)"""
+    registered = df[df['fecha_registro'].notna()]
+    return registered.groupby([registered['fecha_registro'].dt.year.rename('año'), 'tipo_entidad']).size().reset_index(name='registros')
+
+def international_presence(df, masks):
+    """Presencia internacional por tipo de entidad, con EEE, fuera del EEE y sucursales en España"""
+    grouped = df.assign(
+        eee=df['num_libre_prestacion_eee'] > 0,
+        fuera_eee=df['num_libre_prestacion_fuera_eee'] > 0,
+        sucursales_espana=df['num_sucursales_espana'] > 0,
+    ).groupby('tipo_entidad')
+    presence = grouped.agg(
+        entidades=('id', 'count'),
+        presencia_internacional=('has_international_presence', 'sum'),
+        presencia_eee=('eee', 'sum'),
+        presencia_fuera_eee=('fuera_eee', 'sum'),
+        con_sucursales_espana=('sucursales_espana', 'sum'),
+    )
+    presence['pct_internacional'] = presence['presencia_internacional'] / presence['entidades'] * 100
+    return presence.reset_index()
+
+def instrument_coverage(df, masks):
+    """Entidades que ofrecen cada instrumento (a-k)"""
+    bits = np.array([INSTRUMENT_BITS[code] for code in INSTRUMENT_CODES], dtype=np.uint16)
+    counts = ((masks[:, None] & bits[None, :]) > 0).sum(axis=0)
+    return pd.DataFrame({'codigo': INSTRUMENT_CODES, 'instrumento': [INSTRUMENTS[code] for code in INSTRUMENT_CODES],
+                         'entidades': counts, 'pct': counts / max(len(df), 1) * 100})
+
+def instrument_ranges(df, masks):
+    """Distribución de entidades por número de instrumentos"""
+    ranges = pd.cut(df['num_instrumentos'], bins=[0, 3, 6, 9, 15],
+                    labels=['Básico (1-3)', 'Intermedio (4-6)', 'Avanzado (7-9)', 'Completo (10+)'])
+    return ranges.value_counts(sort=False).rename_axis('rango').reset_index(name='entidades').astype({'rango': str})
+
+def instrument_pairs(df, masks):
+    """Matriz de co-ocurrencia de instrumentos en formato largo"""
+    cooccurrence = instrument_cooccurrence(masks)
+    return cooccurrence.rename_axis('instrumento_a').rename_axis('instrumento_b', axis=1).stack().reset_index(name='entidades')
+
+def instrument_association_rules(df, masks):
+    """Reglas de asociación entre instrumentos con los umbrales por defecto de la página"""
+    return instrument_rules(masks, min_support=0.1, min_confidence=0.7)
+
+def instrument_combinations(df, masks):
+    """Combinaciones de instrumentos más frecuentes"""
+    return instrument_bundles(masks)
+
+def service_histograms(df, masks):
+    """Histogramas de servicios de inversión y auxiliares (formato largo, columna variable)"""
+    return pd.concat([histogram_bins(df[column]).assign(variable=column)
+                      for column in ['num_servicios_inversion', 'num_servicios_auxiliares']], ignore_index=True)
+
+def service_correlations(df, masks):
+    """Correlaciones entre servicios, instrumentos, capital y antigüedad en formato largo"""
+    correlations = df[CORRELATION_COLUMNS].corr()
+    return correlations.rename_axis('variable_a').rename_axis('variable_b', axis=1).stack().reset_index(name='correlacion')
+
+def service_categories(df, masks):
+    """Entidades por rango de servicios totales"""
+    categories = pd.cut(df['total_services'], bins=[0, 5, 10, 15, 20],
+                        labels=['Básico (0-5)', 'Intermedio (6-10)', 'Avanzado (11-15)', 'Completo (16+)'])
+    return categories.value_counts(sort=False).rename_axis('categoria').reset_index(name='entidades').astype({'categoria': str})
+
+def top_service_providers(df, masks):
+    """Top 15 entidades por servicios totales"""
+    return df.nlargest(15, 'total_services')[['entity_key', 'nombre', 'tipo_entidad', 'num_servicios_inversion',
+                                              'num_servicios_auxiliares', 'num_instrumentos', 'total_services']]
+
+def top_capital(df, masks):
+    """Top 20 entidades por capital social"""
+    return df.nlargest(20, 'capital_social_numeric')[['entity_key', 'nombre', 'tipo_entidad',
+                                                      'capital_social_numeric', 'direccion_provincia']]
+
+def capital_concentration(df, masks):
+    """Cuota del capital total de las 10 y 20 mayores entidades y de la mitad más pequeña (una fila)"""
+    capital = df['capital_social_numeric']
+    total = capital.sum()
+    return pd.DataFrame([{
+        'capital_total': total,
+        'pct_top10': capital.nlargest(10).sum() / total * 100,
+        'pct_top20': capital.nlargest(20).sum() / total * 100,
+        'pct_mitad_menor': capital.nsmallest(int(len(df) / 2)).sum() / total * 100,
+    }])
+
+def audits_by_type(df, masks):
+    """Auditorías por tipo de entidad"""
+    return df.groupby('tipo_entidad')['num_auditorias'].agg(['mean', 'count', 'sum']).reset_index()
+
+def top_auditors(df, masks):
+    """Firmas auditoras por número de entidades auditadas"""
+    auditors = df['auditores_unicos'].dropna().str.split(';').explode().str.strip()
+    return auditors.value_counts().head(10).rename_axis('auditor').reset_index(name='entidades')
+
+def client_segments(df, masks):
+    """Entidades y perfil medio de servicios por tipo de cliente atendido"""
+    rows = []
+    for client_type in CLIENT_TYPES:
+        segment = df[df['tipos_clientes'].str.contains(client_type, na=False)]
+        rows.append({
+            'tipo_cliente': client_type,
+            'entidades': len(segment),
+            'pct': len(segment) / max(len(df), 1) * 100,
+            'media_servicios_inversion': segment['num_servicios_inversion'].mean(),
+            'media_servicios_auxiliares': segment['num_servicios_auxiliares'].mean(),
+            'media_instrumentos': segment['num_instrumentos'].mean(),
+            'capital_medio': segment['capital_social_numeric'].mean(),
+        })
+    return pd.DataFrame(rows)
+
+def client_specialization(df, masks):
+    """Entidades especializadas en un tipo de cliente frente a servicio completo"""
+    serves = {client_type: df['tipos_clientes'].str.contains(client_type, na=False) for client_type in CLIENT_TYPES}
+    retail, professional, eligible = serves.values()
+    counts = {
+        'Solo Minoristas': int((retail & ~professional & ~eligible).sum()),
+        'Solo Profesionales': int((~retail & professional & ~eligible).sum()),
+        'Servicio Completo': int((retail & professional & eligible).sum()),
+    }
+    counts['Otros'] = len(df) - sum(counts.values())
+    return pd.DataFrame({'especializacion': list(counts), 'entidades': list(counts.values())})
+
+def client_segment_capital(df, masks):
+    """Estadísticos de box plot del capital social por tipo de cliente atendido"""
+    return pd.DataFrame([
+        {'tipo_cliente': client_type,
+         **box_stats(df.loc[df['tipos_clientes'].str.contains(client_type, na=False), 'capital_social_numeric'])}
+        for client_type in CLIENT_TYPES
+    ])
+
+def client_segment_leaders(df, masks):
+    """Top 10 entidades por capital entre especialistas minoristas, enfoque profesional y servicio completo"""
+    serves = {client_type: df['tipos_clientes'].str.contains(client_type, na=False) for client_type in CLIENT_TYPES}
+    segments = {
+        'Minoristas': serves['Minoristas'],
+        'Profesionales': serves['Profesionales'],
+        'Servicio Completo': np.logical_and.reduce(list(serves.values())),
+    }
+    return pd.concat([
+        df[selected].nlargest(10, 'capital_social_numeric')[
+            ['entity_key', 'nombre', 'capital_social', 'num_servicios_inversion', 'num_instrumentos']
+        ].assign(segmento=segment)
+        for segment, selected in segments.items()
+    ], ignore_index=True)
+
+def client_combinations(df, masks):
+    """Combinaciones de tipos de cliente más frecuentes"""
+    return df['tipos_clientes'].value_counts().head(7).rename_axis('tipos_clientes').reset_index(name='entidades')
+
+def composite_ranking(df, masks):
+    """Ranking compuesto completo con ponderaciones iguales"""
+    weights = [5] * len(SCORE_FEATURES)
+    scores, order = rank_entities(score_features(df), weights, len(df))
+    ranking = df.iloc[order][['entity_key', 'nombre', 'tipo_entidad']].reset_index(drop=True)
+    ranking.insert(0, 'posicion', np.arange(1, len(ranking) + 1))
+    ranking['puntuacion'] = scores[order]
+    return ranking
+
+def entity_profiles(df, masks):
+    """Ficha resumida por entidad"""
+    return df[['entity_key', 'id', 'nombre', 'tipo_entidad', 'numero_registro', 'fecha_registro', 'direccion_provincia',
+               'capital_social_numeric', 'num_servicios_inversion', 'num_servicios_auxiliares', 'total_services',
+               'num_instrumentos', 'instrumentos_activos', 'tipos_clientes', 'has_international_presence',
+               'num_auditorias', 'ultimo_auditor', 'years_operating']].reset_index(drop=True)
+
+# Summary name -> function(df, masks), in page order
+SUMMARIES = {
+    'kpis': overview_kpis,
+    'tipos_entidad': entities_by_type,
+    'provincias': entities_by_province,
+    'distribucion_capital': capital_distribution,
+    'servicios_por_tipo': services_by_type,
+    'registros_anuales': registrations_by_year,
+    'presencia_internacional': international_presence,
+    'cobertura_instrumentos': instrument_coverage,
+    'rangos_instrumentos': instrument_ranges,
+    'coocurrencia_instrumentos': instrument_pairs,
+    'reglas_instrumentos': instrument_association_rules,
+    'combinaciones_instrumentos': instrument_combinations,
+    'histograma_servicios': service_histograms,
+    'correlacion_servicios': service_correlations,
+    'categorias_servicios': service_categories,
+    'top_servicios': top_service_providers,
+    'top_capital': top_capital,
+    'concentracion_capital': capital_concentration,
+    'auditorias_por_tipo': audits_by_type,
+    'top_auditores': top_auditors,
+    'segmentos_cliente': client_segments,
+    'especializacion_cliente': client_specialization,
+    'capital_segmentos_cliente': client_segment_capital,
+    'lideres_segmento_cliente': client_segment_leaders,
+    'combinaciones_cliente': client_combinations,
+    'ranking_compuesto': composite_ranking,
+    'fichas': entity_profiles,
+}
+
+def summarize(df, quality_report=None, names=None, masks=None):
+    """Calcular los agregados pedidos (todos por defecto) para una extracción: {nombre: DataFrame}"""
+    masks = instrument_masks(df) if masks is None else masks
+    summaries = {name: SUMMARIES[name](df, masks) for name in (names or SUMMARIES) if name in SUMMARIES}
+    if quality_report is not None and (names is None or 'calidad' in names):
+        summaries['calidad'] = quality_report['summary']
+    return summaries
@@ -0,0 +1,122 @@
+"""Registro sintético con el esquema completo de cnmv_entities_complete.csv, a cualquier escala.
+
+    python -m sav_eaf synthetic --rows 100000 [--extractions 4] [--out DIR] [--seed 42]
+
+Cada fila parte de una fila real elegida al azar (así las listas empaquetadas con «;», los
+servicios con sus códigos de instrumento [a-k] y los recuentos num_* siguen siendo coherentes
+entre sí) y se le asignan identidad, nombre, número de registro, fechas y capital nuevos. Las
+extracciones siguientes aplican bajas, altas y cambios de capital sobre la anterior.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from sav_eaf.core import DATA_FILE
+
+LEGAL_FORMS = {
+    'SAV': ['SOCIEDAD DE VALORES, S.A.', 'AGENCIA DE VALORES, S.A.', 'S.V., S.A.', 'A.V., S.A.', 'SOCIEDAD DE VALORES, S.A.U.'],
+    'EAF': ['EAF, S.L.', 'EAF, SOCIEDAD LIMITADA', 'EAF, S.A.', 'EAF, SL'],
+}
+NAME_WORDS = ['CAPITAL', 'PATRIMONIO', 'INVERSIONES', 'ASESORES', 'GLOBAL', 'MARKETS', 'WEALTH', 'PARTNERS', 'GESTION',
+              'FINANZAS', 'VALORES', 'ACTIVOS', 'BOLSA', 'ADVISORS', 'SECURITIES', 'FAMILY OFFICE']
+
+# Share of entities per extraction that leave, join, or change capital
+CHURN = {'bajas': 0.02, 'altas': 0.03, 'cambios_capital': 0.05}
+
+def _spanish_number(values):
+    """Formato español con dos decimales ('3.148.906,76'); NaN se conserva"""
+    text = pd.Series(values).map('{:,.2f}'.format, na_action='ignore')
+    return text.str.replace(',', '_', regex=False).str.replace('.', ',', regex=False).str.replace('_', '.', regex=False)
+
+def _name_stems(raw):
+    """Primera palabra distintiva de los nombres reales"""
+    stems = raw['nombre'].str.upper().str.extract(r'^([A-Z0-9&]{3,})', expand=False).dropna().unique()
+    return np.array(stems, dtype=object)
+
+ALPHABET = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'), dtype=object)
+
+def _letters(numbers, width=5):
+    """Sufijo alfabético único por número (0 -> 'AAAAA'), para que ningún nombre se repita"""
+    numbers = np.asarray(numbers)
+    suffix = pd.Series([''] * len(numbers), dtype=object)
+    for _ in range(width):
+        suffix = pd.Series(ALPHABET[numbers % 26]) + suffix
+        numbers = numbers // 26
+    return suffix.to_numpy()
+
+def _assign_identity(frame, rng, first_number, extraction, stems):
+    """Identidad, nombre, registro, fechas y capital nuevos para las filas de frame"""
+    n = len(frame)
+    sequence = np.arange(first_number, first_number + n)
+    entity_type = frame['tipo_entidad'].to_numpy(dtype=object)
+    is_sav = entity_type == 'SAV'
+
+    # Unique NIF-shaped ids (strictly increasing numbers); some keep the dash, as in the real register
+    numbers = 10_000_000 + sequence * 7 + rng.integers(0, 7, n)
+    letters = np.where(is_sav, 'A', rng.choice(np.array(['B', 'A']), n, p=[0.8, 0.2]))
+    dashes = np.where(rng.random(n) < 0.3, '-', '')
+    frame['id'] = (pd.Series(letters) + pd.Series(dashes) + pd.Series(numbers.astype(str))).to_numpy()
+
+    forms = np.where(is_sav, rng.choice(np.array(LEGAL_FORMS['SAV'], dtype=object), n),
+                     rng.choice(np.array(LEGAL_FORMS['EAF'], dtype=object), n))
+    frame['nombre'] = (pd.Series(rng.choice(stems, n)) + ' ' + pd.Series(rng.choice(NAME_WORDS, n)) + ' '
+                       + pd.Series(_letters(sequence)) + ', ' + pd.Series(forms)).to_numpy()
+    frame['numero_registro'] = sequence + 1
+
+    # Registration dates skewed towards recent years, never after the extraction
+    days = np.minimum(rng.exponential(4000, n), (extraction - pd.Timestamp('1989-01-01')).days).astype(int)
+    frame['fecha_registro'] = (extraction - pd.to_timedelta(days, unit='D')).strftime('%d/%m/%Y')
+
+    capital = np.round(np.exp(rng.normal(13.2, 1.3, n)), 2)
+    frame['capital_social'] = np.where(is_sav, _spanish_number(capital).to_numpy(dtype=object), None)
+    return frame
+
+def _stamp(frame, extraction, rng):
+    """fecha_extraccion con segundos crecientes, como en el scraping real"""
+    offsets = np.sort(rng.integers(0, 3600, len(frame)))
+    frame['fecha_extraccion'] = (extraction + pd.to_timedelta(offsets, unit='s')).strftime('%Y-%m-%d %H:%M:%S')
+    return frame
+
+def generate_register(rows, seed=42, source=DATA_FILE, extraction='2025-08-26'):
+    """Una extracción sintética de rows filas con el esquema de source"""
+    rng = np.random.default_rng(seed)
+    raw = pd.read_csv(source)
+    frame = raw.iloc[rng.integers(0, len(raw), rows)].reset_index(drop=True)
+    extraction = pd.Timestamp(extraction)
+    frame = _assign_identity(frame, rng, 0, extraction, _name_stems(raw))
+    frame = frame.sort_values(['tipo_entidad', 'numero_registro'], ascending=[False, True], kind='stable')
+    return _stamp(frame.reset_index(drop=True), extraction, rng)
+
+def evolve_register(frame, raw, rng, extraction):
+    """Extracción siguiente: bajas, altas con identidades nuevas y cambios de capital"""
+    n = len(frame)
+    evolved = frame[rng.random(n) >= CHURN['bajas']].reset_index(drop=True)
+    changed = (rng.random(len(evolved)) < CHURN['cambios_capital']) & evolved['capital_social'].notna().to_numpy()
+    capital = np.round(np.exp(rng.normal(13.2, 1.3, int(changed.sum()))), 2)
+    evolved.loc[changed, 'capital_social'] = _spanish_number(capital).to_numpy(dtype=object)
+
+    joining = raw.iloc[rng.integers(0, len(raw), int(n * CHURN['altas']))].reset_index(drop=True)
+    joining = _assign_identity(joining, rng, int(frame['numero_registro'].max()), extraction, _name_stems(raw))
+    return _stamp(pd.concat([evolved, joining], ignore_index=True), extraction, rng)
+
+def write_registers(rows, out_dir, extractions=1, seed=42, source=DATA_FILE, first='2025-08-26', months=3, reuse=False):
+    """Escribir extractions ficheros CSV (uno cada months meses); devuelve sus rutas, la última la más reciente
+
+    Con reuse=True no se regenera nada si todos los ficheros ya existen.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    dates = [pd.Timestamp(first) + pd.DateOffset(months=months * i) for i in range(extractions)]
+    paths = [os.path.join(out_dir, f"synthetic_{rows}_{date:%Y%m%d}.csv") for date in dates]
+    if reuse and all(os.path.exists(path) for path in paths):
+        return paths
+
+    rng = np.random.default_rng(seed + 1)
+    raw = pd.read_csv(source)
+    frame = generate_register(rows, seed, source, dates[0])
+    for i, (date, path) in enumerate(zip(dates, paths)):
+        if i:
+            frame = evolve_register(frame, raw, rng, date)
+        frame.to_csv(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+    return paths
@@ -0,0 +1,84 @@
+"""Tablas hijas normalizadas a partir de los campos compuestos del registro (una fila por elemento).
+
+Los campos como administradores, socios_principales o historial_auditorias llegan como listas
+separadas por «;»; aquí se descomponen una sola vez, con entity_key como clave de unión.
+"""
+import pandas as pd
+
+from sav_eaf.core import INSTRUMENT_CODES, parse_spanish_number
+
+def _items(df, column):
+    """Elementos de una lista «a; b; c» como (entity_key, elemento), en el orden del registro"""
+    items = df[column].dropna().astype(str).str.split(';').explode().str.strip()
+    items = items[items != '']
+    return pd.DataFrame({'entity_key': df['entity_key'].reindex(items.index).to_numpy(), 'elemento': items.to_numpy()})
+
+def board_members(df):
+    """Consejo y administradores: nombre y cargo"""
+    items = _items(df, 'administradores')
+    parts = items['elemento'].str.extract(r'^(?P<nombre>.*?)\s*\((?P<cargo>[^()]*)\)$')
+    return pd.DataFrame({
+        'entity_key': items['entity_key'],
+        'nombre': parts['nombre'].fillna(items['elemento']),
+        'cargo': parts['cargo'].str.upper(),
+    })
+
+def shareholders(df):
+    """Socios principales y su participación (%)"""
+    items = _items(df, 'socios_principales')
+    parts = items['elemento'].str.extract(r'^(?P<socio>.*):\s*(?P<pct>[\d.,]+)\s*%$')
+    return pd.DataFrame({
+        'entity_key': items['entity_key'],
+        'socio': parts['socio'].fillna(items['elemento']),
+        'participacion_pct': parse_spanish_number(parts['pct']),
+    })
+
+def audit_history(df):
+    """Historial de auditorías: ejercicio y firma auditora"""
+    items = _items(df, 'historial_auditorias')
+    parts = items['elemento'].str.extract(r'^(?P<ejercicio>\d{4}):\s*(?P<auditor>.*?)(?:\s*\[PDF\])?$')
+    return pd.DataFrame({
+        'entity_key': items['entity_key'],
+        'ejercicio': pd.to_numeric(parts['ejercicio'], errors='coerce').astype('Int64'),
+        'auditor': parts['auditor'].fillna(items['elemento']),
+    })
+
+def branches(df):
+    """Sucursales en España: dirección, código postal, localidad y provincia"""
+    items = _items(df, 'sucursales_espana')
+    parts = items['elemento'].str.extract(r'^(?P<direccion>.*) - (?P<cp>\d{5})\s+(?P<localidad>.*?)\s*\((?P<provincia>.*)\)$')
+    return pd.DataFrame({
+        'entity_key': items['entity_key'],
+        'direccion': parts['direccion'].fillna(items['elemento']),
+        'cp': parts['cp'],
+        'localidad': parts['localidad'].str.upper(),
+        'provincia': parts['provincia'].str.upper(),
+    })
+
+def service_instruments(df):
+    """Servicios de inversión y auxiliares con los instrumentos (a-k) autorizados para cada uno"""
+    frames = []
+    for kind, column in [('inversion', 'servicios_inversion_detalle'), ('auxiliar', 'servicios_auxiliares_detalle')]:
+        items = _items(df, column)
+        parts = items['elemento'].str.extract(r'^(?P<servicio>.*?)\s*(?:\[(?P<instrumentos>[^\]]*)\])?$')
+        instruments = ',' + parts['instrumentos'].fillna('').str.replace(' ', '') + ','
+        frames.append(pd.DataFrame({
+            'entity_key': items['entity_key'],
+            'tipo_servicio': kind,
+            'servicio': parts['servicio'],
+            **{code: instruments.str.contains(f',{code},', regex=False).astype(bool) for code in INSTRUMENT_CODES},
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+# Table name -> function(df), all keyed by entity_key
+CHILD_TABLES = {
+    'consejo': board_members,
+    'socios': shareholders,
+    'auditorias': audit_history,
+    'sucursales': branches,
+    'servicios': service_instruments,
+}
+
+def child_tables(df, names=None):
+    """Tablas hijas pedidas (todas por defecto): {nombre: DataFrame}"""
+    return {name: CHILD_TABLES[name](df) for name in (names or CHILD_TABLES) if name in CHILD_TABLES}
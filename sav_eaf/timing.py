@@ -0,0 +1,105 @@
+"""Spans de tiempo por rerun: carga de datos, derivados, páginas, figuras y tablas.
+
+Sin un Recorder activo cada punto instrumentado cuesta una lectura de ContextVar, así que la
+instrumentación puede quedarse en producción. Con SAV_EAF_TIMING=1 (o ?rendimiento=1 en la URL)
+cada rerun acumula sus spans; si SAV_EAF_TIMING_LOG apunta a un fichero, se añaden a él como
+líneas JSON (una por span) para analizarlos fuera de la app:
+
+    spans = pd.read_json('timing.jsonl', lines=True)
+    spans.groupby(['pagina', 'nombre'])['ms'].describe()
+"""
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+
+TIMING_ENABLED = os.environ.get('SAV_EAF_TIMING', '') not in ('', '0')
+TIMING_LOG = os.environ.get('SAV_EAF_TIMING_LOG')
+
+_recorder = contextvars.ContextVar('sav_eaf_timing', default=None)
+_log_lock = threading.Lock()
+_DISABLED = contextlib.nullcontext()
+
+class Recorder:
+    """Spans de un rerun, en orden de finalización"""
+
+    def __init__(self, **meta):
+        self.meta = {'rerun': uuid.uuid4().hex[:12], **meta}
+        self.spans = []
+        self.start = time.perf_counter()
+        # End of the last recorded span: what happened since then is attributed to the next element
+        self.mark = self.start
+        self.depth = 0
+
+    def add(self, kind, name, seconds, start=None, **extra):
+        now = time.perf_counter()
+        start = now - seconds if start is None else start
+        self.spans.append({'tipo': kind, 'nombre': name, 'nivel': self.depth,
+                           'inicio_ms': round((start - self.start) * 1000, 3), 'ms': round(seconds * 1000, 3), **extra})
+        self.mark = now
+
+class _Span:
+    __slots__ = ('recorder', 'kind', 'name', 'extra', 'start')
+
+    def __init__(self, recorder, kind, name, extra):
+        self.recorder, self.kind, self.name, self.extra = recorder, kind, name, extra
+
+    def __enter__(self):
+        self.recorder.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        self.recorder.depth -= 1
+        self.recorder.add(self.kind, self.name, seconds, self.start, **self.extra)
+        return False
+
+def current_recorder():
+    """Recorder del rerun en curso, o None si la instrumentación está desactivada"""
+    return _recorder.get()
+
+def span(kind, name, **extra):
+    """Context manager que mide un bloque como span (kind, name); no hace nada sin Recorder"""
+    recorder = _recorder.get()
+    return _DISABLED if recorder is None else _Span(recorder, kind, name, extra)
+
+def timed(kind, name=None):
+    """Decorador: cada llamada a la función es un span (kind, nombre de la función)"""
+    def decorate(function):
+        label = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder.get()
+            if recorder is None:
+                return function(*args, **kwargs)
+            with _Span(recorder, kind, label, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def start_rerun(**meta):
+    """Activar la instrumentación para el rerun en curso (hilo del script)"""
+    recorder = Recorder(**meta)
+    _recorder.set(recorder)
+    return recorder
+
+def finish_rerun(recorder, log_path=TIMING_LOG):
+    """Cerrar el rerun: desactivar la instrumentación, escribir el log y devolver el resumen"""
+    _recorder.set(None)
+    summary = {**recorder.meta, 'creado': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'total_ms': round((time.perf_counter() - recorder.start) * 1000, 3), 'spans': recorder.spans}
+    if log_path:
+        context = {key: value for key, value in summary.items() if key != 'spans'}
+        lines = ''.join(json.dumps({**context, **entry}, ensure_ascii=False) + '\n' for entry in recorder.spans)
+        try:
+            with _log_lock, open(log_path, 'a', encoding='utf-8') as fh:
+                fh.write(lines)
+        except OSError:
+            pass  # a read-only deployment still gets the in-app panel
+    return summary
@@ -0,0 +1,41 @@
+"""Registro de páginas del dashboard.
+
+Cada página es un módulo con una función render(df, data_version). Los módulos (y
+plotly) se importan en la primera navegación a la página, no al arrancar la app.
+"""
+import importlib
+import os
+
+import streamlit as st
+
+MEMORY_ENABLED = os.environ.get('SAV_EAF_MEMORY', '') not in ('', '0')
+
+# Sidebar label -> module in this package, in navigation order
+PAGES = {
+    "🏠 Vista General": "overview",
+    "🔍 Explorador de Entidades": "explorer",
+    "📊 Análisis Comparativo": "comparison",
+    "🗺️ Inteligencia Geográfica": "geography",
+    "💼 Análisis de Servicios": "services",
+    "💰 Salud Financiera": "financial_health",
+    "👥 Segmentación de Clientes": "segmentation",
+    "🏆 Ranking Compuesto": "ranking",
+    "🧪 Calidad de Datos": "quality",
+    "🔄 Cambios": "changes",
+    "👁️ Vigilancia": "watchlists",
+    "⏳ Cohortes": "cohorts",
+}
+# Diagnostic pages: listed only with SAV_EAF_MEMORY=1 or ?memoria=1, like ?perfil=1 and ?rendimiento=1
+DIAGNOSTIC_PAGES = {
+    "🧠 Memoria": "memory",
+}
+
+def navigation():
+    """Etiquetas de la navegación de esta sesión"""
+    if MEMORY_ENABLED or st.query_params.get('memoria') == '1':
+        return list(PAGES) + list(DIAGNOSTIC_PAGES)
+    return list(PAGES)
+
+def load_page(label):
+    """Módulo de la página (importado una sola vez por proceso)"""
+    return importlib.import_module(f"{__name__}.{PAGES.get(label) or DIAGNOSTIC_PAGES[label]}")
@@ -0,0 +1,116 @@
+"""Página «Cambios»"""
+import os
+import streamlit as st
+import plotly.express as px
+
+from sav_eaf.core import (
+    DATA_FILE, DIFF_FIELDS, SNAPSHOT_DIR, get_data_version, list_snapshots, serialize_delta,
+)
+from views.data import compute_delta
+from views.fragments import fragment
+
+def render(df, data_version):
+    st.title("🔄 Cambios entre Extracciones")
+    st.markdown("Altas, bajas y cambios campo a campo entre dos versiones del registro")
+
+    snapshots = list_snapshots(exclude_version=data_version)
+    if len(snapshots) < 2:
+        st.info(f"👆 Copie extracciones anteriores de '{os.path.basename(DATA_FILE)}' en la carpeta "
+                f"'{SNAPSHOT_DIR}/' para compararlas con la actual")
+    else:
+        # Snapshot choice, feed filters and results rerun as a fragment, not as a full app rerun
+        @fragment
+        def changes_view():
+            labels = list(snapshots)
+            col1, col2 = st.columns(2)
+            with col1:
+                old_label = st.selectbox("Extracción Anterior", labels, index=1)
+            with col2:
+                new_label = st.selectbox("Extracción Nueva", labels, index=0)
+
+            old_path, new_path = snapshots[old_label], snapshots[new_label]
+            delta, delta_meta = compute_delta(old_path, get_data_version(old_path), new_path, get_data_version(new_path))
+
+            # Summary metrics
+            col1, col2, col3, col4 = st.columns(4)
+
+            with col1:
+                st.metric("Altas", int((delta['cambio'] == 'alta').sum()))
+
+            with col2:
+                st.metric("Bajas", int((delta['cambio'] == 'baja').sum()))
+
+            with col3:
+                modified = delta[delta['cambio'] == 'modificación']
+                st.metric("Entidades Modificadas", modified['entity_key'].nunique())
+
+            with col4:
+                st.metric("Cambios de Campo", len(modified))
+
+            st.markdown(f"<small style='color: #94A3B8;'>Extracción {delta_meta['old_extraction']} "
+                        f"({delta_meta['entities_old']} entidades) → {delta_meta['new_extraction']} "
+                        f"({delta_meta['entities_new']} entidades)</small>", unsafe_allow_html=True)
+
+            if delta.empty:
+                st.success("✅ No hay diferencias entre las dos extracciones")
+            else:
+                # Changes by field group
+                changes_by_group = delta.assign(grupo=delta['grupo'].fillna(delta['cambio'])).groupby('grupo')['entity_key'].nunique()
+                fig_changes = px.bar(
+                    x=changes_by_group.values,
+                    y=changes_by_group.index,
+                    orientation='h',
+                    title="Entidades Afectadas por Tipo de Cambio",
+                    labels={'x': 'Número de Entidades', 'y': 'Tipo de Cambio'},
+                    color=changes_by_group.values,
+                    color_continuous_scale=[[0, '#0F172A'], [0.5, '#60A5FA'], [1, '#93C5FD']]
+                )
+                fig_changes.update_layout(
+                    height=350,
+                    showlegend=False,
+                    paper_bgcolor='#1E293B',
+                    plot_bgcolor='#0F172A',
+                    font=dict(color='#F1F5F9', size=12),
+                    title_font=dict(size=16, color='#F1F5F9'),
+                    xaxis=dict(gridcolor='#334155', zerolinecolor='#334155'),
+                    yaxis=dict(gridcolor='#334155', zerolinecolor='#334155'),
+                    coloraxis_colorbar=dict(
+                        title_font_color='#CBD5E1',
+                        tickfont_color='#CBD5E1'
+                    )
+                )
+                st.plotly_chart(fig_changes, use_container_width=True)
+
+                # Feed filters
+                st.markdown("### 📰 Registro de Cambios")
+                col1, col2, col3, col4 = st.columns(4)
+
+                with col1:
+                    change_types = st.multiselect("Cambio", ['alta', 'baja', 'modificación'], default=['alta', 'baja', 'modificación'])
+
+                with col2:
+                    groups = st.multiselect("Campo", list(DIFF_FIELDS), default=list(DIFF_FIELDS))
+
+                with col3:
+                    feed_type = st.selectbox("Tipo de Entidad", ["Todas", "SAV", "EAF"], key="feed_type")
+
+                with col4:
+                    feed_search = st.text_input("🔎 Entidad", placeholder="Nombre...", key="feed_search")
+
+                feed = delta[delta['cambio'].isin(change_types) & (delta['grupo'].isna() | delta['grupo'].isin(groups))]
+                if feed_type != "Todas":
+                    feed = feed[feed['tipo_entidad'] == feed_type]
+                if feed_search:
+                    feed = feed[feed['nombre'].str.contains(feed_search, case=False, na=False, regex=False)]
+
+                st.markdown(f"**{len(feed)}** cambios")
+                st.dataframe(feed, use_container_width=True, hide_index=True, height=500)
+
+                st.download_button(
+                    label="📥 Descargar Delta (JSON Lines)",
+                    data=serialize_delta(delta, delta_meta),
+                    file_name=f"delta_{delta_meta['old_version']}_{delta_meta['new_version']}.jsonl.gz",
+                    mime="application/gzip"
+                )
+
+        changes_view()
@@ -0,0 +1,153 @@
+"""Página «Cohortes»"""
+import streamlit as st
+import plotly.express as px
+import plotly.graph_objects as go
+
+from sav_eaf.core import COHORT_DIMENSIONS, SNAPSHOT_DIR, snapshot_history
+from views.data import compute_cohorts
+from views.fragments import fragment
+
+def render(df, data_version):
+    st.title("⏳ Cohortes y Supervivencia")
+    st.markdown("Altas, bajas y supervivencia de las entidades por cohorte de registro, a partir del histórico de extracciones")
+
+    cohorts = compute_cohorts(data_version, snapshot_history(data_version))
+    if cohorts is None:
+        st.warning("⚠️ No hay extracciones con fecha de extracción válida")
+        st.stop()
+    meta = cohorts['meta']
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Extracciones", meta['extracciones'])
+    with col2:
+        st.metric("Entidades Observadas", f"{meta['entidades']:,}")
+    with col3:
+        st.metric("Bajas Observadas", f"{meta['bajas']:,}")
+    with col4:
+        st.metric("Periodo", f"{meta['primera']:%d/%m/%Y} – {meta['ultima']:%d/%m/%Y}")
+
+    if meta['extracciones'] < 2:
+        st.info(
+            f"Solo hay una extracción disponible. Las bajas se detectan al comparar extracciones: "
+            f"las nuevas se archivan automáticamente en `{SNAPSHOT_DIR}/` y el histórico se puede completar copiando allí extracciones anteriores."
+        )
+
+    # Type selection only reruns the flow charts
+    @fragment
+    def cohort_flows_view():
+        # Registrations vs deregistrations
+        st.markdown("### 📅 Altas y Bajas por Año")
+        flows = cohorts['flows']
+        flow_type = st.radio("Tipo", ["Todas", "SAV", "EAF"], horizontal=True, key="cohort_flow_type")
+        if flow_type != "Todas":
+            flows = flows[flows['tipo_entidad'] == flow_type]
+        yearly = flows.groupby('año')[['altas', 'bajas']].sum().reset_index()
+        yearly = yearly[yearly['año'] >= 1985]
+
+        fig_flows = go.Figure()
+        fig_flows.add_trace(go.Bar(x=yearly['año'], y=yearly['altas'], name='Altas', marker_color='#34D399'))
+        fig_flows.add_trace(go.Bar(x=yearly['año'], y=-yearly['bajas'], name='Bajas', marker_color='#F87171'))
+        fig_flows.update_layout(
+            title="Altas (registro) y Bajas (ausencia en una extracción posterior)",
+            barmode='relative',
+            height=400,
+            paper_bgcolor='#1E293B',
+            plot_bgcolor='#0F172A',
+            font=dict(color='#F1F5F9', size=12),
+            title_font=dict(size=16, color='#F1F5F9'),
+            xaxis=dict(title='Año', gridcolor='#334155', zerolinecolor='#334155'),
+            yaxis=dict(title='Entidades', gridcolor='#334155', zerolinecolor='#334155'),
+            legend=dict(font=dict(color='#CBD5E1'), bgcolor='#1E293B', bordercolor='#334155', borderwidth=1)
+        )
+        st.plotly_chart(fig_flows, use_container_width=True)
+
+        if meta['extracciones'] > 1:
+            stock = cohorts['stock'].rename_axis('Extracción').reset_index(name='Entidades registradas')
+            fig_stock = px.line(stock, x='Extracción', y='Entidades registradas', markers=True,
+                                title="Entidades Registradas en cada Extracción")
+            fig_stock.update_traces(line_color='#60A5FA')
+            fig_stock.update_layout(
+                height=300,
+                paper_bgcolor='#1E293B',
+                plot_bgcolor='#0F172A',
+                font=dict(color='#F1F5F9', size=12),
+                title_font=dict(size=16, color='#F1F5F9'),
+                xaxis=dict(gridcolor='#334155', zerolinecolor='#334155'),
+                yaxis=dict(gridcolor='#334155', zerolinecolor='#334155')
+            )
+            st.plotly_chart(fig_stock, use_container_width=True)
+
+    cohort_flows_view()
+
+    # Grouping and group-size changes only rerun the survival curves
+    @fragment
+    def survival_view():
+        # Survival curves
+        st.markdown("### 📉 Curvas de Supervivencia")
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            dimension = st.selectbox("Agrupar por", list(COHORT_DIMENSIONS), format_func=COHORT_DIMENSIONS.get)
+        curves, sizes = cohorts['survival'][dimension]
+        with col2:
+            min_size = st.slider("Tamaño mínimo del grupo", 1, 100, 10)
+        groups = sizes[sizes >= min_size].sort_values(ascending=False).index[:12]
+
+        fig_survival = go.Figure()
+        for group in groups:
+            curve = curves.loc[group].dropna()
+            fig_survival.add_trace(go.Scatter(x=curve.index, y=curve.values * 100, mode='lines', line_shape='hv',
+                                              name=f"{group} (n={sizes[group]})"))
+        fig_survival.update_layout(
+            title=f"Supervivencia por {COHORT_DIMENSIONS[dimension]}",
+            height=450,
+            paper_bgcolor='#1E293B',
+            plot_bgcolor='#0F172A',
+            font=dict(color='#F1F5F9', size=12),
+            title_font=dict(size=16, color='#F1F5F9'),
+            xaxis=dict(title='Años desde el registro', gridcolor='#334155', zerolinecolor='#334155'),
+            yaxis=dict(title='% aún registradas', range=[0, 105], gridcolor='#334155', zerolinecolor='#334155'),
+            legend=dict(font=dict(color='#CBD5E1'), bgcolor='#1E293B', bordercolor='#334155', borderwidth=1)
+        )
+        st.plotly_chart(fig_survival, use_container_width=True)
+        st.caption("Las entidades que causaron baja antes de la primera extracción disponible no son observables, "
+                   "por lo que la supervivencia de las cohortes antiguas está sobreestimada.")
+
+    survival_view()
+
+    # Cohort triangle
+    st.markdown("### 🔺 Matriz de Cohortes")
+    triangle = cohorts['triangle']
+    triangle = triangle[triangle.index >= 1985]
+    fig_triangle = go.Figure(data=go.Heatmap(
+        z=triangle.values * 100,
+        x=triangle.columns,
+        y=triangle.index.astype(str),
+        colorscale=[[0, '#0F172A'], [0.5, '#60A5FA'], [1, '#93C5FD']],
+        zmin=0,
+        zmax=100,
+        colorbar=dict(title='%'),
+        hovertemplate='Cohorte %{y}<br>Año %{x}: %{z:.1f}%<extra></extra>'
+    ))
+    fig_triangle.update_layout(
+        title="% de Cada Cohorte de Registro aún Registrada",
+        height=600,
+        paper_bgcolor='#1E293B',
+        plot_bgcolor='#0F172A',
+        font=dict(color='#F1F5F9', size=12),
+        title_font=dict(size=16, color='#F1F5F9'),
+        xaxis=dict(title='Años desde el registro', gridcolor='#334155'),
+        yaxis=dict(title='Año de registro', gridcolor='#334155')
+    )
+    st.plotly_chart(fig_triangle, use_container_width=True)
+
+    departed_expander = st.expander("📋 Entidades dadas de baja", on_change="rerun", key="cohort_departed_expander")
+    with departed_expander:
+        if departed_expander.open:
+            departed = cohorts['entities'][cohorts['entities']['fecha_baja'].notna()]
+            st.dataframe(
+                departed[['nombre', 'tipo_entidad', 'provincia', 'fecha_registro', 'ultima_extraccion', 'fecha_baja', 'años_vida']]
+                .sort_values('fecha_baja', ascending=False).round({'años_vida': 1}),
+                use_container_width=True,
+                hide_index=True
+            )
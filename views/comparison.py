@@ -0,0 +1,185 @@
+"""Página «Análisis Comparativo»"""
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from views.fragments import fragment
+
+def render(df, data_version):
+    st.title("📊 Análisis Comparativo")
+    st.markdown("Compare múltiples entidades lado a lado")
+    
+    # Selection and comparison rerun as a fragment: picking entities does not rebuild the rest of the app
+    @fragment
+    def comparison_view():
+        # Entity selection
+        entities = st.multiselect(
+            "Seleccione entidades para comparar (máximo 4)",
+            options=df['nombre'].tolist(),
+            max_selections=4
+        )
+    
+        if len(entities) >= 2:
+            compare_df = df[df['nombre'].isin(entities)]
+        
+            # Comparison metrics
+            st.markdown("### Comparación de Métricas Clave")
+        
+            metrics_data = []
+            for _, entity in compare_df.iterrows():
+                metrics_data.append({
+                    'Entidad': entity['nombre'][:30] + '...' if len(entity['nombre']) > 30 else entity['nombre'],
+                    'Capital Social': entity['capital_social_numeric'],
+                    'Servicios de Inversión': entity['num_servicios_inversion'],
+                    'Servicios Auxiliares': entity['num_servicios_auxiliares'],
+                    'Total Instrumentos': entity['num_instrumentos'],
+                    'Años Operando': entity['years_operating']
+                })
+        
+            metrics_df = pd.DataFrame(metrics_data)
+        
+            # Radar chart
+            categories = ['Servicios de Inversión', 'Servicios Auxiliares', 'Total Instrumentos']
+        
+            fig = go.Figure()
+        
+            colors = ['#60A5FA', '#34D399', '#FBBF24', '#F87171']
+        
+            for idx, entity_name in enumerate(metrics_df['Entidad']):
+                entity_data = metrics_df[metrics_df['Entidad'] == entity_name]
+            
+                # Normalize values for radar chart
+                values = []
+                for cat in categories:
+                    max_val = metrics_df[cat].max()
+                    if max_val > 0:
+                        values.append(entity_data[cat].values[0] / max_val * 100)
+                    else:
+                        values.append(0)
+            
+                fig.add_trace(go.Scatterpolar(
+                    r=values,
+                    theta=categories,
+                    fill='toself',
+                    name=entity_name,
+                    marker=dict(color=colors[idx])
+                ))
+        
+            fig.update_layout(
+                polar=dict(
+                    radialaxis=dict(
+                        visible=True,
+                        range=[0, 100],
+                        gridcolor='#334155',
+                        linecolor='#334155'
+                    ),
+                    bgcolor='#0F172A'
+                ),
+                showlegend=True,
+                title="Comparación de Servicios e Instrumentos",
+                height=500,
+                paper_bgcolor='#1E293B',
+                plot_bgcolor='#0F172A',
+                font=dict(color='#F1F5F9', size=12),
+                title_font=dict(size=16, color='#F1F5F9'),
+                legend=dict(
+                    font=dict(color='#CBD5E1'),
+                    bgcolor='#1E293B',
+                    bordercolor='#334155',
+                    borderwidth=1
+                )
+            )
+        
+            st.plotly_chart(fig, use_container_width=True)
+        
+            # Bar comparison
+            col1, col2 = st.columns(2)
+        
+            with col1:
+                fig_capital = px.bar(
+                    metrics_df,
+                    x='Entidad',
+                    y='Capital Social',
+                    title="Comparación de Capital Social",
+                    color='Entidad',
+                    color_discrete_sequence=['#60A5FA', '#34D399', '#FBBF24', '#F87171']
+                )
+                fig_capital.update_layout(
+                    showlegend=False,
+                    height=400,
+                    paper_bgcolor='#1E293B',
+                    plot_bgcolor='#0F172A',
+                    font=dict(color='#F1F5F9', size=12),
+                    title_font=dict(size=16, color='#F1F5F9'),
+                    xaxis=dict(gridcolor='#334155', zerolinecolor='#334155'),
+                    yaxis=dict(gridcolor='#334155', zerolinecolor='#334155')
+                )
+                st.plotly_chart(fig_capital, use_container_width=True)
+        
+            with col2:
+                services_comparison = metrics_df.melt(
+                    id_vars=['Entidad'],
+                    value_vars=['Servicios de Inversión', 'Servicios Auxiliares'],
+                    var_name='Tipo de Servicio',
+                    value_name='Cantidad'
+                )
+            
+                fig_services = px.bar(
+                    services_comparison,
+                    x='Entidad',
+                    y='Cantidad',
+                    color='Tipo de Servicio',
+                    title="Comparación de Servicios",
+                    barmode='group',
+                    color_discrete_map={'Servicios de Inversión': '#60A5FA', 'Servicios Auxiliares': '#34D399'}
+                )
+                fig_services.update_layout(
+                    height=400,
+                    paper_bgcolor='#1E293B',
+                    plot_bgcolor='#0F172A',
+                    font=dict(color='#F1F5F9', size=12),
+                    title_font=dict(size=16, color='#F1F5F9'),
+                    xaxis=dict(gridcolor='#334155', zerolinecolor='#334155'),
+                    yaxis=dict(gridcolor='#334155', zerolinecolor='#334155'),
+                    legend=dict(
+                        font=dict(color='#CBD5E1'),
+                        bgcolor='#1E293B',
+                        bordercolor='#334155',
+                        borderwidth=1
+                    )
+                )
+                st.plotly_chart(fig_services, use_container_width=True)
+        
+            # Detailed comparison table with better formatting
+            st.markdown("### Comparación Detallada")
+        
+            # Add explanation with instrument reference
+            st.markdown("""
+            <div style='background: linear-gradient(135deg, #1E3A8A 0%, #1E293B 100%); border: 1px solid #3B82F6; border-radius: 8px; padding: 1rem; margin-bottom: 1rem;'>
+                <p style='color: #DBEAFE; margin: 0; margin-bottom: 0.5rem;'>
+                <strong style='color: #93C5FD;'>💡 Tip:</strong> Los servicios e instrumentos son directamente comparables entre entidades.
+                </p>
+                <p style='color: #CBD5E1; margin: 0; font-size: 12px;'>
+                <strong>Instrumentos:</strong> a: Valores | b: Mercado monetario | c: Fondos | d: Derivados valores | e-f: Derivados materias primas | 
+                g: Otros derivados | h: Derivados crédito | i: CFDs | j: Derivados clima | k: Derechos emisión
+                </p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+            comparison_fields = ['nombre', 'tipo_entidad', 'capital_social', 'direccion_provincia',
+                                'num_servicios_inversion', 'num_servicios_auxiliares', 'num_instrumentos',
+                                'instrumentos_activos', 'fogain', 'num_auditorias', 'tipos_clientes']
+        
+            comparison_table = compare_df[comparison_fields].T
+            comparison_table.columns = [name[:30] + '...' if len(name) > 30 else name for name in entities]
+            comparison_table.index = ['Nombre', 'Tipo', 'Capital Social', 'Provincia', 
+                                     'Servicios Inversión', 'Servicios Auxiliares', 'Nº Instrumentos',
+                                     'Instrumentos Activos', 'FOGAIN', 'Auditorías', 'Tipos Cliente']
+        
+            st.dataframe(comparison_table, use_container_width=True)
+        
+        else:
+            st.info("👆 Por favor seleccione al menos 2 entidades para comparar")
+
+    comparison_view()
@@ -0,0 +1,280 @@
+"""Capa cacheada de la app: envuelve sav_eaf.core con st.cache_data, con la versión de datos como clave"""
+import functools
+import inspect
+import itertools
+import os
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+from sav_eaf.charts import chart_data
+from sav_eaf.core import (
+    DATA_FILE, archive_snapshot, cohort_tables, diff_snapshots, entity_cards, evaluate_watchlists,
+    instrument_masks, load_extraction, load_watch_store, name_search_index, quick_stats, read_rosters,
+    record_alerts, score_features, segment_entities, sort_permutations, updating_watch_store,
+)
+from sav_eaf.dataplane import DATA_PLANE_DIR, open_plane
+from sav_eaf.summaries import SUMMARIES
+from sav_eaf.timing import timed
+
+# Entries kept per cached function (a count, not a size); once full the least recently used one is
+# evicted. Override with SAV_EAF_CACHE_LIMITS="cached_extraction=2,cluster_entities=8".
+# The memory bound is CACHE_BUDGET_MB (see enforce_cache_budget).
+CACHE_LIMITS = {
+    'data_plane': 4,
+    'cached_extraction': 4,
+    'compute_delta': 16,
+    'run_watch_evaluation': 4,
+    'compute_cohorts': 8,
+    'cached_score_features': 4,
+    'cached_instrument_masks': 4,
+    'cluster_entities': 32,
+    'cached_sort_permutations': 4,
+    'build_entity_cards': 4,
+    'build_name_index': 4,
+    'chart_summaries': 4,
+    'cached_summary': 64,
+    'sidebar_stats': 4,
+}
+for _item in filter(None, os.environ.get('SAV_EAF_CACHE_LIMITS', '').split(',')):
+    _name, _, _limit = _item.partition('=')
+    if _name.strip() in CACHE_LIMITS and _limit.strip().isdigit():
+        CACHE_LIMITS[_name.strip()] = max(1, int(_limit))
+# Total bytes of st.cache_data (pickled sizes, as on the «Memoria» page); 0 = no bound
+CACHE_BUDGET_MB = float(os.environ.get('SAV_EAF_CACHE_BUDGET_MB', '0'))
+
+# Calls behind each st.cache_data entry, per function: {repr: (last use, args, kwargs, data versions)}.
+# enforce_cache_budget replays them with the public CachedFunc.clear(*args) to evict single entries.
+_CACHE_ENTRIES = {}
+_CACHED_FUNCTIONS = {}
+_cache_entries_lock = threading.Lock()
+_cache_uses = itertools.count()
+
+def _budgeted(function):
+    """Registrar las llamadas a una función de st.cache_data para poder descartar sus entradas una a una"""
+    name = function.__name__
+    parameters = list(inspect.signature(function).parameters)
+    entries = _CACHE_ENTRIES.setdefault(name, OrderedDict())
+    _CACHED_FUNCTIONS[name] = function
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        bound = {**dict(zip(parameters, args)), **kwargs}
+        # _parameters are not part of the cache key: clear() only needs a placeholder for them
+        key_args = tuple(None if parameter.startswith('_') else value for parameter, value in zip(parameters, args))
+        key_kwargs = {key: None if key.startswith('_') else value for key, value in kwargs.items()}
+        versions = {value for parameter, value in bound.items() if parameter.endswith('version')}
+        with _cache_entries_lock:
+            key = repr((key_args, sorted(key_kwargs.items())))
+            entries[key] = (next(_cache_uses), key_args, key_kwargs, versions)
+            entries.move_to_end(key)
+            # Streamlit drops the least recently used entry past max_entries: so does the registry
+            while len(entries) > CACHE_LIMITS[name]:
+                entries.popitem(last=False)
+        return function(*args, **kwargs)
+    return wrapper
+
+@st.cache_resource(max_entries=CACHE_LIMITS['data_plane'])
+def data_plane(data_version):
+    """Plano de datos compartido de la extracción actual (DATA_FILE), publicado si falta y mapeado una vez por proceso"""
+    return open_plane(DATA_FILE, data_version)
+
+def _published_plane(data_version):
+    """Plano de datos de esa versión si está activado y ya publicado"""
+    if DATA_PLANE_DIR and os.path.exists(os.path.join(DATA_PLANE_DIR, data_version, 'manifest.json')):
+        return data_plane(data_version)
+    return None
+
+@_budgeted
+@st.cache_data(max_entries=CACHE_LIMITS['cached_extraction'])
+def cached_extraction(data_version, path=DATA_FILE):
+    """Extracción preprocesada en la caché de datos (una copia deserializada por lectura)"""
+    return load_extraction(path)
+
+@timed('carga')
+def load_data(data_version, path=DATA_FILE):
+    """Cargar, validar y preprocesar una extracción; devuelve (df, informe de calidad)"""
+    # Only the live extraction is published: archived snapshots read for diffs stay in the data cache
+    if DATA_PLANE_DIR and os.path.abspath(path) == os.path.abspath(DATA_FILE):
+        plane = data_plane(data_version)
+        # New frame over the same mapped columns: pages add columns to it, never to the shared one
+        return plane.frame.copy(deep=False), dict(plane.quality_report)
+    return cached_extraction(data_version, path)
+
+@timed('derivados')
+@_budgeted
+@st.cache_data(max_entries=CACHE_LIMITS['compute_delta'])
+def compute_delta(old_path, old_version, new_path, new_version):
+    """Delta cacheado por el par de versiones de datos"""
+    old, _ = load_data(old_version, old_path)
+    new, _ = load_data(new_version, new_path)
+    delta = diff_snapshots(old, new)
+    meta = {
+        'old_version': old_version,
+        'new_version': new_version,
+        'old_extraction': str(old['fecha_extraccion'].max()),
+        'new_extraction': str(new['fecha_extraccion'].max()),
+        'entities_old': int(old['entity_key'].nunique()),
+        'entities_new': int(new['entity_key'].nunique()),
+    }
+    return delta, meta
+
+@timed('derivados')
+@st.cache_data(max_entries=CACHE_LIMITS['run_watch_evaluation'])
+def run_watch_evaluation(data_version):
+    """Evaluar las listas de vigilancia cuando llega una extracción nueva (una vez por versión y proceso)"""
+    store = load_watch_store()
+    current, _ = load_data(data_version)
+    archived = archive_snapshot(current, data_version)
+    baseline = store.get('baseline')
+
+    alerts = None
+    if baseline and baseline['version'] != data_version and os.path.exists(baseline['path']):
+        delta, _ = compute_delta(baseline['path'], baseline['version'], DATA_FILE, data_version)
+        alerts = evaluate_watchlists(store['watchlists'], delta)
+    new_alerts = 0
+    if alerts is not None or (archived and (not baseline or baseline['version'] != data_version)):
+        try:
+            # Re-read under the lock: other workers may have recorded this evaluation or edited lists
+            with updating_watch_store() as store:
+                if alerts is not None:
+                    new_alerts = record_alerts(store, alerts, baseline['version'], data_version)
+                if archived and (not store.get('baseline') or store['baseline']['version'] != data_version):
+                    store['baseline'] = {'version': data_version, 'path': archived}
+        except OSError:
+            pass
+    return new_alerts
+
+@timed('derivados')
+@_budgeted
+@st.cache_data(max_entries=CACHE_LIMITS['compute_cohorts'])
+def compute_cohorts(data_version, history):
+    """Matrices de cohortes precalculadas por versión de datos e histórico de extracciones"""
+    return cohort_tables(read_rosters([path for path, _ in history]))
+
+@_budgeted
+@st.cache_data(max_entries=CACHE_LIMITS['cached_score_features'])
+def cached_score_features(_df, data_version):
+    return score_features(_df)
+
+@timed('derivados')
+def build_score_features(df, data_version):
+    """Matriz float32 pre-normalizada (entidades x SCORE_FEATURES) para el ranking compuesto"""
+    plane = _published_plane(data_version)
+    return plane.score_features if plane else cached_score_features(df, data_version)
+
+@_budgeted
+@st.cache_data(max_entries=CACHE_LIMITS['cached_instrument_masks'])
+def cached_instrument_masks(_df, data_version):
+    return instrument_masks(_df)
+
+@timed('derivados')
+def build_instrument_masks(df, data_version):
+    """Bitmask uint16 de instrumentos activos por entidad (bit i = INSTRUMENT_CODES[i])"""
+    plane = _published_plane(data_version)
+    return plane.instrument_masks if plane else cached_instrument_masks(df, data_version)
+
+@timed('derivados')
+@_budgeted
+@st.cache_data(max_entries=CACHE_LIMITS['cluster_entities'])
+def cluster_entities(_df, data_version, k, feature_groups):
+    """Clustering cacheado por (versión de datos, k, conjunto de características)"""
+    return segment_entities(_df, k, feature_groups)
+
+@_budgeted
+@st.cache_data(max_entries=CACHE_LIMITS['cached_sort_permutations'])
+def cached_sort_permutations(_df, data_version, columns):
+    return sort_permutations(_df, columns)
+
+@timed('derivados')
+def build_sort_permutations(df, data_version, columns):
+    """Permutaciones de ordenación del explorador, calculadas una vez por versión de datos"""
+    plane = _published_plane(data_version)
+    if plane and plane.has_sort_permutations(columns):
+        return plane.sort_permutations(columns)
+    return cached_sort_permutations(df, data_version, columns)
+
+@timed('derivados')
+@_budgeted
+@st.cache_data(max_entries=CACHE_LIMITS['build_entity_cards'])
+def build_entity_cards(_df, data_version):
+    """Fichas de entidad prerrenderizadas, una vez por versión de datos"""
+    return entity_cards(_df)
+
+@timed('derivados')
+@_budgeted
+@st.cache_data(max_entries=CACHE_LIMITS['build_name_index'])
+def build_name_index(_df, data_version):
+    """Nombres normalizados para la búsqueda de entidades, una vez por versión de datos"""
+    return name_search_index(_df)
+
+@timed('derivados')
+@_budgeted
+@st.cache_data(max_entries=CACHE_LIMITS['chart_summaries'])
+def chart_summaries(_df, data_version):
+    """Cuartiles, bigotes, atípicos y bins de los gráficos de distribución, una vez por versión de datos"""
+    return chart_data(_df)
+
+@_budgeted
+@st.cache_data(max_entries=CACHE_LIMITS['cached_summary'])
+def cached_summary(_df, data_version, name):
+    plane = _published_plane(data_version)
+    published = plane.summaries([name]) if plane else {}
+    if name in published:
+        return published[name]
+    return SUMMARIES[name](_df, build_instrument_masks(_df, data_version))
+
+@timed('derivados')
+def page_summaries(df, data_version, *names):
+    """Agregados de sav_eaf.summaries que pinta una página ({nombre: DataFrame}), cada uno una vez por versión de datos"""
+    return {name: cached_summary(df, data_version, name) for name in names}
+
+@timed('derivados')
+@_budgeted
+@st.cache_data(max_entries=CACHE_LIMITS['sidebar_stats'])
+def sidebar_stats(_df, data_version):
+    """Estadísticas rápidas de la barra lateral, calculadas una vez por versión de datos"""
+    return quick_stats(_df, build_instrument_masks(_df, data_version))
+
+def cache_sizes():
+    """Bytes serializados de st.cache_data por función cacheada: {función: (entradas, bytes)}
+
+    Streamlit agrega sus estadísticas por función; el nº de entradas sale del registro de _budgeted
+    (1 para las funciones sin registrar).
+    """
+    from streamlit.runtime.caching import get_data_cache_stats_provider
+
+    sizes = {}
+    for family in get_data_cache_stats_provider().get_stats().values():
+        for stat in family:
+            name = stat.cache_name.rsplit('.', 1)[-1]
+            sizes[name] = sizes.get(name, 0) + stat.byte_length
+    with _cache_entries_lock:
+        return {name: (len(_CACHE_ENTRIES.get(name, ())) or 1, size) for name, size in sizes.items()}
+
+def enforce_cache_budget(data_version, budget_mb=CACHE_BUDGET_MB):
+    """Descartar entradas de st.cache_data hasta que quepa en budget_mb; devuelve las descartadas [(función, argumentos)]
+
+    Se descartan una a una, de la usada hace más tiempo a la más reciente, y solo las de versiones de
+    datos distintas de data_version (la que usa el rerun en curso). run_watch_evaluation no se registra:
+    archiva la extracción y anota alertas, y vaciarla repetiría esos efectos.
+    """
+    if not budget_mb:
+        return []
+    total = sum(size for _, size in cache_sizes().values())
+    if total <= budget_mb * 2**20:
+        return []
+    with _cache_entries_lock:
+        candidates = sorted((use, name, key, args, kwargs) for name, entries in _CACHE_ENTRIES.items()
+                            for key, (use, args, kwargs, versions) in entries.items() if data_version not in versions)
+    evicted = []
+    for _, name, key, args, kwargs in candidates:
+        _CACHED_FUNCTIONS[name].clear(*args, **kwargs)
+        with _cache_entries_lock:
+            _CACHE_ENTRIES[name].pop(key, None)
+        evicted.append((name, args))
+        total = sum(size for _, size in cache_sizes().values())
+        if total <= budget_mb * 2**20:
+            break
+    return evicted
@@ -0,0 +1,190 @@
+"""Página «Explorador de Entidades»"""
+import streamlit as st
+import numpy as np
+from datetime import datetime
+
+from sav_eaf.core import EXPLORER_COLUMNS, EXPLORER_DEFAULT_COLUMNS, explorer_mask, paginate_rows
+from sav_eaf.export import EXPORT_FORMATS, available_formats, export_file
+from views.data import build_entity_cards, build_sort_permutations
+from views.fragments import fragment
+
+def render(df, data_version):
+    st.title("🔍 Explorador de Entidades")
+    st.markdown("Busque y filtre todas las entidades reguladas")
+    
+    # Filters and results rerun as a fragment: a filter change does not rebuild the rest of the app
+    @fragment
+    def explorer_view():
+        # Filters - First row
+        col1, col2, col3, col4 = st.columns(4)
+    
+        with col1:
+            entity_type = st.selectbox("Tipo de Entidad", ["Todas", "SAV", "EAF"])
+    
+        with col2:
+            province = st.selectbox("Provincia", ["Todas"] + sorted(df['atencion_provincia'].dropna().unique()))
+    
+        with col3:
+            capital_range = st.slider(
+                "Rango de Capital Social (€)",
+                min_value=0,
+                max_value=int(df['capital_social_numeric'].max()),
+                value=(0, int(df['capital_social_numeric'].max())),
+                format="€%d"
+            )
+    
+        with col4:
+            intl_presence = st.selectbox("Presencia Internacional", ["Todas", "Sí", "No"])
+    
+        # Second row of filters - Instruments
+        col1, col2, col3, col4 = st.columns(4)
+    
+        with col1:
+            # Create instrument filter options
+            instrument_options = {
+                'Todos': None,
+                'a - Valores negociables': 'a',
+                'b - Mercado monetario': 'b',
+                'c - Fondos inversión': 'c',
+                'd - Derivados valores': 'd',
+                'e - Derivados mat. primas (efectivo)': 'e',
+                'f - Derivados mat. primas (físico)': 'f',
+                'g - Otros derivados': 'g',
+                'h - Derivados crédito': 'h',
+                'i - CFDs': 'i',
+                'j - Derivados clima': 'j',
+                'k - Derechos emisión': 'k'
+            }
+            instrument_filter = st.selectbox("Filtrar por Instrumento", list(instrument_options.keys()))
+    
+        with col2:
+            # Number of instruments range
+            num_instruments_range = st.slider(
+                "Número de Instrumentos",
+                min_value=0,
+                max_value=int(df['num_instrumentos'].max()),
+                value=(0, int(df['num_instrumentos'].max()))
+            )
+    
+        # Search box
+        search_term = st.text_input("🔎 Buscar por nombre de entidad", placeholder="Ingrese el nombre de la entidad...")
+    
+        # Apply filters: one boolean mask over df, no intermediate copies
+        selected_rows = explorer_mask(
+            df,
+            entity_type=None if entity_type == "Todas" else entity_type,
+            province=None if province == "Todas" else province,
+            capital_range=capital_range,
+            international={"Sí": True, "No": False}.get(intl_presence),
+            instrument=instrument_options[instrument_filter],
+            instruments_range=num_instruments_range,
+            search=search_term,
+        )
+        filtered_positions = np.flatnonzero(selected_rows)
+    
+        # Results summary
+        st.markdown(f"### Se encontraron {len(filtered_positions)} entidades")
+    
+        # Display options
+        col1, col2 = st.columns([3, 1])
+        with col2:
+            view_mode = st.radio("Modo de Vista", ["Tabla", "Tarjetas"], horizontal=True)
+    
+        if view_mode == "Tabla":
+            # Table view with instrument codes reference
+            st.markdown("""
+            <div style='background: #1E293B; padding: 0.5rem; border-radius: 6px; margin-bottom: 1rem;'>
+                <span style='color: #FBBF24; font-weight: bold;'>📌 Códigos de Instrumentos:</span>
+                <span style='color: #CBD5E1; font-size: 12px;'>
+                a: Valores negociables | b: Mercado monetario | c: Fondos | d: Derivados valores | e: Derivados materias primas (efectivo) | 
+                f: Derivados materias primas (físico) | g: Otros derivados | h: Derivados crédito | i: CFDs | j: Derivados clima | k: Derechos emisión
+                </span>
+            </div>
+            """, unsafe_allow_html=True)
+        
+            # Only the visible page and the chosen columns are serialized
+            available_columns = [col for col in EXPLORER_COLUMNS if col in df.columns]
+            col1, col2, col3 = st.columns([3, 1, 1])
+            with col1:
+                display_columns = st.multiselect(
+                    "Columnas",
+                    available_columns,
+                    default=[col for col in EXPLORER_DEFAULT_COLUMNS if col in available_columns]
+                ) or ['nombre']
+            with col2:
+                sort_column = st.selectbox("Ordenar por", available_columns)
+            with col3:
+                sort_ascending = st.radio("Orden", ["Ascendente", "Descendente"], key="explorer_sort_order") == "Ascendente"
+
+            permutations = build_sort_permutations(df, data_version, tuple(available_columns))
+
+            col1, col2, col3 = st.columns([1, 1, 2])
+            with col1:
+                page_size = st.selectbox("Filas por página", [25, 50, 100, 250], index=1)
+            total_pages = max(1, -(-len(filtered_positions) // page_size))
+            with col2:
+                table_page = min(int(st.number_input("Página", min_value=1, value=1, step=1, key="explorer_table_page")), total_pages)
+            with col3:
+                st.markdown(f"<br>Página {table_page} de {total_pages}", unsafe_allow_html=True)
+
+            page_positions, _ = paginate_rows(permutations[sort_column], selected_rows, sort_ascending, table_page, page_size)
+            st.dataframe(
+                df.iloc[page_positions][display_columns],
+                use_container_width=True,
+                hide_index=True,
+                height=min(600, 38 + 35 * len(page_positions))
+            )
+        else:
+            # Cards view - enhanced with more information
+            st.markdown("""
+            <div style='background: #1E293B; padding: 0.5rem; border-radius: 6px; margin-bottom: 1rem;'>
+                <span style='color: #FBBF24; font-weight: bold;'>📌 Códigos de Instrumentos:</span>
+                <span style='color: #CBD5E1; font-size: 12px;'>
+                a: Valores negociables | b: Mercado monetario | c: Fondos | d: Derivados valores | e: Derivados materias primas | 
+                f: Derivados físicos | g: Otros derivados | h: Derivados crédito | i: CFDs | j: Derivados clima | k: Derechos emisión
+                </span>
+            </div>
+            """, unsafe_allow_html=True)
+        
+            # Prebuilt cards; only the current page is rendered
+            cards = build_entity_cards(df, data_version)
+            card_positions = filtered_positions
+            cards_per_page = 20
+            total_pages = max(1, -(-len(card_positions) // cards_per_page))
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                card_page = min(int(st.number_input("Página", min_value=1, value=1, step=1, key="explorer_card_page")), total_pages)
+            with col2:
+                st.markdown(f"<br>Página {card_page} de {total_pages}", unsafe_allow_html=True)
+
+            start = (card_page - 1) * cards_per_page
+            for card in cards.iloc[card_positions[start:start + cards_per_page]].itertuples(index=False):
+                with st.expander(card.titulo, expanded=False):
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.markdown(card.col1)
+                    with col2:
+                        st.markdown(card.col2)
+                    with col3:
+                        st.markdown(card.col3, unsafe_allow_html=True)
+    
+        # Export functionality: built on click, in chunks; st.download_button then reads the finished file into memory
+        col1, col2, col3 = st.columns([3, 1, 1])
+        with col1:
+            export_columns = st.multiselect("Columnas a exportar", list(df.columns), placeholder="Todas las columnas",
+                                            key="explorer_export_columns")
+        with col2:
+            export_format = st.selectbox("Formato", available_formats(), format_func=lambda fmt: EXPORT_FORMATS[fmt][0],
+                                         key="explorer_export_format")
+        _, mime, extension, _ = EXPORT_FORMATS[export_format]
+        with col3:
+            st.markdown("<br>", unsafe_allow_html=True)
+            st.download_button(
+                label="📥 Exportar Datos Filtrados",
+                data=lambda: export_file(df, export_format, filtered_positions, export_columns),
+                file_name=f"entidades_filtradas_{datetime.now().strftime('%Y%m%d')}.{extension}",
+                mime=mime,
+                on_click="ignore"
+            )
+
+    explorer_view()
@@ -0,0 +1,57 @@
+"""Página «Salud Financiera»"""
+import streamlit as st
+
+from sav_eaf.figures import (
+    audit_metrics, audits_by_type_bar, capital_metrics, concentration_metrics, top_auditors_bar, top_capital_bar,
+)
+from views.data import page_summaries
+
+def render(df, data_version):
+    st.title("💰 Dashboard de Salud Financiera")
+    st.markdown("Análisis de distribución de capital y cumplimiento de auditorías")
+    
+    # Add explanatory section
+    with st.expander("📖 Guía de interpretación de métricas", expanded=False):
+        st.markdown("""
+        **¿Cómo interpretar estos indicadores?**
+        
+        - **Capital Social:** Recursos propios de la entidad que garantizan su solvencia
+        - **Concentración de Capital:** Indica si el mercado está dominado por pocas entidades grandes
+        - **Auditorías:** Verificación independiente de la información financiera
+        - **Distribución:** Muestra la equidad o desigualdad en el tamaño de las entidades
+        """)
+    
+    summaries = page_summaries(df, data_version, 'kpis', 'top_capital', 'concentracion_capital', 'auditorias_por_tipo',
+                               'top_auditores')
+    kpis = summaries['kpis'].iloc[0]
+
+    # Capital social analysis
+    st.markdown("### 💵 Análisis de Capital Social")
+    
+    # Summary statistics
+    for column, (label, value, _, _) in zip(st.columns(4), capital_metrics(kpis)):
+        column.metric(label, value)
+    
+    # Top entities by capital
+    st.markdown("### 📊 Ranking de Entidades por Capital Social")
+    st.plotly_chart(top_capital_bar(summaries['top_capital']), use_container_width=True)
+    
+    # Capital concentration metrics
+    concentration = summaries['concentracion_capital'].iloc[0]
+    for column, (label, value, _, help_text) in zip(st.columns(3), concentration_metrics(concentration)):
+        column.metric(label, value, help=help_text)
+    
+    # Audit compliance
+    st.markdown("### 🔍 Cumplimiento de Auditorías")
+    
+    for column, (label, value, delta, _) in zip(st.columns(3), audit_metrics(kpis)):
+        column.metric(label, value, delta)
+    
+    # Audit analysis
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.plotly_chart(audits_by_type_bar(summaries['auditorias_por_tipo']), use_container_width=True)
+    
+    with col2:
+        st.plotly_chart(top_auditors_bar(summaries['top_auditores']), use_container_width=True)
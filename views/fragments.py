@@ -0,0 +1,34 @@
+"""st.fragment instrumentado: los reruns de un fragmento no ejecutan main.py, así que se miden aquí"""
+import functools
+
+import streamlit as st
+
+from sav_eaf.timing import current_recorder
+from views.profiling import finish_profile, profile_active, profiling_requested, start_profile
+from views.timing import finish_timing, render_panel, start_timing, timing_requested
+
+def fragment(body):
+    """@st.fragment que, si la sesión lo pide, perfila y mide los reruns del propio fragmento
+
+    Dentro de un rerun completo el fragmento ya está en el perfil y los spans de main.py y no se hace nada más.
+    """
+    @functools.wraps(body)
+    def instrumented(*args, **kwargs):
+        timing = start_timing(fragmento=body.__name__) if current_recorder() is None and timing_requested() else None
+        sampler = start_profile(body.__code__.co_filename) if not profile_active() and profiling_requested() else None
+        if timing is None and sampler is None:
+            return body(*args, **kwargs)
+        summary = None
+        completed = False
+        try:
+            result = body(*args, **kwargs)
+            completed = True
+            return result
+        finally:
+            if sampler:
+                finish_profile(sampler, None, show=completed, fragment=body.__name__)
+            if timing:
+                summary = finish_timing(timing)
+            if summary and completed:
+                render_panel(summary)
+    return st.fragment(instrumented)
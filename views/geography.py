@@ -0,0 +1,38 @@
+"""Página «Inteligencia Geográfica»"""
+import streamlit as st
+
+from sav_eaf.figures import (
+    international_bar, international_metrics, province_capital_pie, provinces_treemap, top_provinces_bar,
+)
+from views.data import page_summaries
+
+def render(df, data_version):
+    st.title("🗺️ Inteligencia Geográfica")
+    st.markdown("Analice la distribución geográfica de las entidades")
+    
+    summaries = page_summaries(df, data_version, 'provincias', 'presencia_internacional')
+    provinces = summaries['provincias']
+    
+    # Province treemap
+    st.plotly_chart(provinces_treemap(provinces), use_container_width=True)
+    
+    # Province details
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Top provinces by entity count
+        st.plotly_chart(top_provinces_bar(provinces, color='capital_total'), use_container_width=True)
+    
+    with col2:
+        # Capital concentration
+        st.plotly_chart(province_capital_pie(provinces), use_container_width=True)
+    
+    # International presence
+    st.markdown("### 🌍 Análisis de Presencia Internacional")
+    
+    presence = summaries['presencia_internacional']
+    for column, (label, value, delta, _) in zip(st.columns(3), international_metrics(presence)):
+        column.metric(label, value, delta)
+    
+    # International presence by entity type
+    st.plotly_chart(international_bar(presence), use_container_width=True)
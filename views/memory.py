@@ -0,0 +1,104 @@
+"""Página «Memoria» (?memoria=1): tamaño de cada entrada de caché, del estado de la sesión y coste estimado por usuario
+
+Streamlit no expone públicamente el estado de las demás sesiones: la página mide la sesión que la
+abre, y el coste de muchas sesiones a la vez se mide con python -m sav_eaf.loadtest.
+"""
+import json
+import os
+import pickle
+import sys
+
+import pandas as pd
+import streamlit as st
+
+from sav_eaf.loadtest import rss_mb
+from views.data import CACHE_BUDGET_MB, CACHE_LIMITS, cache_sizes
+
+MEMORY_SNAPSHOT_FILE = os.environ.get('SAV_EAF_MEMORY_SNAPSHOT')
+
+def _size(value):
+    """Bytes de un valor serializado (lo que st.cache_data y session_state conservan por valor)"""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+def cache_entries():
+    """Una fila por función de st.cache_data: entradas, bytes (pickle) y límite de entradas"""
+    sizes = cache_sizes()
+    rows = [(name, *sizes.get(name, (0, 0))) for name in sorted(set(sizes) | set(CACHE_LIMITS))]
+    summary = pd.DataFrame(rows, columns=['función', 'entradas', 'bytes'])
+    summary['límite'] = [CACHE_LIMITS.get(name) for name in summary['función']]
+    return summary.sort_values('bytes', ascending=False).reset_index(drop=True)
+
+def session_sizes():
+    """Bytes de cada clave de session_state de esta sesión, de mayor a menor"""
+    sizes = {key: _size(value) for key, value in st.session_state.to_dict().items()}
+    return pd.DataFrame(sorted(sizes.items(), key=lambda item: item[1], reverse=True), columns=['clave', 'bytes'])
+
+def memory_snapshot(df, data_version):
+    """Métricas de memoria del proceso como dict serializable a JSON"""
+    caches = cache_entries()
+    session = session_sizes()
+    # Every rerun unpickles its own copy of the frame (and pages add columns to it)
+    frame_bytes = int(df.memory_usage(deep=True).sum())
+    history = list(st.session_state.get('timing_history', []))
+    return {
+        'creado': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'data_version': data_version,
+        'rss_mb': round(rss_mb(), 1),
+        'caches': caches.to_dict(orient='records'),
+        'caches_bytes': int(caches['bytes'].sum()),
+        'presupuesto_caches_mb': CACHE_BUDGET_MB or None,
+        'session_state_bytes': int(session['bytes'].sum()),
+        'detalle_sesion': session.to_dict(orient='records'),
+        'copia_df_bytes': frame_bytes,
+        'por_usuario_bytes': int(session['bytes'].sum() + frame_bytes),
+        'payload_ultimo_rerun_kb': history[-1]['payload_kb'] if history else None,
+    }
+
+def render(df, data_version):
+    st.title("🧠 Memoria")
+    st.markdown("Tamaño de las cachés, del estado de esta sesión y coste estimado por usuario en este proceso")
+
+    snapshot = memory_snapshot(df, data_version)
+    if MEMORY_SNAPSHOT_FILE:
+        try:
+            with open(MEMORY_SNAPSHOT_FILE, 'w', encoding='utf-8') as fh:
+                json.dump(snapshot, fh, ensure_ascii=False, indent=1)
+        except OSError as error:
+            st.warning(f"No se pudo escribir {MEMORY_SNAPSHOT_FILE}: {error}")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Memoria del Proceso", f"{snapshot['rss_mb']:,.0f} MB")
+    with col2:
+        st.metric("Cachés de Datos", f"{snapshot['caches_bytes'] / 2**20:,.1f} MB")
+    with col3:
+        st.metric("Estado de la Sesión", f"{snapshot['session_state_bytes'] / 1024:,.1f} KB",
+                  delta=f"{len(snapshot['detalle_sesion'])} claves", delta_color="off")
+    with col4:
+        st.metric("Estimado por Usuario", f"{snapshot['por_usuario_bytes'] / 2**20:,.1f} MB",
+                  help="Estado de esta sesión + copia del DataFrame que recibe cada rerun")
+
+    st.markdown("### 🗄️ Entradas de st.cache_data")
+    st.caption("Bytes serializados (pickle): cada sesión recibe una copia deserializada en cada lectura. "
+               "El límite es un nº de entradas por función: al llegar a él se descarta la usada hace más tiempo "
+               "(SAV_EAF_CACHE_LIMITS=\"cached_extraction=2,cluster_entities=8\"). "
+               + (f"Presupuesto total: {CACHE_BUDGET_MB:,.0f} MB; al superarlo se descartan entradas de versiones de datos "
+                  "anteriores, empezando por la usada hace más tiempo."
+                  if CACHE_BUDGET_MB else "Sin presupuesto total de memoria (SAV_EAF_CACHE_BUDGET_MB)."))
+    caches = pd.DataFrame(snapshot['caches'])
+    caches['MB'] = (caches['bytes'] / 2**20).round(2)
+    st.dataframe(caches[['función', 'entradas', 'límite', 'MB', 'bytes']], use_container_width=True,
+                 hide_index=True)
+
+    st.markdown("### 👤 Estado de la Sesión")
+    st.dataframe(pd.DataFrame(snapshot['detalle_sesion'], columns=['clave', 'bytes']), use_container_width=True,
+                 hide_index=True)
+    st.caption(f"Copia del DataFrame por rerun: {snapshot['copia_df_bytes'] / 2**20:,.1f} MB"
+               + (f" · payload del último rerun: {snapshot['payload_ultimo_rerun_kb']} KB"
+                  if snapshot['payload_ultimo_rerun_kb'] is not None else " · payload: active ?rendimiento=1"))
+
+    st.download_button("📥 Instantánea de métricas (JSON)", json.dumps(snapshot, ensure_ascii=False, indent=1),
+                       file_name=f"memoria_{data_version}.json", mime='application/json', on_click='ignore')
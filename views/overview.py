@@ -0,0 +1,72 @@
+"""Página «Vista General»"""
+import streamlit as st
+
+from sav_eaf.figures import (
+    capital_by_type_box, entity_type_pie, overview_metrics, registrations_area, services_by_type_heatmap,
+    top_provinces_bar,
+)
+from views.data import chart_summaries, page_summaries
+
+def render(df, data_version):
+    st.title("📊 Dashboard de Sociedades y Agencias de Valores y Empresas de Asesoramiento Financiero")
+    st.markdown("### Análisis en Tiempo Real de Entidades Financieras Españolas")
+    
+    # Quick explanation box with instrument info
+    with st.expander("ℹ️ Acerca de este dashboard", expanded=False):
+        st.markdown("""
+        <div style='color: #F1F5F9;'>
+        <p>Este dashboard analiza <strong style='color: #60A5FA;'>197 entidades financieras reguladas</strong> en España:</p>
+        <ul style='color: #CBD5E1;'>
+            <li><strong style='color: #60A5FA;'>SAV (Sociedades y Agencias de Valores):</strong> 101 entidades</li>
+            <li><strong style='color: #34D399;'>EAF (Empresas de Asesoramiento Financiero):</strong> 96 entidades</li>
+        </ul>
+        
+        <p style='margin-top: 1rem;'><strong style='color: #FBBF24;'>Instrumentos Financieros (a-k):</strong></p>
+        <div style='background: #0F172A; padding: 0.5rem; border-radius: 6px; font-size: 12px;'>
+            <code style='color: #60A5FA;'>a:</code> Valores negociables |
+            <code style='color: #60A5FA;'>b:</code> Mercado monetario |
+            <code style='color: #60A5FA;'>c:</code> Fondos inversión |
+            <code style='color: #60A5FA;'>d:</code> Derivados valores |
+            <code style='color: #60A5FA;'>e:</code> Derivados materias primas (efectivo) |
+            <code style='color: #60A5FA;'>f:</code> Derivados materias primas (físico) |
+            <code style='color: #60A5FA;'>g:</code> Otros derivados |
+            <code style='color: #60A5FA;'>h:</code> Derivados crédito |
+            <code style='color: #60A5FA;'>i:</code> CFDs |
+            <code style='color: #60A5FA;'>j:</code> Derivados clima |
+            <code style='color: #60A5FA;'>k:</code> Derechos emisión
+        </div>
+        
+        <p style='margin-top: 1rem; color: #94A3B8;'>Todos los datos son comparables gracias a la estandarización regulatoria (MiFID II y RD 814/2023).</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    summaries = page_summaries(df, data_version, 'kpis', 'tipos_entidad', 'provincias', 'servicios_por_tipo',
+                               'registros_anuales')
+
+    # Top metrics
+    for column, (label, value, delta, help_text) in zip(st.columns(5), overview_metrics(summaries['kpis'].iloc[0])):
+        column.metric(label, value, delta=delta, help=help_text)
+    
+    st.markdown("---")
+    
+    # Charts row 1
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.plotly_chart(entity_type_pie(summaries['tipos_entidad']), use_container_width=True)
+    
+    with col2:
+        st.plotly_chart(top_provinces_bar(summaries['provincias']), use_container_width=True)
+    
+    # Charts row 2
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.plotly_chart(capital_by_type_box(chart_summaries(df, data_version)['capital_por_tipo']), use_container_width=True)
+    
+    with col2:
+        st.plotly_chart(services_by_type_heatmap(summaries['servicios_por_tipo']), use_container_width=True)
+    
+    # Recent registrations timeline
+    st.markdown("### 📅 Línea Temporal de Registros")
+    st.plotly_chart(registrations_area(summaries['registros_anuales']), use_container_width=True)
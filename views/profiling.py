@@ -0,0 +1,75 @@
+"""Perfilado bajo demanda de un rerun: SAV_EAF_PROFILE=1 o ?perfil=1 en la URL"""
+import contextvars
+import os
+
+import streamlit as st
+
+from sav_eaf.profiler import PROFILE_DIR, PROFILE_ENABLED, StackSampler, folded, save_profile
+
+_SIMPLE_TYPES = (str, int, float, bool, type(None))
+# Sampler of the rerun in progress on this script thread: fragments only profile their own reruns
+_active = contextvars.ContextVar('sav_eaf_profile', default=None)
+
+def profiling_requested():
+    """Perfilado activo para esta sesión"""
+    return PROFILE_ENABLED or st.query_params.get('perfil') == '1'
+
+def _widget_state():
+    """Valores simples de session_state (los widgets con key) para detectar qué cambió"""
+    return {key: value for key, value in st.session_state.to_dict().items()
+            if isinstance(value, _SIMPLE_TYPES) and not key.startswith('profile_')}
+
+def start_profile(script_path):
+    """Empezar a muestrear el hilo del script; la pila se recorta a partir de script_path"""
+    sampler = StackSampler(root=os.path.abspath(script_path)).start()
+    sampler.state = _widget_state()
+    _active.set(sampler)
+    return sampler
+
+def profile_active():
+    """Hay un muestreo en curso en este rerun"""
+    return _active.get() is not None
+
+def _interaction(previous, page, state):
+    """Descripción del rerun: inicio, navegación o los widgets que cambiaron"""
+    if previous is None:
+        return 'inicio'
+    if previous['page'] != page:
+        return 'navegacion'
+    changed = sorted(key for key in state.keys() | previous['state'].keys()
+                     if state.get(key) != previous['state'].get(key))
+    return '+'.join(changed) if changed else 'rerun'
+
+def finish_profile(sampler, page, show=True, fragment=None):
+    """Detener el muestreo, guardar el perfil en disco y mostrarlo (sidebar, o dentro del fragmento)
+
+    Se llama siempre, también si el rerun acaba en st.rerun(), st.stop() o una excepción (show=False:
+    el perfil se guarda pero no se pinta). page es None si el rerun paró antes de elegir página.
+    """
+    counts = sampler.stop()
+    _active.set(None)
+    previous = st.session_state.get('profile_last')
+    page = page or (previous['page'] if previous else 'sin página')
+    interaction = _interaction(previous, page, sampler.state)
+    if fragment:
+        interaction = f"{fragment} {interaction}"
+    st.session_state['profile_last'] = {'page': page, 'state': _widget_state()}
+    if not counts:
+        return None
+
+    try:
+        path = save_profile(counts, page.split(' ', 1)[-1], interaction)
+    except OSError:
+        path = None  # read-only deployment: the profile is still downloadable
+    if not show:
+        return path
+    # Fragments cannot write to the sidebar
+    panel = st.sidebar if fragment is None else st.expander("🔬 Perfil del Fragmento", expanded=False)
+    if fragment is None:
+        panel.markdown("### 🔬 Perfil del Rerun")
+    panel.caption(f"{page} · {interaction}: {sampler.samples} muestras en {sampler.seconds * 1000:.0f} ms"
+                  + (f" → {os.path.relpath(path, PROFILE_DIR)}" if path else ""))
+    panel.download_button("📥 Pilas colapsadas (.folded)", folded(counts),
+                          file_name=os.path.basename(path) if path else 'perfil.folded',
+                          mime='text/plain', key=f"profile_download_{fragment or 'rerun'}", on_click='ignore')
+    return path
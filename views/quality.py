@@ -0,0 +1,124 @@
+"""Página «Calidad de Datos»"""
+import streamlit as st
+import plotly.express as px
+
+from sav_eaf.core import ENTITY_INDEX_FILE
+from views.data import load_data
+from views.fragments import fragment
+
+def render(df, data_version):
+    st.title("🧪 Calidad de Datos")
+    st.markdown("Resultado de las validaciones ejecutadas al cargar el fichero de entidades")
+
+    _, quality_report = load_data(data_version)
+    quality_summary = quality_report['summary']
+    quality_issues = quality_report['issues']
+    quarantine = quality_report['quarantine']
+
+    # Summary metrics
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Filas Leídas", f"{quality_report['rows_read']:,}",
+                  delta=f"Validadas en {quality_report['seconds']*1000:.0f} ms", delta_color="off")
+
+    with col2:
+        st.metric("Filas Válidas", f"{quality_report['rows_valid']:,}",
+                  delta=f"{quality_report['rows_valid']/max(quality_report['rows_read'], 1)*100:.1f}%")
+
+    with col3:
+        st.metric("En Cuarentena", f"{len(quarantine):,}",
+                  help="Filas que no superan una regla de severidad 'error' y se excluyen del dashboard")
+
+    with col4:
+        warning_rules = quality_summary[(quality_summary['Severidad'] == 'warning') & (quality_summary['Filas Afectadas'] > 0)]
+        st.metric("Reglas con Avisos", f"{len(warning_rules)} de {(quality_summary['Severidad'] == 'warning').sum()}")
+
+    # Checks overview
+    st.markdown("### 📋 Reglas de Validación")
+    st.dataframe(quality_summary, use_container_width=True, hide_index=True)
+
+    failing = quality_summary[quality_summary['Filas Afectadas'] > 0]
+    if not failing.empty:
+        fig_rules = px.bar(
+            failing.sort_values('Filas Afectadas'),
+            x='Filas Afectadas',
+            y='Regla',
+            orientation='h',
+            title="Filas Afectadas por Regla",
+            color='Severidad',
+            color_discrete_map={'error': '#F87171', 'warning': '#FBBF24'},
+            text='Filas Afectadas'
+        )
+        fig_rules.update_traces(texttemplate='%{text}', textposition='outside')
+        fig_rules.update_layout(
+            height=max(300, 40 * len(failing) + 120),
+            paper_bgcolor='#1E293B',
+            plot_bgcolor='#0F172A',
+            font=dict(color='#F1F5F9', size=12),
+            title_font=dict(size=16, color='#F1F5F9'),
+            xaxis=dict(gridcolor='#334155', zerolinecolor='#334155'),
+            yaxis=dict(gridcolor='#334155', zerolinecolor='#334155'),
+            legend=dict(
+                font=dict(color='#CBD5E1'),
+                bgcolor='#1E293B',
+                bordercolor='#334155',
+                borderwidth=1
+            )
+        )
+        st.plotly_chart(fig_rules, use_container_width=True)
+
+        # Findings per rule
+        st.markdown("### 🔎 Detalle de Incidencias")
+        # Choosing a rule only reruns its detail table
+        @fragment
+        def rule_detail():
+            selected_rule = st.selectbox("Regla", failing['Regla'].tolist())
+            rule_issues = quality_issues[quality_issues['Regla'] == selected_rule]
+            affected = int(failing.loc[failing['Regla'] == selected_rule, 'Filas Afectadas'].iloc[0])
+            if affected > len(rule_issues):
+                st.caption(f"Mostrando {len(rule_issues):,} de {affected:,} filas afectadas")
+            st.dataframe(rule_issues, use_container_width=True, hide_index=True)
+
+        rule_detail()
+    else:
+        st.success("✅ Todas las filas superan las validaciones")
+
+    # Entity resolution
+    st.markdown("### 🔗 Resolución de Entidades")
+    st.markdown(f"""
+    <small style='color: #94A3B8;'>Cada entidad recibe una clave estable (<code>entity_key</code>) guardada en el índice
+    <code>{ENTITY_INDEX_FILE}</code>. Se resuelve por NIF normalizado, por tipo y nº de registro o, si ambos son nuevos,
+    por similitud de nombre y dirección dentro del mismo bloque.</small>
+    """, unsafe_allow_html=True)
+    match_labels = {'nif': 'Por NIF', 'registro': 'Por Nº Registro', 'nombre': 'Por Nombre/Dirección', 'nueva': 'Entidad Nueva'}
+    match_counts = df['entity_match'].value_counts()
+
+    match_cols = st.columns(len(match_labels))
+    for col, (method, label) in zip(match_cols, match_labels.items()):
+        with col:
+            st.metric(label, int(match_counts.get(method, 0)))
+
+    @fragment
+    def entity_keys():
+        # The full key table is only serialized once the expander is opened
+        keys_expander = st.expander("Ver claves asignadas", expanded=False, on_change="rerun", key="quality_keys_expander")
+        with keys_expander:
+            if keys_expander.open:
+                st.dataframe(df[['entity_key', 'entity_match', 'id', 'nif', 'tipo_entidad', 'numero_registro', 'nombre']],
+                             use_container_width=True, hide_index=True)
+
+    entity_keys()
+
+    # Quarantined rows
+    st.markdown("### 🚧 Filas en Cuarentena")
+    if quarantine.empty:
+        st.info("No hay filas en cuarentena")
+    else:
+        st.dataframe(quarantine, use_container_width=True, hide_index=True)
+        st.download_button(
+            label="📥 Descargar Cuarentena (CSV)",
+            data=quarantine.to_csv(index=False),
+            file_name=f"cuarentena_{data_version}.csv",
+            mime="text/csv"
+        )
@@ -0,0 +1,146 @@
+"""Página «Ranking Compuesto»"""
+import streamlit as st
+import plotly.graph_objects as go
+import numpy as np
+
+from sav_eaf.core import SCORE_FEATURES, rank_entities, search_names
+from views.data import build_name_index, build_score_features
+from views.fragments import fragment
+
+# The top-k table is sent to the browser on every weight change
+MAX_TOP_K = 500
+
+def render(df, data_version):
+    st.title("🏆 Ranking Compuesto de Entidades")
+    st.markdown("Defina sus propias ponderaciones y obtenga el ranking completo al instante")
+
+    with st.expander("📖 ¿Cómo se calcula la puntuación?", expanded=False):
+        st.markdown("""
+        Cada indicador se normaliza al rango **0-1** una sola vez al cargar los datos.
+        La puntuación de cada entidad es la media ponderada de sus indicadores, expresada sobre **100**.
+        Un peso de **0** excluye el indicador del ranking.
+        """)
+        st.markdown("\n".join(f"- **{name}:** {description}" for name, description in SCORE_FEATURES))
+
+    score_features = build_score_features(df, data_version)
+
+    # Entity lookup lives outside the fragment: weight changes never resend the matches
+    st.markdown("### 🔎 Posición de una Entidad")
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        search_term = st.text_input("Buscar entidad", placeholder="Parte del nombre...", key="ranking_search")
+    with col2:
+        matches = search_names(build_name_index(df, data_version), search_term)
+        entity_pos = st.selectbox("Entidad", options=matches.tolist(), format_func=lambda pos: df['nombre'].iat[pos],
+                                  index=0 if len(matches) else None, disabled=not len(matches),
+                                  placeholder="Sin coincidencias" if search_term else "Escriba para buscar")
+
+    # Weight changes only rerun the ranking, not the page
+    @fragment
+    def ranking_view(entity_pos):
+        # Weight sliders
+        st.markdown("### ⚖️ Ponderaciones")
+        weights = []
+        weight_cols = st.columns(4)
+        for idx, (name, description) in enumerate(SCORE_FEATURES):
+            with weight_cols[idx % 4]:
+                weights.append(st.slider(name, min_value=0, max_value=10, value=5, help=description))
+
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            # Extractions with fewer than 5 entities lower the minimum instead of raising
+            min_top_k = min(5, len(df))
+            top_k = st.number_input("Entidades a mostrar", min_value=min_top_k,
+                                    max_value=max(min_top_k, min(MAX_TOP_K, len(df))), value=min(25, len(df)), step=5)
+
+        scores, top_idx = rank_entities(score_features, weights, int(top_k))
+
+        if sum(weights) == 0:
+            st.warning("⚠️ Asigne un peso mayor que cero a al menos un indicador")
+
+        # Summary metrics
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            st.metric("Entidades Puntuadas", f"{len(scores):,}")
+
+        with col2:
+            st.metric("Puntuación Máxima", f"{scores.max():.1f}" if len(scores) else "N/D")
+
+        with col3:
+            st.metric("Puntuación Mediana", f"{np.median(scores):.1f}" if len(scores) else "N/D")
+
+        with col4:
+            st.metric("Puntuación Media", f"{scores.mean():.1f}" if len(scores) else "N/D")
+
+        # Top-k ranking table
+        st.markdown(f"### 📋 Top {len(top_idx)} Entidades")
+
+        ranking_df = df.iloc[top_idx][['nombre', 'tipo_entidad', 'direccion_provincia', 'capital_social',
+                                       'total_services', 'num_instrumentos', 'ultimo_ejercicio_auditado']].copy()
+        ranking_df.insert(0, 'Posición', np.arange(1, len(top_idx) + 1))
+        ranking_df.insert(2, 'Puntuación', scores[top_idx].round(1))
+        contributions = score_features[top_idx] * (np.asarray(weights, dtype=np.float32) * (100.0 / max(sum(weights), 1)))
+        for feature_idx, (name, _) in enumerate(SCORE_FEATURES):
+            if weights[feature_idx] > 0:
+                ranking_df[f'Aporte {name}'] = contributions[:, feature_idx].round(1)
+
+        st.dataframe(ranking_df, use_container_width=True, hide_index=True, height=min(600, 40 + 35 * len(ranking_df)))
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            # Score distribution over the full register
+            counts, edges = np.histogram(scores, bins=20, range=(0, 100))
+            fig_scores = go.Figure(go.Bar(
+                x=(edges[:-1] + edges[1:]) / 2,
+                y=counts,
+                width=edges[1] - edges[0],
+                marker_color='#60A5FA'
+            ))
+            fig_scores.update_layout(
+                title="Distribución de Puntuaciones",
+                xaxis_title="Puntuación",
+                yaxis_title="Número de Entidades",
+                height=400,
+                bargap=0.1,
+                paper_bgcolor='#1E293B',
+                plot_bgcolor='#0F172A',
+                font=dict(color='#F1F5F9', size=12),
+                title_font=dict(size=16, color='#F1F5F9'),
+                xaxis=dict(gridcolor='#334155', zerolinecolor='#334155'),
+                yaxis=dict(gridcolor='#334155', zerolinecolor='#334155')
+            )
+            st.plotly_chart(fig_scores, use_container_width=True)
+
+        with col2:
+            # Position of the entity chosen above
+            if entity_pos is None:
+                st.info("Busque una entidad para ver su posición y su perfil")
+                return
+            st.markdown(f"#### {df['nombre'].iat[entity_pos]}")
+            entity_score = scores[entity_pos]
+            entity_rank = int((scores > entity_score).sum()) + 1
+            st.metric("Posición en el Ranking", f"{entity_rank} de {len(scores)}",
+                      delta=f"Puntuación: {entity_score:.1f}")
+
+            fig_profile = go.Figure(go.Scatterpolar(
+                r=score_features[entity_pos] * 100,
+                theta=[name for name, _ in SCORE_FEATURES],
+                fill='toself',
+                marker=dict(color='#34D399')
+            ))
+            fig_profile.update_layout(
+                polar=dict(
+                    radialaxis=dict(visible=True, range=[0, 100], gridcolor='#334155', linecolor='#334155'),
+                    bgcolor='#0F172A'
+                ),
+                showlegend=False,
+                height=320,
+                margin=dict(t=30, b=30),
+                paper_bgcolor='#1E293B',
+                font=dict(color='#F1F5F9', size=12)
+            )
+            st.plotly_chart(fig_profile, use_container_width=True)
+
+    ranking_view(entity_pos)
@@ -0,0 +1,223 @@
+"""Página «Segmentación de Clientes»"""
+import streamlit as st
+import plotly.express as px
+import plotly.graph_objects as go
+
+from sav_eaf.core import SEGMENT_FEATURE_GROUPS
+from sav_eaf.figures import (
+    capital_by_client_box, client_combinations_bar, client_metrics, client_services_heatmap, client_types_pie,
+    specialization_bar,
+)
+from views.data import chart_summaries, cluster_entities, page_summaries
+from views.fragments import fragment
+
+def render(df, data_version):
+    st.title("👥 Análisis de Segmentación de Clientes")
+    st.markdown("Comprensión de tipos de clientes y especializaciones de entidades")
+
+    segmentation_mode = st.radio("Modo de Segmentación", ["Por Tipo de Cliente", "Clustering (k-means)"], horizontal=True)
+
+    if segmentation_mode == "Clustering (k-means)":
+        st.markdown("""
+        <div style='background: linear-gradient(135deg, #1E3A8A 0%, #1E293B 100%); border: 1px solid #3B82F6; border-radius: 8px; padding: 1rem; margin-bottom: 1rem;'>
+            <p style='color: #DBEAFE; margin: 0;'>
+            <strong style='color: #93C5FD;'>💡 Segmentación basada en datos:</strong> las entidades se agrupan con k-means por mini-lotes
+            según los servicios, instrumentos, tipos de cliente, capital y geografía seleccionados. El modelo se cachea por versión de datos,
+            número de segmentos y conjunto de características.
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
+
+        # k and feature changes only rerun the clustering section
+        @fragment
+        def clustering_view():
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                n_clusters = st.slider("Número de Segmentos (k)", min_value=2, max_value=12, value=5)
+            with col2:
+                feature_groups = st.multiselect("Características", SEGMENT_FEATURE_GROUPS, default=SEGMENT_FEATURE_GROUPS)
+
+            if not feature_groups:
+                st.info("👆 Seleccione al menos un grupo de características")
+            else:
+                clustering = cluster_entities(df, data_version, n_clusters, tuple(feature_groups))
+                profiles = clustering['profiles']
+
+                col1, col2, col3 = st.columns(3)
+
+                with col1:
+                    st.metric("Segmentos", len(profiles))
+
+                with col2:
+                    st.metric("Mayor Segmento", f"{profiles['Entidades'].max()}",
+                              f"{profiles['Entidades'].max()/len(df)*100:.1f}% de entidades")
+
+                with col3:
+                    st.metric("Inercia", f"{clustering['inertia']:.1f}",
+                              help="Suma de distancias al cuadrado de cada entidad a su centroide")
+
+                st.markdown("### 📋 Perfiles de Segmento")
+                st.dataframe(profiles, use_container_width=True)
+
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    fig_sizes = px.bar(
+                        x=profiles.index,
+                        y=profiles['Entidades'],
+                        title="Tamaño de los Segmentos",
+                        labels={'x': 'Segmento', 'y': 'Número de Entidades'},
+                        color=profiles['Entidades'],
+                        color_continuous_scale=[[0, '#0F172A'], [0.5, '#60A5FA'], [1, '#93C5FD']],
+                        text=profiles['Entidades']
+                    )
+                    fig_sizes.update_traces(texttemplate='%{text}', textposition='outside')
+                    fig_sizes.update_layout(
+                        showlegend=False,
+                        height=400,
+                        paper_bgcolor='#1E293B',
+                        plot_bgcolor='#0F172A',
+                        font=dict(color='#F1F5F9', size=12),
+                        title_font=dict(size=16, color='#F1F5F9'),
+                        xaxis=dict(gridcolor='#334155', zerolinecolor='#334155'),
+                        yaxis=dict(gridcolor='#334155', zerolinecolor='#334155'),
+                        coloraxis_colorbar=dict(
+                            title_font_color='#CBD5E1',
+                            tickfont_color='#CBD5E1'
+                        )
+                    )
+                    st.plotly_chart(fig_sizes, use_container_width=True)
+
+                with col2:
+                    fig_capital_seg = px.scatter(
+                        profiles.reset_index(),
+                        x='Media Servicios',
+                        y='Media Instrumentos',
+                        size='Entidades',
+                        color='index',
+                        hover_data=['Capital Medio (€M)', '% SAV', 'Provincia Principal'],
+                        title="Servicios vs Instrumentos por Segmento",
+                        labels={'index': 'Segmento'}
+                    )
+                    fig_capital_seg.update_layout(
+                        height=400,
+                        paper_bgcolor='#1E293B',
+                        plot_bgcolor='#0F172A',
+                        font=dict(color='#F1F5F9', size=12),
+                        title_font=dict(size=16, color='#F1F5F9'),
+                        xaxis=dict(gridcolor='#334155', zerolinecolor='#334155'),
+                        yaxis=dict(gridcolor='#334155', zerolinecolor='#334155'),
+                        legend=dict(
+                            font=dict(color='#CBD5E1'),
+                            bgcolor='#1E293B',
+                            bordercolor='#334155',
+                            borderwidth=1
+                        )
+                    )
+                    st.plotly_chart(fig_capital_seg, use_container_width=True)
+
+                # Centroid heatmap
+                st.markdown("### 🎯 Centroides de los Segmentos")
+                centroids = clustering['centroids']
+                fig_centroids = go.Figure(data=go.Heatmap(
+                    z=centroids.values,
+                    x=centroids.columns,
+                    y=centroids.index,
+                    colorscale=[[0, '#0F172A'], [0.5, '#60A5FA'], [1, '#93C5FD']],
+                    hoverongaps=False
+                ))
+                fig_centroids.update_layout(
+                    title="Valor Medio de cada Característica por Segmento",
+                    height=max(400, 40 * len(centroids) + 250),
+                    paper_bgcolor='#1E293B',
+                    plot_bgcolor='#0F172A',
+                    font=dict(color='#F1F5F9', size=12),
+                    title_font=dict(size=16, color='#F1F5F9'),
+                    xaxis=dict(gridcolor='#334155', tickangle=-45),
+                    yaxis=dict(gridcolor='#334155')
+                )
+                st.plotly_chart(fig_centroids, use_container_width=True)
+
+                # Members of a segment
+                st.markdown("### 🏢 Entidades por Segmento")
+                selected_segment = st.selectbox("Segmento", profiles.index.tolist())
+                segment_members = df[clustering['labels'] == clustering['segment_ids'][profiles.index.get_loc(selected_segment)]]
+                st.dataframe(
+                    segment_members[['nombre', 'tipo_entidad', 'direccion_provincia', 'capital_social',
+                                     'total_services', 'num_instrumentos', 'tipos_clientes']],
+                    use_container_width=True,
+                    hide_index=True
+                )
+
+        clustering_view()
+
+
+    else:
+    
+        summaries = page_summaries(df, data_version, 'segmentos_cliente', 'combinaciones_cliente',
+                                   'especializacion_cliente', 'lideres_segmento_cliente')
+        segments = summaries['segmentos_cliente']
+
+        # Client type overview
+        for column, (label, value, delta, _) in zip(st.columns(3), client_metrics(segments)):
+            column.metric(label, value, delta)
+    
+        # Client type distribution
+        st.markdown("### Cobertura por Tipo de Cliente")
+    
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            st.plotly_chart(client_types_pie(segments), use_container_width=True)
+    
+        with col2:
+            st.plotly_chart(client_combinations_bar(summaries['combinaciones_cliente']), use_container_width=True)
+    
+        # Client segmentation by services - Simplified
+        st.markdown("### Oferta de Servicios por Tipo de Cliente")
+    
+        # Add explanation
+        st.markdown("""
+        <div style='background: linear-gradient(135deg, #1E3A8A 0%, #1E293B 100%); border: 1px solid #3B82F6; border-radius: 8px; padding: 1rem; margin-bottom: 1rem;'>
+            <p style='color: #DBEAFE; margin: 0; margin-bottom: 0.5rem;'>
+            <strong style='color: #93C5FD;'>💡 Tipos de clientes según MiFID II:</strong>
+            </p>
+            <ul style='color: #DBEAFE; margin: 0; padding-left: 1.5rem;'>
+                <li><strong>Minoristas:</strong> Inversores particulares con mayor protección regulatoria</li>
+                <li><strong>Profesionales:</strong> Inversores con experiencia y conocimiento del mercado</li>
+                <li><strong>Contrapartes Elegibles:</strong> Instituciones financieras y grandes corporaciones</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+    
+        st.plotly_chart(client_services_heatmap(segments), use_container_width=True)
+    
+        # Entity specialization
+        st.markdown("### Análisis de Especialización de Entidades")
+        st.plotly_chart(specialization_bar(summaries['especializacion_cliente']), use_container_width=True)
+    
+        # Relationship between capital and client types
+        st.markdown("### Distribución de Capital por Segmento de Cliente")
+        st.plotly_chart(capital_by_client_box(chart_summaries(df, data_version)['capital_por_cliente']),
+                        use_container_width=True)
+    
+        # Hidden tabs are not rendered until opened
+        @fragment
+        def client_segment_tops_view():
+            # Top entities by client segment
+            st.markdown("### Top Entidades por Segmento de Cliente")
+    
+            tab1, tab2, tab3 = st.tabs(["Especialistas Minoristas", "Enfoque Profesional", "Servicio Completo"], on_change="rerun", key="client_segment_tabs")
+    
+            leaders = summaries['lideres_segmento_cliente']
+            for tab, segment in zip([tab1, tab2, tab3], ['Minoristas', 'Profesionales', 'Servicio Completo']):
+                with tab:
+                    if tab.open:
+                        st.dataframe(
+                            leaders.loc[leaders['segmento'] == segment,
+                                        ['nombre', 'capital_social', 'num_servicios_inversion', 'num_instrumentos']],
+                            use_container_width=True,
+                            hide_index=True
+                        )
+
+        client_segment_tops_view()
@@ -0,0 +1,284 @@
+"""Página «Análisis de Servicios»"""
+import streamlit as st
+import numpy as np
+
+from sav_eaf.core import instrument_bundles, instrument_cooccurrence, instrument_rules
+from sav_eaf.figures import (
+    bundles_bar, cooccurrence_heatmap, correlation_heatmap, instrument_coverage_bar, instrument_ranges_pie,
+    instruments_by_type_bar, service_categories_bar, service_histogram, service_matrix_heatmap,
+    services_by_type_table, services_metrics, top_services_bar, type_means_bar,
+)
+from views.data import build_instrument_masks, chart_summaries, page_summaries
+from views.fragments import fragment
+
+def render(df, data_version):
+    st.title("💼 Análisis de Servicios")
+    st.markdown("Análisis profundo de servicios de inversión y auxiliares")
+    
+    # Explanation of comparability
+    st.markdown("""
+    <div style='background: linear-gradient(135deg, #1E3A8A 0%, #1E293B 100%); border: 1px solid #3B82F6; border-radius: 8px; padding: 1rem; margin-bottom: 1rem;'>
+        <p style='color: #DBEAFE; margin: 0;'>
+        <strong style='color: #93C5FD;'>ℹ️ Nota sobre la comparabilidad:</strong> Todos los servicios están estandarizados según la normativa MiFID II y el RD 814/2023, 
+        lo que permite comparaciones objetivas entre todas las entidades reguladas, independientemente de su tipo (SAV o EAF).
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    summaries = page_summaries(df, data_version, 'kpis', 'servicios_por_tipo', 'correlacion_servicios',
+                               'cobertura_instrumentos', 'rangos_instrumentos', 'top_servicios', 'categorias_servicios')
+    services_by_type = summaries['servicios_por_tipo']
+
+    # Overall service statistics
+    for column, (label, value, _, _) in zip(st.columns(4), services_metrics(summaries['kpis'].iloc[0])):
+        column.metric(label, value)
+    
+    # Service distribution
+    st.markdown("### Análisis de Distribución de Servicios")
+    
+    # Add service type definitions
+    with st.expander("📚 Tipos de Servicios según MiFID II", expanded=False):
+        col1_def, col2_def = st.columns(2)
+        
+        with col1_def:
+            st.markdown("""
+            **Servicios de Inversión:**
+            1. Recepción y transmisión de órdenes
+            2. Ejecución de órdenes
+            3. Negociación por cuenta propia
+            4. Gestión de carteras
+            5. Asesoramiento en materia de inversión
+            6. Aseguramiento de instrumentos
+            7. Colocación de instrumentos
+            """)
+        
+        with col2_def:
+            st.markdown("""
+            **Servicios Auxiliares:**
+            1. Custodia y administración
+            2. Concesión de créditos/préstamos
+            3. Asesoramiento a empresas
+            4. Servicios de cambio de divisas
+            5. Investigación y análisis financiero
+            6. Servicios relacionados con aseguramiento
+            """)
+    
+    col1, col2 = st.columns(2)
+    charts = chart_summaries(df, data_version)
+    
+    with col1:
+        st.plotly_chart(service_histogram(charts['servicios_inversion'], "Distribución de Servicios de Inversión",
+                                          'Número de Servicios de Inversión', '#60A5FA'), use_container_width=True)
+    
+    with col2:
+        st.plotly_chart(service_histogram(charts['servicios_auxiliares'], "Distribución de Servicios Auxiliares",
+                                          'Número de Servicios Auxiliares', '#34D399'), use_container_width=True)
+    
+    # Services comparison framework
+    st.markdown("### 🔄 Comparabilidad de Servicios entre Entidades")
+    
+    with st.expander("ℹ️ Información sobre la comparabilidad de servicios", expanded=False):
+        st.info("""
+        **¿Por qué son comparables los servicios?**
+        
+        Todas las entidades reguladas (SAV y EAF) deben declarar sus servicios según el mismo marco regulatorio:
+        
+        1. **Servicios de Inversión:** Definidos por MiFID II y el RD 814/2023
+        2. **Servicios Auxiliares:** Complementarios a la actividad principal
+        3. **Instrumentos Financieros:** Categorizados de forma estándar (a-k)
+        
+        Esto permite una comparación objetiva entre entidades del mismo tipo y diferentes tipos.
+        """)
+    
+    # Create a comparison matrix
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Services by entity type comparison
+        st.markdown("#### Estadísticas por Tipo de Entidad")
+        st.dataframe(services_by_type_table(services_by_type), use_container_width=True)
+    
+    with col2:
+        # Service coverage comparison
+        st.plotly_chart(type_means_bar(services_by_type), use_container_width=True)
+    
+    # Services correlation with better explanation
+    st.markdown("### 📊 Análisis de Correlación de Servicios")
+    
+    st.plotly_chart(correlation_heatmap(summaries['correlacion_servicios']), use_container_width=True)
+    
+    # Instruments analysis with definitions
+    st.markdown("### 📈 Cobertura de Instrumentos Financieros")
+    
+    # Create two columns for instrument reference
+    col_ref1, col_ref2 = st.columns(2)
+    
+    with col_ref1:
+        # Add comprehensive instrument reference table
+        with st.expander("📚 **Referencia de Instrumentos Financieros (RD 814/2023)**", expanded=True):
+            st.markdown("""
+            <div style='background: #0F172A; padding: 1rem; border-radius: 8px; border: 1px solid #334155;'>
+            <table style='width: 100%; color: #F1F5F9; font-size: 13px;'>
+            <tr style='border-bottom: 2px solid #60A5FA;'>
+                <th style='text-align: left; padding: 8px; color: #60A5FA;'>Código</th>
+                <th style='text-align: left; padding: 8px; color: #60A5FA;'>Instrumento Financiero</th>
+            </tr>
+            <tr style='border-bottom: 1px solid #334155;'>
+                <td style='padding: 8px; color: #FBBF24; font-weight: bold;'>a</td>
+                <td style='padding: 8px;'>Valores negociables (acciones, bonos, obligaciones)</td>
+            </tr>
+            <tr style='border-bottom: 1px solid #334155;'>
+                <td style='padding: 8px; color: #FBBF24; font-weight: bold;'>b</td>
+                <td style='padding: 8px;'>Instrumentos del mercado monetario</td>
+            </tr>
+            <tr style='border-bottom: 1px solid #334155;'>
+                <td style='padding: 8px; color: #FBBF24; font-weight: bold;'>c</td>
+                <td style='padding: 8px;'>Participaciones en IIC (fondos de inversión)</td>
+            </tr>
+            <tr style='border-bottom: 1px solid #334155;'>
+                <td style='padding: 8px; color: #FBBF24; font-weight: bold;'>d</td>
+                <td style='padding: 8px;'>Derivados sobre valores/divisas</td>
+            </tr>
+            <tr style='border-bottom: 1px solid #334155;'>
+                <td style='padding: 8px; color: #FBBF24; font-weight: bold;'>e</td>
+                <td style='padding: 8px;'>Derivados sobre materias primas (efectivo)</td>
+            </tr>
+            <tr style='border-bottom: 1px solid #334155;'>
+                <td style='padding: 8px; color: #FBBF24; font-weight: bold;'>f</td>
+                <td style='padding: 8px;'>Derivados sobre materias primas (físico)</td>
+            </tr>
+            </table>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    with col_ref2:
+        with st.expander("📚 **Continuación - Instrumentos Complejos**", expanded=True):
+            st.markdown("""
+            <div style='background: #0F172A; padding: 1rem; border-radius: 8px; border: 1px solid #334155;'>
+            <table style='width: 100%; color: #F1F5F9; font-size: 13px;'>
+            <tr style='border-bottom: 2px solid #60A5FA;'>
+                <th style='text-align: left; padding: 8px; color: #60A5FA;'>Código</th>
+                <th style='text-align: left; padding: 8px; color: #60A5FA;'>Instrumento Financiero</th>
+            </tr>
+            <tr style='border-bottom: 1px solid #334155;'>
+                <td style='padding: 8px; color: #FBBF24; font-weight: bold;'>g</td>
+                <td style='padding: 8px;'>Otros derivados sobre materias primas</td>
+            </tr>
+            <tr style='border-bottom: 1px solid #334155;'>
+                <td style='padding: 8px; color: #FBBF24; font-weight: bold;'>h</td>
+                <td style='padding: 8px;'>Derivados de transferencia de riesgo de crédito</td>
+            </tr>
+            <tr style='border-bottom: 1px solid #334155;'>
+                <td style='padding: 8px; color: #FBBF24; font-weight: bold;'>i</td>
+                <td style='padding: 8px;'>Contratos financieros por diferencias (CFDs)</td>
+            </tr>
+            <tr style='border-bottom: 1px solid #334155;'>
+                <td style='padding: 8px; color: #FBBF24; font-weight: bold;'>j</td>
+                <td style='padding: 8px;'>Derivados sobre clima/inflación/estadísticas</td>
+            </tr>
+            <tr style='border-bottom: 1px solid #334155;'>
+                <td style='padding: 8px; color: #FBBF24; font-weight: bold;'>k</td>
+                <td style='padding: 8px;'>Derechos de emisión de gases efecto invernadero</td>
+            </tr>
+            </table>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # Add analysis of which instruments are most common
+    st.markdown("### 📊 Análisis de Instrumentos Ofrecidos")
+    
+    # Count entities by specific instruments
+    st.plotly_chart(instrument_coverage_bar(summaries['cobertura_instrumentos']), use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.plotly_chart(instrument_ranges_pie(summaries['rangos_instrumentos']), use_container_width=True)
+    
+    with col2:
+        # Instruments by entity type
+        st.plotly_chart(instruments_by_type_bar(services_by_type), use_container_width=True)
+
+    instrument_masks = build_instrument_masks(df, data_version)
+
+    # Co-occurrence filters and thresholds only rerun this section
+    @fragment
+    def cooccurrence_view():
+        # Instrument co-occurrence and association rules
+        st.markdown("### 🔗 Co-ocurrencia de Instrumentos")
+
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            cooc_type = st.selectbox("Tipo de Entidad", ["Todas", "SAV", "EAF"], key="cooc_type")
+
+        with col2:
+            cooc_province = st.selectbox("Provincia", ["Todas"] + sorted(df['atencion_provincia'].dropna().unique()), key="cooc_province")
+
+        with col3:
+            min_support = st.slider("Soporte Mínimo", min_value=0.0, max_value=1.0, value=0.1, step=0.05)
+
+        with col4:
+            min_confidence = st.slider("Confianza Mínima", min_value=0.0, max_value=1.0, value=0.7, step=0.05)
+
+        # Live filtering only selects rows of the precomputed bitmask array
+        cooc_selection = np.ones(len(df), dtype=bool)
+        if cooc_type != "Todas":
+            cooc_selection &= (df['tipo_entidad'] == cooc_type).to_numpy()
+        if cooc_province != "Todas":
+            cooc_selection &= (df['atencion_provincia'] == cooc_province).to_numpy()
+        selected_masks = instrument_masks[cooc_selection]
+
+        st.markdown(f"<small style='color: #94A3B8;'>{len(selected_masks)} entidades seleccionadas</small>", unsafe_allow_html=True)
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.plotly_chart(cooccurrence_heatmap(instrument_cooccurrence(selected_masks)), use_container_width=True)
+
+        with col2:
+            st.plotly_chart(bundles_bar(instrument_bundles(selected_masks)), use_container_width=True)
+
+        st.markdown("#### Reglas de Asociación")
+        st.markdown("""
+        <small style='color: #94A3B8;'>
+        <strong>Soporte:</strong> proporción de entidades que ofrecen antecedente y consecuente |
+        <strong>Confianza:</strong> probabilidad de ofrecer el consecuente dado el antecedente |
+        <strong>Lift:</strong> cuántas veces más probable que si fueran independientes
+        </small>
+        """, unsafe_allow_html=True)
+        rules = instrument_rules(selected_masks, min_support, min_confidence)
+        if rules.empty:
+            st.info("No hay reglas que superen los umbrales seleccionados")
+        else:
+            st.dataframe(rules, use_container_width=True, hide_index=True, height=400)
+
+    cooccurrence_view()
+
+    # Hidden tabs are not rendered until opened
+    @fragment
+    def top_providers_view():
+        # Top entities by services with detailed breakdown
+        st.markdown("### 🏆 Principales Proveedores de Servicios")
+    
+        # Add tabs for different views
+        tab1, tab2, tab3 = st.tabs(["Top 10 por Servicios Totales", "Matriz de Servicios", "Distribución Detallada"], on_change="rerun", key="top_providers_tabs")
+    
+        with tab1:
+            if tab1.open:
+                st.plotly_chart(top_services_bar(summaries['top_servicios']), use_container_width=True)
+    
+        with tab2:
+            if tab2.open:
+                st.markdown("#### Matriz de Cobertura de Servicios e Instrumentos")
+                st.plotly_chart(service_matrix_heatmap(summaries['top_servicios']), use_container_width=True)
+    
+        with tab3:
+            if tab3.open:
+                # Service distribution by ranges
+                st.markdown("#### Distribución de Entidades por Rango de Servicios")
+                st.plotly_chart(service_categories_bar(summaries['categorias_servicios']), use_container_width=True)
+
+    top_providers_view()
@@ -0,0 +1,82 @@
+"""Panel «Rendimiento»: spans del rerun y bytes de cada figura y tabla enviada al navegador"""
+import time
+from collections import deque
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from sav_eaf.timing import TIMING_ENABLED, finish_rerun, start_rerun
+
+HISTORY_LENGTH = 20
+# Element types of Streamlit's ForwardMsg that get their own span
+_ELEMENT_KINDS = {'plotly_chart': 'figura', 'arrow_data_frame': 'tabla'}
+
+def timing_requested():
+    """Instrumentación activa para esta sesión: SAV_EAF_TIMING=1 o ?rendimiento=1"""
+    return TIMING_ENABLED or st.query_params.get('rendimiento') == '1'
+
+def start_timing(**meta):
+    """Empezar a medir el rerun y los mensajes que Streamlit envía a esta sesión
+
+    Solo se intercepta el envío de la sesión en curso, y solo hasta finish_timing: cada figura o tabla
+    es un span con los bytes del mensaje ya serializado por Streamlit (sin volver a serializar nada) y
+    el tiempo desde el span anterior (construirla y convertirla).
+    """
+    recorder = start_rerun(**meta)
+    context = get_script_run_ctx()
+    if context is None:
+        return recorder
+    send = context.enqueue
+
+    def enqueue(message):
+        send(message)
+        if message.WhichOneof('type') != 'delta' or message.delta.WhichOneof('type') != 'new_element':
+            return
+        kind = _ELEMENT_KINDS.get(message.delta.new_element.WhichOneof('type'))
+        if kind:
+            position = sum(entry['tipo'] == kind for entry in recorder.spans) + 1
+            recorder.add(kind, f"{kind} {position}", time.perf_counter() - recorder.mark, recorder.mark,
+                         bytes=message.ByteSize())
+    context.enqueue = enqueue
+    return recorder
+
+def finish_timing(recorder):
+    """Dejar de medir (también si el rerun se interrumpe) y devolver el resumen del rerun"""
+    context = get_script_run_ctx()
+    if context is not None:
+        vars(context).pop('enqueue', None)
+    return finish_rerun(recorder)
+
+def render_panel(summary):
+    """Panel plegable con el desglose del rerun y el histórico reciente de la sesión"""
+    history = st.session_state.setdefault('timing_history', deque(maxlen=HISTORY_LENGTH))
+    spans = pd.DataFrame(summary['spans'], columns=['tipo', 'nombre', 'nivel', 'inicio_ms', 'ms', 'bytes'])
+    payload = spans['bytes'].fillna(0).sum()
+    history.append({'página': summary.get('pagina') or f"↻ {summary.get('fragmento')}",
+                    'total_ms': summary['total_ms'], 'spans': len(spans), 'figuras': int((spans['tipo'] == 'figura').sum()), 'payload_kb': round(payload / 1024, 1)})
+
+    with st.expander(f"⏱️ Rendimiento · {summary['total_ms']:.0f} ms", expanded=False):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Rerun", f"{summary['total_ms']:.0f} ms")
+        with col2:
+            st.metric("Spans", len(spans))
+        with col3:
+            st.metric("Figuras / Tablas", f"{(spans['tipo'] == 'figura').sum()} / {(spans['tipo'] == 'tabla').sum()}")
+        with col4:
+            st.metric("Payload", f"{payload / 1024:,.1f} KB")
+
+        # Only top-level spans add up: nested ones are already inside their parent
+        top = spans[spans['nivel'] == 0]
+        by_kind = top.groupby('tipo').agg(spans=('ms', 'size'), ms=('ms', 'sum'), bytes=('bytes', 'sum'))
+        by_kind['% rerun'] = (by_kind['ms'] / summary['total_ms'] * 100).round(1)
+        st.markdown("**Por tipo (spans de primer nivel)**")
+        st.dataframe(by_kind.sort_values('ms', ascending=False), use_container_width=True)
+
+        st.markdown("**Spans del rerun**")
+        st.dataframe(spans.assign(nombre=['· ' * level + name for level, name in zip(spans['nivel'], spans['nombre'])])
+                     .sort_values('inicio_ms').drop(columns='nivel'), use_container_width=True, hide_index=True)
+
+        st.markdown(f"**Últimos {len(history)} reruns de la sesión**")
+        st.dataframe(pd.DataFrame(list(history))[::-1], use_container_width=True, hide_index=True)
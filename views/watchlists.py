@@ -0,0 +1,117 @@
+"""Página «Vigilancia»"""
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+
+from sav_eaf.core import (
+    DATA_FILE, WATCH_GROUPS, evaluate_watchlists, get_data_version, list_snapshots, load_watch_store,
+    record_alerts, updating_watch_store,
+)
+from views.data import compute_delta
+
+def render(df, data_version):
+    st.title("👁️ Listas de Vigilancia")
+    st.markdown("Siga entidades concretas y reciba alertas cuando cambien en una nueva extracción")
+
+    watch_store = load_watch_store()
+    entity_names = dict(zip(df['entity_key'], df['nombre']))
+    group_labels = {
+        'capital': 'Capital social', 'administradores': 'Consejo de administración', 'socios': 'Accionistas',
+        'auditores': 'Auditor', 'instrumentos': 'Instrumentos autorizados', 'servicios': 'Servicios',
+        'sucursales': 'Sucursales', 'registro': 'Alta/baja en el registro'
+    }
+
+    # Alerts
+    st.markdown("### 🔔 Alertas")
+    alerts_df = pd.DataFrame(watch_store['alerts'])
+    if alerts_df.empty:
+        st.info("Todavía no hay alertas. Se generan al llegar una extracción nueva o al evaluar manualmente más abajo.")
+    else:
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            only_unread = st.checkbox("Solo sin leer", value=True)
+        with col2:
+            alert_lists = st.multiselect("Listas", sorted(alerts_df['lista'].unique()), default=sorted(alerts_df['lista'].unique()))
+
+        shown = alerts_df[alerts_df['lista'].isin(alert_lists)]
+        if only_unread:
+            shown = shown[~shown['leida'].astype(bool)]
+        st.dataframe(
+            shown[['creada', 'lista', 'nombre', 'grupo', 'campo', 'valor_anterior', 'valor_nuevo', 'cambio', 'leida']].iloc[::-1],
+            use_container_width=True,
+            hide_index=True
+        )
+        if len(shown) and st.button("✔️ Marcar como leídas las alertas mostradas"):
+            shown_ids = set(shown['id'])
+            with updating_watch_store() as store:
+                for alert in store['alerts']:
+                    if alert['id'] in shown_ids:
+                        alert['leida'] = True
+            st.rerun()
+
+    # Existing watchlists
+    st.markdown("### 📋 Listas Activas")
+    if not watch_store['watchlists']:
+        st.info("No hay listas de vigilancia")
+    else:
+        watchlists_df = pd.DataFrame([{
+            'Lista': w['name'],
+            'Equipo': w.get('team', ''),
+            'Entidades': len(w['entities']),
+            'Campos Vigilados': ', '.join(group_labels.get(g, g) for g in w['groups']),
+            'Creada': w.get('created', ''),
+        } for w in watch_store['watchlists']])
+        st.dataframe(watchlists_df, use_container_width=True, hide_index=True)
+
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            to_delete = st.selectbox("Eliminar lista", [w['name'] for w in watch_store['watchlists']])
+        with col2:
+            st.markdown("<br>", unsafe_allow_html=True)
+            if st.button("🗑️ Eliminar"):
+                with updating_watch_store() as store:
+                    store['watchlists'] = [w for w in store['watchlists'] if w['name'] != to_delete]
+                st.rerun()
+
+    # New watchlist
+    st.markdown("### ➕ Nueva Lista")
+    with st.form("new_watchlist", clear_on_submit=True):
+        col1, col2 = st.columns(2)
+        with col1:
+            new_name = st.text_input("Nombre de la lista")
+        with col2:
+            new_team = st.text_input("Equipo")
+        new_entities = st.multiselect("Entidades", options=list(entity_names), format_func=lambda key: entity_names[key])
+        new_groups = st.multiselect("Cambios a vigilar", options=WATCH_GROUPS, default=['capital', 'administradores', 'auditores', 'instrumentos'],
+                                    format_func=lambda group: group_labels.get(group, group))
+        if st.form_submit_button("Crear lista"):
+            if not new_name or not new_entities or not new_groups:
+                st.warning("⚠️ Indique un nombre, al menos una entidad y al menos un tipo de cambio")
+            elif any(w['name'] == new_name for w in watch_store['watchlists']):
+                st.warning("⚠️ Ya existe una lista con ese nombre")
+            else:
+                with updating_watch_store() as store:
+                    watch_id = store.get('next_watchlist_id', 1)
+                    store['watchlists'].append({
+                        'id': f"w{watch_id}", 'name': new_name, 'team': new_team,
+                        'entities': new_entities, 'groups': new_groups,
+                        'created': datetime.now().isoformat(timespec='seconds'),
+                    })
+                    store['next_watchlist_id'] = watch_id + 1
+                st.rerun()
+
+    # Manual evaluation against a historical snapshot
+    snapshots = list_snapshots(exclude_version=data_version)
+    if len(snapshots) > 1 and watch_store['watchlists']:
+        st.markdown("### 🔁 Evaluar contra una Extracción Anterior")
+        baseline_label = st.selectbox("Extracción de referencia", list(snapshots)[1:])
+        if st.button("Evaluar listas"):
+            baseline_path = snapshots[baseline_label]
+            baseline_version = get_data_version(baseline_path)
+            delta, _ = compute_delta(baseline_path, baseline_version, DATA_FILE, data_version)
+            with updating_watch_store() as store:
+                added = record_alerts(store, evaluate_watchlists(store['watchlists'], delta),
+                                      baseline_version, data_version)
+            if added:
+                st.rerun()
+            st.info("No hay alertas nuevas para esta evaluación")